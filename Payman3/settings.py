@@ -45,10 +45,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'payroll.middleware.SQLProfileMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'payroll.middleware.ReadYourWritesMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -80,7 +82,90 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # Read-only copy used by reporting views (payroll.db_router). For SQLite it
+    # is a snapshot refreshed by `manage.py sync_reporting_db`; until the file
+    # exists those views read from default. Can also be a Postgres replica.
+    'reporting': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'reporting.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
+}
+
+DATABASE_ROUTERS = ['payroll.db_router.ReportingRouter']
+
+PAYROLL_REPORTING_DB = 'reporting'
+PAYROLL_REPORTING_MAX_LAG_SECONDS = 5  # assumed lag of a non-SQLite replica
+
+
+# Cache
+# Per-process memory cache by default; point this at Redis or Memcached when
+# running several workers so dashboard invalidation reaches all of them.
+# The 'accounts' cache holds the session user's role and flags, so it must be
+# shared by every worker: a file cache covers one host, use Redis or
+# Memcached for more.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'accounts': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'var' / 'cache' / 'accounts',
+    },
+}
+
+PAYROLL_DASHBOARD_CACHE_SECONDS = 300
+
+
+# Payslip PDFs are cached here under a hash of their content; safe to delete.
+PAYROLL_PAYSLIP_PDF_DIR = BASE_DIR / 'var' / 'payslips'
+
+
+# Payslip e-mail
+# Queued per approved run and sent by `manage.py send_payslip_emails`. To try
+# it locally, run a debugging SMTP server on localhost:1025 and set
+# EMAIL_HOST = 'localhost' and EMAIL_PORT = 1025.
+
+DEFAULT_FROM_EMAIL = 'payroll@localhost'
+PAYROLL_EMAIL_MAX_ATTEMPTS = 5
+PAYROLL_EMAIL_RETRY_SECONDS = 60
+PAYROLL_EMAIL_LEASE_SECONDS = 600
+
+
+# Payroll jobs (payroll.services.jobs): a running job whose worker has not
+# reported a chunk for this long is taken over and resumed by another worker.
+# Keep it well above the time one chunk takes.
+
+PAYROLL_JOB_LEASE_SECONDS = 600
+
+
+# Run-over-run variance (payroll.services.variance): a payslip is flagged when
+# its net or gross pay moved by at least this many percent and by at least
+# PAYROLL_VARIANCE_MIN_AMOUNT since the previous approved run.
+
+PAYROLL_VARIANCE_NET_PCT = 10
+PAYROLL_VARIANCE_GROSS_PCT = 10
+PAYROLL_VARIANCE_MIN_AMOUNT = 0
+
+
+# SQL profiling
+# Fraction of requests (0 to 1) whose queries are timed and logged; see
+# payroll.middleware.SQLProfileMiddleware and `manage.py sql_profile_report`.
+
+PAYROLL_SQL_PROFILE_SAMPLE_RATE = 0.0
+PAYROLL_SQL_PROFILE_DUPLICATE_THRESHOLD = 3
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'payroll.sql_profile': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
 }
 
 
@@ -127,6 +212,15 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'accounts.User'
 
+# The cached backend serves request.user from the cache (see accounts.backends);
+# ModelBackend stays listed so sessions created before it keep working.
+AUTHENTICATION_BACKENDS = [
+    'accounts.backends.CachedModelBackend',
+    'django.contrib.auth.backends.ModelBackend',
+]
+ACCOUNTS_USER_CACHE = 'accounts'
+ACCOUNTS_USER_CACHE_SECONDS = 30  # upper bound on a missed invalidation
+
 LOGIN_URL = "accounts:login"
 LOGIN_REDIRECT_URL = "payroll:dashboard"
 LOGOUT_REDIRECT_URL = "accounts:login"
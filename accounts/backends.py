@@ -0,0 +1,70 @@
+# accounts/backends.py
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+from .models import CachedUser
+
+# Fields kept per user in the cache; everything else stays deferred and is
+# loaded from the database only if something actually reads it.
+CACHED_FIELDS = ["id", "username", "email", "first_name", "last_name", "role", "is_superuser", "is_staff", "is_active"]
+CACHE_KEY = "accounts:user:{}"
+
+
+def user_cache():
+    # Must be shared by all workers: a save invalidates only the cache it can reach.
+    return caches[getattr(settings, "ACCOUNTS_USER_CACHE", "default")]
+
+
+def user_cache_timeout():
+    return getattr(settings, "ACCOUNTS_USER_CACHE_SECONDS", 30)
+
+
+def user_cache_key(user_id):
+    return CACHE_KEY.format(user_id)
+
+
+def invalidate_cached_user(user_id):
+    user_cache().delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend whose get_user() is served from the cache. The request's
+    user is rebuilt from the cached id, role, superuser flag and names, so
+    AuthenticationMiddleware and role_required cost no user-table query.
+    Entries are dropped by accounts.signals when a User is saved or deleted
+    and expire after ACCOUNTS_USER_CACHE_SECONDS in any case.
+    """
+
+    def _cache_entry(self, user):
+        data = {name: getattr(user, name) for name in CACHED_FIELDS}
+        data["session_auth_hash"] = user.get_session_auth_hash()
+        return data
+
+    def _from_cache(self, data):
+        user = CachedUser.from_cache(data)
+        return user if self.user_can_authenticate(user) else None
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        data = user_cache().get(key)
+        if data is None:
+            user = CachedUser._default_manager.filter(pk=user_id).first()
+            if user is None:
+                return None
+            data = self._cache_entry(user)
+            user_cache().set(key, data, user_cache_timeout())
+        return self._from_cache(data)
+
+    async def aget_user(self, user_id):
+        # ModelBackend.aget_user() queries directly rather than via get_user()
+        key = user_cache_key(user_id)
+        data = await user_cache().aget(key)
+        if data is None:
+            user = await CachedUser._default_manager.filter(pk=user_id).afirst()
+            if user is None:
+                return None
+            data = self._cache_entry(user)
+            await user_cache().aset(key, data, user_cache_timeout())
+        return self._from_cache(data)
@@ -1,11 +1,41 @@
 # accounts/decorators.py
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth.views import redirect_to_login
 from django.core.exceptions import PermissionDenied
 
+
+def _check_role(request, user, allowed_roles):
+    """None if the user may continue, otherwise the response to return instead."""
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    if user.role in allowed_roles or user.is_superuser:
+        return None
+    raise PermissionDenied
+
+
 def role_required(allowed_roles=[]):
+    """
+    Allow users whose role is in allowed_roles (and superusers). Reads only
+    the cached role and superuser flag (accounts.backends), so the check
+    itself never queries the user table. Works on sync and async views; an
+    async view gets the user through request.auser().
+    """
     def decorator(view_func):
-        def wrapper(request, *args, **kwargs):
-            if request.user.role in allowed_roles or request.user.is_superuser:
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def wrapper(request, *args, **kwargs):
+                denied = _check_role(request, await request.auser(), allowed_roles)
+                if denied is not None:
+                    return denied
+                return await view_func(request, *args, **kwargs)
+        else:
+            @wraps(view_func)
+            def wrapper(request, *args, **kwargs):
+                denied = _check_role(request, request.user, allowed_roles)
+                if denied is not None:
+                    return denied
                 return view_func(request, *args, **kwargs)
-            raise PermissionDenied
         return wrapper
     return decorator
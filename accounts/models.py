@@ -48,6 +48,30 @@ class User(AbstractUser):
     
 
 
+class CachedUser(User):
+    """
+    A User rebuilt from the per-user cache entry (accounts.backends) rather
+    than a database row. Fields that are not cached are deferred and load
+    on first access; the session auth hash is cached so verifying the
+    session does not need the password column.
+    """
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_cache(cls, data):
+        # from_db() expects values in concrete-field order
+        fields = [f.attname for f in cls._meta.concrete_fields if f.attname in data]
+        user = cls.from_db("default", fields, [data[name] for name in fields])
+        user._session_auth_hash = data.get("session_auth_hash")
+        return user
+
+    def get_session_auth_hash(self):
+        cached = getattr(self, "_session_auth_hash", None)
+        return cached if cached is not None else super().get_session_auth_hash()
+
+
 class EmployeeProfile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name="profile")
 
@@ -0,0 +1,15 @@
+# accounts/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import invalidate_cached_user
+from .models import CachedUser, User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=CachedUser)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=CachedUser)
+def drop_cached_user(sender, instance, **kwargs):
+    # Role, flags, names or password may have changed; rebuild on next request.
+    invalidate_cached_user(instance.pk)
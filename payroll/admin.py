@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Employee, PayrollPeriod, Department,GradeStep, AllowanceType,DeductionType ,PayrollRecord
+from .models import Employee, PayrollPeriod, Department,GradeStep, AllowanceType,DeductionType ,PayrollRecord, PayrollSummary, PayslipEmail, PayrollJob, YearToDate
 
 # Register your models here.
 class EmployeeAdmin(admin.ModelAdmin):
@@ -15,3 +15,33 @@ admin.site.register(GradeStep)
 admin.site.register(AllowanceType)
 admin.site.register(DeductionType)
 admin.site.register(PayrollRecord)
+
+
+class PayrollSummaryAdmin(admin.ModelAdmin):
+    list_display = ('period', 'department', 'employment_type', 'headcount', 'gross_pay', 'net_pay', 'updated_at')
+    list_filter = ('period', 'employment_type')
+
+admin.site.register(PayrollSummary, PayrollSummaryAdmin)
+
+
+class YearToDateAdmin(admin.ModelAdmin):
+    list_display = ('employee', 'year', 'payslips', 'gross_pay', 'tax', 'net_pay', 'updated_at')
+    list_filter = ('year',)
+    search_fields = ('employee__first_name', 'employee__last_name')
+
+admin.site.register(YearToDate, YearToDateAdmin)
+
+
+class PayslipEmailAdmin(admin.ModelAdmin):
+    list_display = ('payslip', 'to_address', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status', 'run')
+    search_fields = ('to_address',)
+
+admin.site.register(PayslipEmail, PayslipEmailAdmin)
+
+
+class PayrollJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'period', 'status', 'done', 'total', 'worker', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('status',)
+
+admin.site.register(PayrollJob, PayrollJobAdmin)
@@ -0,0 +1,248 @@
+"""
+Read-only JSON API for integrations: employees, payroll periods, runs and
+payslips (with their lines).
+
+Lists are cursor-paginated on the primary key (?cursor=, ?limit=) and every
+endpoint takes ?fields=a,b,c to select fields. Responses carry a strong
+ETag built from the rows' updated_at (and, where it matters, the period's
+is_closed flag), so a matching If-None-Match gets a 304 after the row
+query alone: nothing is prefetched or serialized. Data of closed periods
+can only change if the period is reopened, so clients may reuse it for
+an hour without revalidating.
+"""
+import hashlib
+from dataclasses import dataclass, field
+from typing import Callable
+
+from django.db.models import Prefetch, prefetch_related_objects
+from django.http import JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_safe
+
+from accounts.decorators import role_required
+from .models import Employee, PayrollPeriod, PayrollRun, Payslip, PayslipLine
+from .pagination import KeysetPaginator
+
+API_ROLES = ["payroll_officer", "hr_manager", "admin", "auditor"]
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 200
+# Bump when a representation changes so clients do not keep stale 304s.
+API_VERSION = 1
+CLOSED_MAX_AGE = 60 * 60  # a period can still be reopened in the admin
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _period(prefix):
+    def lookups(value):
+        try:
+            year, month = (int(part) for part in value.split("-"))
+        except ValueError:
+            raise BadRequest("period must be in format YYYY-MM")
+        return {f"{prefix}__year": year, f"{prefix}__month": month}
+    return lookups
+
+
+def _exact(lookup, parse):
+    return lambda value: {lookup: parse(value)}
+
+
+def _int(value):
+    try:
+        return int(value)
+    except ValueError:
+        raise BadRequest(f"{value!r} is not an integer")
+
+
+def _bool(value):
+    if value.lower() not in ("true", "false", "1", "0"):
+        raise BadRequest(f"{value!r} is not a boolean")
+    return value.lower() in ("true", "1")
+
+
+def _path(obj, path):
+    for name in path.split("__"):
+        if obj is None:
+            return None
+        obj = getattr(obj, name)
+    return obj
+
+
+@dataclass(frozen=True)
+class Resource:
+    queryset: Callable
+    fields: dict                                 # field name -> callable(obj) giving its JSON value
+    version: tuple = ("updated_at",)             # paths that change whenever the representation does
+    closed: str | None = None                    # path to the PayrollPeriod.is_closed that freezes the row
+    filters: dict = field(default_factory=dict)  # query parameter -> callable(value) giving filter() kwargs
+    scoped_by: tuple = ()                        # filters that pin a list to a single period
+    prefetch: dict = field(default_factory=dict)  # field name -> lookup, fetched only when the field is selected
+
+    def versions(self, obj):
+        return (obj.pk, *(_path(obj, path) for path in self.version))
+
+    def is_closed(self, obj):
+        return self.closed is not None and bool(_path(obj, self.closed))
+
+
+def _attrs(*names):
+    return {name: (lambda obj, name=name: getattr(obj, name)) for name in names}
+
+
+RESOURCES = {
+    "employees": Resource(
+        queryset=lambda: Employee.objects.select_related("department", "grade_step"),
+        fields={
+            **_attrs("id", "first_name", "last_name", "email", "phone", "position", "department_id"),
+            "department": lambda e: e.department.name if e.department else None,
+            "grade_step": lambda e: str(e.grade_step) if e.grade_step else None,
+            **_attrs("employment_type", "basic_salary", "bank_name", "bank_branch", "is_active",
+                     "date_created", "updated_at"),
+        },
+        # department and grade_step are shown by name, so edits to those rows change the body too
+        version=("updated_at", "department__name", "grade_step__title", "grade_step__grade_code", "grade_step__step"),
+        filters={"is_active": _exact("is_active", _bool), "department": _exact("department_id", _int)},
+    ),
+    "periods": Resource(
+        queryset=lambda: PayrollPeriod.objects.all(),
+        fields={
+            **_attrs("id", "year", "month"),
+            "period": str,
+            **_attrs("start_date", "end_date", "is_closed", "updated_at"),
+        },
+        closed="is_closed",
+        filters={"year": _exact("year", _int), "is_closed": _exact("is_closed", _bool)},
+    ),
+    "runs": Resource(
+        queryset=lambda: PayrollRun.objects.select_related("period"),
+        fields={
+            **_attrs("id", "period_id"),
+            "period": lambda r: str(r.period),
+            "period_closed": lambda r: r.period.is_closed,
+            **_attrs("status", "created_by_id", "created_at", "completed_at", "updated_at"),
+        },
+        version=("updated_at", "period__is_closed"),
+        closed="period__is_closed",
+        filters={"period": _period("period"), "status": _exact("status", str)},
+        scoped_by=("period",),
+    ),
+    "payslips": Resource(
+        queryset=lambda: Payslip.objects.select_related("run__period"),
+        fields={
+            **_attrs("id", "run_id", "employee_id_id"),
+            "period": lambda s: str(s.run.period),
+            **_attrs("gross_pay", "taxable_income", "tax", "statutory_employee", "statutory_employer",
+                     "total_deductions", "net_pay", "updated_at"),
+            "lines": lambda s: [{"kind": line.kind, "label": line.label, "amount": line.amount}
+                                for line in s.lines.all()],
+        },
+        version=("updated_at", "run__period__is_closed"),
+        closed="run__period__is_closed",
+        filters={"run": _exact("run_id", _int), "period": _period("run__period"),
+                 "employee": _exact("employee_id_id", _int)},
+        scoped_by=("run", "period"),
+        prefetch={"lines": Prefetch("lines", queryset=PayslipLine.objects.order_by("pk"))},
+    ),
+}
+
+
+def _selected_fields(request, resource):
+    names = request.GET.get("fields")
+    if not names:
+        return list(resource.fields)
+    selected = [name.strip() for name in names.split(",") if name.strip()]
+    unknown = sorted(set(selected) - set(resource.fields))
+    if unknown:
+        raise BadRequest(f"Unknown fields: {', '.join(unknown)}")
+    return selected
+
+
+def _filtered(request, resource):
+    qs = resource.queryset()
+    for param, lookups in resource.filters.items():
+        if param in request.GET:
+            qs = qs.filter(**lookups(request.GET[param]))
+    return qs
+
+
+def _limit(request):
+    limit = _int(request.GET.get("limit", DEFAULT_LIMIT))
+    if not 1 <= limit <= MAX_LIMIT:
+        raise BadRequest(f"limit must be between 1 and {MAX_LIMIT}")
+    return limit
+
+
+def _etag(request, rows):
+    """Strong ETag of one representation: the URL (fields, filters, cursor) and the row versions."""
+    digest = hashlib.sha256(f"{API_VERSION}|{request.path}|{sorted(request.GET.lists())}".encode())
+    for row in rows:
+        digest.update(repr(row).encode())
+    return f'"{digest.hexdigest()[:40]}"'
+
+
+def _serialize(objs, resource, fields):
+    lookups = [resource.prefetch[name] for name in fields if name in resource.prefetch]
+    if lookups:
+        prefetch_related_objects(objs, *lookups)
+    return [{name: resource.fields[name](obj) for name in fields} for obj in objs]
+
+
+def _conditional(request, etag, closed, build):
+    """304 if the client has `etag`, otherwise the JSON body from build(); cache headers on both."""
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = JsonResponse(build())
+    response["ETag"] = etag
+    if closed:
+        patch_cache_control(response, private=True, max_age=CLOSED_MAX_AGE)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _page_url(request, cursor):
+    if cursor is None:
+        return None
+    params = request.GET.copy()
+    params["cursor"] = cursor
+    return f"{request.path}?{params.urlencode()}"
+
+
+@require_safe
+@role_required(API_ROLES)
+def resource_list(request, resource):
+    resource = RESOURCES[resource]
+    try:
+        fields = _selected_fields(request, resource)
+        qs = _filtered(request, resource)
+        page = KeysetPaginator(qs, _limit(request), ordering=["pk"]).get_page(request.GET.get("cursor"))
+    except BadRequest as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+
+    # Without a period filter, new rows can appear in any list, so only a
+    # page scoped to one closed period is final.
+    scoped = any(param in request.GET for param in resource.scoped_by)
+    closed = scoped and bool(page.object_list) and all(resource.is_closed(obj) for obj in page)
+    etag = _etag(request, [resource.versions(obj) for obj in page])
+    return _conditional(request, etag, closed, lambda: {
+        "results": _serialize(page.object_list, resource, fields),
+        "next": _page_url(request, page.next_cursor if page.has_next else None),
+        "previous": _page_url(request, page.previous_cursor if page.has_previous else None),
+    })
+
+
+@require_safe
+@role_required(API_ROLES)
+def resource_detail(request, resource, pk):
+    resource = RESOURCES[resource]
+    try:
+        fields = _selected_fields(request, resource)
+    except BadRequest as exc:
+        return JsonResponse({"error": str(exc)}, status=400)
+    obj = resource.queryset().filter(pk=pk).first()
+    if obj is None:
+        return JsonResponse({"error": "Not found"}, status=404)
+    etag = _etag(request, [resource.versions(obj)])
+    return _conditional(request, etag, resource.is_closed(obj), lambda: _serialize([obj], resource, fields)[0])
@@ -0,0 +1,147 @@
+import contextvars
+import os
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+# Alias the current request reads from; set only inside reporting views.
+_read_alias = contextvars.ContextVar("payroll_read_alias", default=None)
+
+SESSION_LAST_WRITE = "payroll_last_write"
+
+
+def reporting_alias():
+    return getattr(settings, "PAYROLL_REPORTING_DB", "reporting")
+
+
+def reporting_synced_at(alias=None):
+    """
+    Time up to which the reporting database is known to be current, or None
+    when reads cannot go there: the alias is not configured, points at the
+    same database as default, or its SQLite snapshot has not been made yet.
+    A SQLite snapshot is current as of its file's mtime (sync_reporting_db
+    swaps the file in atomically); any other backend is taken to be a
+    streaming replica at most PAYROLL_REPORTING_MAX_LAG_SECONDS behind.
+    """
+    alias = alias or reporting_alias()
+    if alias not in connections.settings:
+        return None
+    db = connections[alias].settings_dict
+    default = connections["default"].settings_dict
+    if db is default or (db["ENGINE"], str(db["NAME"]), db.get("HOST")) == (
+            default["ENGINE"], str(default["NAME"]), default.get("HOST")):
+        return None
+    if db["ENGINE"].endswith("sqlite3"):
+        try:
+            return os.path.getmtime(db["NAME"])
+        except OSError:
+            return None
+    return time.time() - getattr(settings, "PAYROLL_REPORTING_MAX_LAG_SECONDS", 5)
+
+
+def reporting_db_for(request):
+    """
+    The alias a reporting view should read from for this request: the
+    reporting database, unless the user has written something it may not
+    have caught up with yet (read-your-writes).
+    """
+    synced_at = reporting_synced_at()
+    if synced_at is None:
+        return None
+    session = getattr(request, "session", None)
+    last_write = session.get(SESSION_LAST_WRITE) if session is not None else None
+    if last_write is not None and last_write >= synced_at:
+        return None
+    return reporting_alias()
+
+
+def _reading_from(alias, iterable):
+    """Re-enter the routing context for every chunk of a streaming response."""
+    iterator = iter(iterable)
+    while True:
+        token = _read_alias.set(alias)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            _read_alias.reset(token)
+        yield chunk
+
+
+async def _areading_from(alias, aiterable):
+    """_reading_from for an async streaming response."""
+    iterator = aiter(aiterable)
+    while True:
+        token = _read_alias.set(alias)
+        try:
+            chunk = await anext(iterator)
+        except StopAsyncIteration:
+            return
+        finally:
+            _read_alias.reset(token)
+        yield chunk
+
+
+def _route_stream(alias, response):
+    if getattr(response, "streaming", False):
+        if response.is_async:
+            response.streaming_content = _areading_from(alias, response.streaming_content)
+        else:
+            response.streaming_content = _reading_from(alias, response.streaming_content)
+    return response
+
+
+def reporting_view(view):
+    """Route the view's reads (including a streamed body) to the reporting database when it is safe."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            # The session may not be loaded yet, and loading it is a query
+            alias = await sync_to_async(reporting_db_for)(request)
+            if alias is None:
+                return await view(request, *args, **kwargs)
+            token = _read_alias.set(alias)
+            try:
+                response = await view(request, *args, **kwargs)
+            finally:
+                _read_alias.reset(token)
+            return _route_stream(alias, response)
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        alias = reporting_db_for(request)
+        if alias is None:
+            return view(request, *args, **kwargs)
+        token = _read_alias.set(alias)
+        try:
+            response = view(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+        return _route_stream(alias, response)
+    return wrapper
+
+
+class ReportingRouter:
+    """
+    Reads go to the alias chosen by reporting_view for the current request,
+    everything else to default. Writes and migrations always target
+    default; the reporting copy is refreshed by sync_reporting_db or by
+    database replication.
+    """
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == "default"
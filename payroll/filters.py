@@ -1,21 +1,37 @@
 import django_filters
-from .models import Employee, PayrollRecord
+from .models import Employee, PayrollPeriod, PayrollRecord
+from .services.search import search_employees
 
 
 class EmployeeFilter(django_filters.FilterSet):
     first_name = django_filters.CharFilter(lookup_expr="icontains")
     last_name = django_filters.CharFilter(lookup_expr="icontains")
-    department = django_filters.CharFilter(lookup_expr="icontains")
+    department = django_filters.CharFilter(field_name="department__name", lookup_expr="icontains")
+    search = django_filters.CharFilter(method="filter_search", label="Search")
 
     class Meta:
         model = Employee
         fields = ["first_name", "last_name", "department"]
 
+    def filter_search(self, queryset, name, value):
+        return search_employees(queryset, value)
+
 
 class PayrollRecordFilter(django_filters.FilterSet):
-    employee__first_name = django_filters.CharFilter(lookup_expr="icontains")
-    employee__last_name = django_filters.CharFilter(lookup_expr="icontains")
+    employee__first_name = django_filters.CharFilter(field_name="employee_id__first_name", lookup_expr="icontains")
+    employee__last_name = django_filters.CharFilter(field_name="employee_id__last_name", lookup_expr="icontains")
+    period = django_filters.CharFilter(method="filter_period", label="Period (YYYY-MM)")
 
     class Meta:
         model = PayrollRecord
         fields = ["employee_id", "component_type", "description", "gross_salary", "net_salary"]
+
+    def filter_period(self, queryset, name, value):
+        try:
+            year, month = (int(part) for part in value.split("-"))
+            period = PayrollPeriod(year=year, month=month)
+            start, end = period.start_date, period.end_date
+        except ValueError:
+            return queryset.none()
+        # A plain range (not __month) so the period_start index applies
+        return queryset.filter(period_start__range=(start, end))
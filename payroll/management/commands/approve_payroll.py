@@ -0,0 +1,22 @@
+# payroll/management/commands/approve_payroll.py
+from django.core.management.base import BaseCommand, CommandError
+
+from payroll.models import PayrollRun
+from payroll.services.approval import approve_run
+
+
+class Command(BaseCommand):
+    help = "Approve a draft payroll run"
+
+    def add_arguments(self, parser):
+        parser.add_argument("run_id", type=int)
+
+    def handle(self, *args, **options):
+        run = PayrollRun.objects.filter(pk=options["run_id"]).first()
+        if run is None:
+            raise CommandError(f"Payroll run {options['run_id']} does not exist")
+        try:
+            run = approve_run(run)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f"Approved run {run.pk} for period {run.period}"))
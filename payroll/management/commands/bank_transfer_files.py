@@ -0,0 +1,30 @@
+# payroll/management/commands/bank_transfer_files.py
+from django.core.management.base import BaseCommand, CommandError
+
+from payroll.models import PayrollRun
+from payroll.services.bank_files import BANK_FILE_FORMATS, write_bank_files
+
+
+class Command(BaseCommand):
+    help = "Write one bank transfer batch file per bank for an approved payroll run"
+
+    def add_arguments(self, parser):
+        parser.add_argument("run_id", type=int, help="ID of an approved PayrollRun")
+        parser.add_argument("--format", choices=BANK_FILE_FORMATS, default="csv")
+        parser.add_argument("--output-dir", type=str, default=".", help="Directory for the batch files")
+
+    def handle(self, *args, **options):
+        run = PayrollRun.objects.filter(pk=options["run_id"]).first()
+        if run is None:
+            raise CommandError(f"Payroll run {options['run_id']} does not exist")
+        try:
+            files = write_bank_files(run, options["output_dir"], fmt=options["format"])
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        for bank_file in files:
+            self.stdout.write(
+                f"{bank_file.path}: {bank_file.count} transfers, {len(bank_file.branches)} branches, "
+                f"total {bank_file.total}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(files)} bank files for run {run.pk}"))
@@ -0,0 +1,71 @@
+# payroll/management/commands/bench_payroll.py
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from payroll.models import PayrollPeriod, PayrollRun
+from payroll.services.benchmark import benchmark_run
+from payroll.services.dashboard import invalidate_dashboard_metrics
+from payroll.services.run_pipeline import DEFAULT_CHUNK_SIZE, PIPELINES
+
+
+class Command(BaseCommand):
+    help = "Time a full payroll run (load, compute and write phases) and report it as JSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument("period", type=str, help="Payroll period in format YYYY-MM (e.g. 2025-08)")
+        parser.add_argument("--mode", choices=sorted(PIPELINES), default="scalar")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument("--output", type=str, default=None,
+                            help="Append the result as one JSON line to this file (default: print it)")
+        parser.add_argument("--label", type=str, default="", help="Free-text label stored with the result")
+        parser.add_argument("--keep-run", action="store_true",
+                            help="Keep the benchmark run and its payslips instead of deleting them")
+        parser.add_argument("--created-by", type=str, default=None,
+                            help="Email of the user recorded on the run (defaults to the first superuser)")
+
+    def handle(self, *args, **options):
+        try:
+            year, month = (int(part) for part in options["period"].split("-"))
+        except ValueError:
+            raise CommandError("Period must be in format YYYY-MM")
+        if not 1 <= month <= 12:
+            raise CommandError("Period must be in format YYYY-MM")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+
+        User = get_user_model()
+        if options["created_by"]:
+            created_by = User.objects.filter(email=options["created_by"]).first()
+        else:
+            created_by = User.objects.filter(is_superuser=True).order_by("pk").first()
+        if created_by is None:
+            raise CommandError("No user to record on the run; pass --created-by <email>")
+
+        period, _ = PayrollPeriod.objects.get_or_create(year=year, month=month)
+        if period.is_closed:
+            raise CommandError(f"Payroll period {period} is closed")
+
+        run = PayrollRun.objects.create(period=period, created_by=created_by)
+        try:
+            result = benchmark_run(run, mode=options["mode"], chunk_size=options["chunk_size"])
+        finally:
+            if not options["keep_run"]:
+                run.delete()
+            invalidate_dashboard_metrics()
+
+        report = {"label": options["label"], "period": str(period), **result.as_dict()}
+        if options["output"]:
+            with open(options["output"], "a") as fh:
+                fh.write(json.dumps(report) + "\n")
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
+
+        phases = ", ".join(f"{name} {phase['seconds']:.2f}s/{phase['queries']}q"
+                           for name, phase in report["phases"].items())
+        self.stderr.write(self.style.SUCCESS(
+            f"{report['employees']} employees in {report['seconds']:.2f}s ({phases}); "
+            f"p50 {report['latency_ms']['p50']} ms, p99 {report['latency_ms']['p99']} ms, "
+            f"{report['queries_per_employee']} queries/employee"
+        ))
@@ -0,0 +1,54 @@
+# payroll/management/commands/export_payroll_records.py
+from django.core.management.base import BaseCommand, CommandError
+from django.http import QueryDict
+
+from payroll.filters import PayrollRecordFilter
+from payroll.models import PayrollRecord
+from payroll.services.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, iter_csv, write_xlsx
+
+
+class Command(BaseCommand):
+    help = "Export PayrollRecord rows for a period or payroll_list filter set as CSV or XLSX"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--period", type=str, default=None, help="Payroll period in format YYYY-MM")
+        parser.add_argument(
+            "--filter",
+            action="append",
+            default=[],
+            metavar="NAME=VALUE",
+            help="Any PayrollRecordFilter parameter, e.g. --filter component_type=PAYE (repeatable)",
+        )
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument("--output", "-o", type=str, default=None, help="File to write (default: stdout, CSV only)")
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        params = QueryDict(mutable=True)
+        for item in options["filter"]:
+            name, sep, value = item.partition("=")
+            if not sep:
+                raise CommandError(f"--filter expects NAME=VALUE, got {item!r}")
+            params.appendlist(name, value)
+        if options["period"]:
+            params["period"] = options["period"]
+
+        f = PayrollRecordFilter(params, queryset=PayrollRecord.objects.all())
+        if not f.is_valid():
+            raise CommandError(f.errors.as_text())
+
+        if options["format"] == "xlsx":
+            if not options["output"]:
+                raise CommandError("--format xlsx needs --output")
+            try:
+                write_xlsx(f.qs, options["output"], options["chunk_size"])
+            except ImportError:
+                raise CommandError("XLSX export requires openpyxl (pip install openpyxl)")
+            return
+
+        if options["output"]:
+            with open(options["output"], "w", newline="") as out:
+                out.writelines(iter_csv(f.qs, options["chunk_size"]))
+        else:
+            for line in iter_csv(f.qs, options["chunk_size"]):
+                self.stdout.write(line, ending="")
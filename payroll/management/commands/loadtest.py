@@ -0,0 +1,69 @@
+# payroll/management/commands/loadtest.py
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from payroll.services.loadtest import DEFAULT_LEVELS, DEFAULT_TIMEOUT, ramp, session_cookie
+
+
+class Command(BaseCommand):
+    help = (
+        "Ramp concurrent connections against a running server and report the highest level it held. "
+        "Run it once per server with the same URL, e.g. against "
+        "`gunicorn Payman3.wsgi -w 1 --threads 8` (--label wsgi) and "
+        "`uvicorn Payman3.asgi:application --workers 1` (--label asgi), appending to one --output file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("url", type=str, help="Full URL to request, e.g. http://127.0.0.1:8000/payroll/export/")
+        parser.add_argument("--levels", type=str, default=",".join(map(str, DEFAULT_LEVELS)),
+                            help="Comma-separated concurrency levels, run in order")
+        parser.add_argument("--requests-per-client", type=int, default=5,
+                            help="Requests per concurrent connection at each level")
+        parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Seconds before a request fails")
+        parser.add_argument("--max-p95-ms", type=float, default=None,
+                            help="Also require p95 latency within this many milliseconds for a level to hold")
+        parser.add_argument("--user", type=str, default=None,
+                            help="Email of the user to log in as (a session is created in this database)")
+        parser.add_argument("--output", type=str, default=None,
+                            help="Append the result as one JSON line to this file (default: print it)")
+        parser.add_argument("--label", type=str, default="", help="Free-text label stored with the result, e.g. asgi")
+
+    def handle(self, *args, **options):
+        try:
+            levels = [int(level) for level in options["levels"].split(",")]
+        except ValueError:
+            raise CommandError("--levels must be comma-separated integers")
+        if not levels or min(levels) < 1:
+            raise CommandError("--levels must all be at least 1")
+        if options["requests_per_client"] < 1:
+            raise CommandError("--requests-per-client must be at least 1")
+
+        headers = {}
+        if options["user"]:
+            user = get_user_model().objects.filter(email=options["user"]).first()
+            if user is None:
+                raise CommandError(f"No user with email {options['user']}")
+            headers["Cookie"] = session_cookie(user)
+
+        report = {"label": options["label"], **ramp(
+            options["url"], levels, options["requests_per_client"], headers,
+            timeout=options["timeout"], max_p95_ms=options["max_p95_ms"],
+        )}
+        if options["output"]:
+            with open(options["output"], "a") as fh:
+                fh.write(json.dumps(report) + "\n")
+        else:
+            self.stdout.write(json.dumps(report, indent=2))
+
+        for level in report["levels"]:
+            self.stderr.write(
+                f"{level['concurrency']:>5} connections: {level['requests_per_second']:>8} req/s, "
+                f"p95 {level['latency_ms']['p95']} ms, errors {level['error_rate']:.1%}"
+                + ("" if level["held"] else "  (not held)")
+            )
+        if report["capacity"] is None:
+            self.stderr.write(self.style.WARNING("No level held"))
+        else:
+            self.stderr.write(self.style.SUCCESS(f"Held {report['capacity']} concurrent connections"))
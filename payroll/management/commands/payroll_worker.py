@@ -0,0 +1,32 @@
+# payroll/management/commands/payroll_worker.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from payroll.models import PayrollJob
+from payroll.services.jobs import default_worker_name, run_next_job
+
+
+class Command(BaseCommand):
+    help = "Execute payroll jobs queued from the web UI, one at a time"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run queued jobs until none is left, then exit")
+        parser.add_argument("--poll-seconds", type=float, default=5.0, help="Idle wait between polls (default 5)")
+        parser.add_argument("--name", type=str, default=None, help="Worker name recorded on jobs (default host:pid)")
+
+    def handle(self, *args, **options):
+        worker = options["name"] or default_worker_name()
+        self.stdout.write(f"Payroll worker {worker} started")
+        while True:
+            job = run_next_job(worker)
+            if job is not None:
+                style = self.style.SUCCESS if job.status == PayrollJob.SUCCEEDED else self.style.WARNING
+                self.stdout.write(style(f"Job {job.pk} ({job.period}): {job.status}, {job.done}/{job.total} employees"))
+                continue
+            if options["once"]:
+                return
+            try:
+                time.sleep(options["poll_seconds"])
+            except KeyboardInterrupt:
+                return
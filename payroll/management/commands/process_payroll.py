@@ -1,10 +1,10 @@
 # payroll/management/commands/process_payroll.py
 from django.core.management.base import BaseCommand, CommandError
-from django.utils import timezone
-from decimal import Decimal as DEC
+from django.contrib.auth import get_user_model
 
-from payroll.models import PayrollPeriod, PayrollRun, Payslip
-from payroll.services.payroll_engine import PayrollEngine
+from payroll.models import PayrollPeriod, PayrollRun
+from payroll.services.parallel import ParallelRunPipeline, ShardError
+from payroll.services.run_pipeline import DEFAULT_CHUNK_SIZE, PIPELINES, IncrementalRunPipeline
 
 
 class Command(BaseCommand):
@@ -16,6 +16,44 @@ class Command(BaseCommand):
             type=str,
             help="Payroll period in format YYYY-MM (e.g. 2025-08)",
         )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=DEFAULT_CHUNK_SIZE,
+            help=f"Employees loaded, computed and written per transaction (default {DEFAULT_CHUNK_SIZE})",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=sorted(PIPELINES),
+            default="scalar",
+            help="scalar: per-employee Decimal engine; columnar: vectorized NumPy engine",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Compute id-range shards in N worker processes (default 1: in-process)",
+        )
+        parser.add_argument(
+            "--rerun",
+            type=int,
+            default=None,
+            metavar="RUN_ID",
+            help="Re-run an existing draft run, recomputing only payslips whose inputs changed",
+        )
+        parser.add_argument(
+            "--resume",
+            type=int,
+            default=None,
+            metavar="RUN_ID",
+            help="Continue an interrupted run from its checkpoint, skipping employees that already have a payslip",
+        )
+        parser.add_argument(
+            "--created-by",
+            type=str,
+            default=None,
+            help="Email of the user recorded on the run (defaults to the first superuser)",
+        )
 
     def handle(self, *args, **options):
         period_key = options["period"]
@@ -26,47 +64,107 @@ class Command(BaseCommand):
             month = int(month)
         except ValueError:
             raise CommandError("Period must be in format YYYY-MM")
+        if not 1 <= month <= 12:
+            raise CommandError("Period must be in format YYYY-MM")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1")
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1")
+
+        if options["rerun"] is not None and options["resume"] is not None:
+            raise CommandError("--rerun and --resume cannot be combined")
+        if options["rerun"] is not None:
+            return self.rerun(options["rerun"], year, month, options["chunk_size"])
+        if options["resume"] is not None:
+            return self.resume(options["resume"], year, month, options)
+
+        User = get_user_model()
+        if options["created_by"]:
+            created_by = User.objects.filter(email=options["created_by"]).first()
+        else:
+            created_by = User.objects.filter(is_superuser=True).order_by("pk").first()
+        if created_by is None:
+            raise CommandError("No user to record on the run; pass --created-by <email>")
 
         # Get or create payroll period
-        period, created = PayrollPeriod.objects.get_or_create(
-            year=year,
-            month=month,
-            defaults={"start_date": timezone.datetime(year, month, 1),
-                      "end_date": timezone.datetime(year, month, 28)}  # adjust for last day
-        )
+        period, created = PayrollPeriod.objects.get_or_create(year=year, month=month)
 
-        if not created and period.closed:
+        if not created and period.is_closed:
             self.stdout.write(self.style.WARNING(
                 f"Payroll period {period_key} is already closed."
             ))
             return
 
+        if options["mode"] == "columnar":
+            try:
+                import numpy  # noqa: F401
+            except ImportError:
+                raise CommandError("--mode columnar requires numpy (pip install numpy)")
+
         # Create payroll run
-        run = PayrollRun.objects.create(period=period, processed_at=timezone.now())
-
-        engine = PayrollEngine()
-
-        employees = period.get_employees() if hasattr(period, "get_employees") else []
-        if not employees:
-            from payroll.models import Employee
-            employees = Employee.objects.filter(active=True)
-
-        count = 0
-        for emp in employees:
-            payslip = engine.run(emp, period)
-            Payslip.objects.create(
-                run=run,
-                employee=emp,
-                period=period,
-                gross=payslip["gross"],
-                taxable=payslip["taxable"],
-                tax=payslip["tax"],
-                ssnit=payslip["ssnit"],
-                net=payslip["net"],
-                details=payslip,  # store breakdown as JSON if model has JSONField
+        run = PayrollRun.objects.create(period=period, created_by=created_by)
+        stats = self.run_pipeline(run, options)
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed payroll for {stats.employees} employees in period {period_key} "
+            f"(run {run.pk}: {stats.rows} rows in {stats.seconds:.2f}s, {stats.rows_per_second:.0f} rows/s)"
+        ))
+
+    def run_pipeline(self, run, options, resume=False):
+        if options["workers"] > 1:
+            pipeline = ParallelRunPipeline(run, chunk_size=options["chunk_size"], workers=options["workers"],
+                                           mode=options["mode"], resume=resume)
+        else:
+            pipeline = PIPELINES[options["mode"]](run, chunk_size=options["chunk_size"], resume=resume)
+        try:
+            return pipeline.execute()
+        except ShardError as exc:
+            # Shards are computed before anything is written, so nothing new is in the run.
+            for failure in exc.failures:
+                self.stderr.write(f"Shard {failure.pk_range[0]}-{failure.pk_range[1]} failed:\n{failure.error}")
+            if resume:
+                raise CommandError(f"{exc}; run {run.pk} is unchanged, resume it again with --resume {run.pk}")
+            run_pk = run.pk
+            run.delete()
+            raise CommandError(f"{exc}; run {run_pk} discarded")
+        except BaseException:
+            run.refresh_from_db(fields=["checkpoint"])
+            self.stderr.write(
+                f"Run {run.pk} stopped after employee {run.checkpoint or 'none'}; "
+                f"continue it with --resume {run.pk}"
             )
-            count += 1
+            raise
+
+    def resume(self, run_id, year, month, options):
+        run = PayrollRun.objects.select_related("period").filter(pk=run_id).first()
+        if run is None:
+            raise CommandError(f"Payroll run {run_id} does not exist")
+        if (run.period.year, run.period.month) != (year, month):
+            raise CommandError(f"Run {run_id} belongs to period {run.period}, not {year}-{month:02d}")
+        if run.status != PayrollRun.DRAFT:
+            raise CommandError(f"Run {run_id} is {run.status}; only draft runs can be resumed")
+        if run.completed_at is not None:
+            raise CommandError(f"Run {run_id} already completed; use --rerun to recompute changed payslips")
+
+        checkpoint = run.checkpoint
+        stats = self.run_pipeline(run, options, resume=True)
+        self.stdout.write(self.style.SUCCESS(
+            f"Resumed run {run.pk} after employee {checkpoint or 'none'}: {stats.employees} more employees "
+            f"({stats.rows} rows in {stats.seconds:.2f}s)"
+        ))
+
+    def rerun(self, run_id, year, month, chunk_size):
+        run = PayrollRun.objects.select_related("period").filter(pk=run_id).first()
+        if run is None:
+            raise CommandError(f"Payroll run {run_id} does not exist")
+        if (run.period.year, run.period.month) != (year, month):
+            raise CommandError(f"Run {run_id} belongs to period {run.period}, not {year}-{month:02d}")
+
+        try:
+            stats = IncrementalRunPipeline(run, chunk_size=chunk_size).execute()
+        except ValueError as exc:
+            raise CommandError(str(exc))
 
         self.stdout.write(self.style.SUCCESS(
-            f"Processed payroll for {count} employees in period {period_key}"
+            f"Re-ran run {run.pk} for period {run.period}: {stats.reused} payslips reused, "
+            f"{stats.payslips} recomputed, {stats.removed} removed ({stats.seconds:.2f}s)"
         ))
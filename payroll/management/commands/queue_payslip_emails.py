@@ -0,0 +1,27 @@
+# payroll/management/commands/queue_payslip_emails.py
+from django.core.management.base import BaseCommand, CommandError
+
+from payroll.models import PayrollRun
+from payroll.services.email_queue import email_progress, enqueue_run_emails
+
+
+class Command(BaseCommand):
+    help = "Queue payslip e-mails for an approved payroll run, or show the run's sending progress"
+
+    def add_arguments(self, parser):
+        parser.add_argument("run_id", type=int, help="ID of an approved PayrollRun")
+        parser.add_argument("--status", action="store_true", help="Only show progress; queue nothing")
+
+    def handle(self, *args, **options):
+        run = PayrollRun.objects.filter(pk=options["run_id"]).first()
+        if run is None:
+            raise CommandError(f"Payroll run {options['run_id']} does not exist")
+        if not options["status"]:
+            try:
+                queued = enqueue_run_emails(run)
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(self.style.SUCCESS(f"Queued {queued} payslip e-mails for run {run.pk}"))
+
+        progress = email_progress(run)
+        self.stdout.write(", ".join(f"{status}: {n}" for status, n in progress.items()))
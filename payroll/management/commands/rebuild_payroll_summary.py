@@ -0,0 +1,32 @@
+# payroll/management/commands/rebuild_payroll_summary.py
+from django.core.management.base import BaseCommand, CommandError
+
+from payroll.models import PayrollPeriod
+from payroll.services.summary import rebuild_period_summary
+
+
+class Command(BaseCommand):
+    help = "Rebuild the PayrollSummary table for one period (YYYY-MM) or for every period"
+
+    def add_arguments(self, parser):
+        parser.add_argument("period", nargs="?", type=str, help="Payroll period in format YYYY-MM")
+        parser.add_argument("--all", action="store_true", help="Rebuild every period")
+
+    def handle(self, *args, **options):
+        if options["all"]:
+            periods = PayrollPeriod.objects.all()
+        elif options["period"]:
+            try:
+                year, month = (int(part) for part in options["period"].split("-"))
+            except ValueError:
+                raise CommandError("Period must be in format YYYY-MM")
+            periods = PayrollPeriod.objects.filter(year=year, month=month)
+            if not periods:
+                raise CommandError(f"Payroll period {options['period']} does not exist")
+        else:
+            raise CommandError("Give a period (YYYY-MM) or --all")
+
+        for period in periods:
+            rows = rebuild_period_summary(period)
+            self.stdout.write(f"{period}: {rows} summary rows")
+        self.stdout.write(self.style.SUCCESS("Payroll summary rebuilt."))
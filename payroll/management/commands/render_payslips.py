@@ -0,0 +1,26 @@
+# payroll/management/commands/render_payslips.py
+from django.core.management.base import BaseCommand, CommandError
+
+from payroll.models import PayrollRun
+from payroll.services.payslip_pdf import pdf_dir, render_run_pdfs
+
+
+class Command(BaseCommand):
+    help = "Render (or reuse cached) PDF payslips for every payslip of a payroll run"
+
+    def add_arguments(self, parser):
+        parser.add_argument("run_id", type=int, help="ID of the PayrollRun")
+        parser.add_argument("--workers", type=int, default=1, help="Render in N worker processes (default 1)")
+
+    def handle(self, *args, **options):
+        if options["workers"] < 1:
+            raise CommandError("--workers must be at least 1")
+        run = PayrollRun.objects.filter(pk=options["run_id"]).first()
+        if run is None:
+            raise CommandError(f"Payroll run {options['run_id']} does not exist")
+
+        stats = render_run_pdfs(run, workers=options["workers"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Run {run.pk}: {stats.payslips} payslips, {stats.rendered} rendered, {stats.cached} already cached "
+            f"in {pdf_dir()} ({stats.seconds:.2f}s)"
+        ))
@@ -0,0 +1,22 @@
+# payroll/management/commands/rollback_payroll.py
+from django.core.management.base import BaseCommand, CommandError
+
+from payroll.models import PayrollRun
+from payroll.services.approval import rollback_run
+
+
+class Command(BaseCommand):
+    help = "Move an approved payroll run back to draft"
+
+    def add_arguments(self, parser):
+        parser.add_argument("run_id", type=int)
+
+    def handle(self, *args, **options):
+        run = PayrollRun.objects.filter(pk=options["run_id"]).first()
+        if run is None:
+            raise CommandError(f"Payroll run {options['run_id']} does not exist")
+        try:
+            run = rollback_run(run)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(f"Rolled back run {run.pk} for period {run.period} to draft"))
@@ -0,0 +1,52 @@
+# payroll/management/commands/send_payslip_emails.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payroll.models import PayrollRun
+from payroll.services.email_queue import DEFAULT_BATCH_SIZE, SendStats, run_workers
+
+
+class Command(BaseCommand):
+    help = (
+        "Send queued payslip e-mails in batches over reused SMTP connections. "
+        "For local testing run a debugging SMTP server and point EMAIL_HOST/EMAIL_PORT at it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--run", type=int, default=None, metavar="RUN_ID", help="Only send this run's e-mails")
+        parser.add_argument("--concurrency", type=int, default=1,
+                            help="Worker threads, each with its own SMTP connection (default 1)")
+        parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                            help=f"E-mails claimed per batch (default {DEFAULT_BATCH_SIZE})")
+        parser.add_argument("--loop", action="store_true",
+                            help="Keep polling for due e-mails (retries included) instead of exiting when idle")
+        parser.add_argument("--poll-seconds", type=float, default=15.0)
+
+    def handle(self, *args, **options):
+        if options["concurrency"] < 1:
+            raise CommandError("--concurrency must be at least 1")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1")
+        run = None
+        if options["run"] is not None:
+            run = PayrollRun.objects.filter(pk=options["run"]).first()
+            if run is None:
+                raise CommandError(f"Payroll run {options['run']} does not exist")
+
+        total = SendStats()
+        while True:
+            stats = run_workers(options["concurrency"], options["batch_size"], run)
+            total.add(stats)
+            if stats.sent or stats.retried or stats.failed:
+                self.stdout.write(f"sent {stats.sent}, retrying {stats.retried}, failed {stats.failed}")
+            if not options["loop"]:
+                break
+            try:
+                time.sleep(options["poll_seconds"])
+            except KeyboardInterrupt:
+                break
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Sent {total.sent} payslip e-mails ({total.retried} to retry, {total.failed} failed)"
+        ))
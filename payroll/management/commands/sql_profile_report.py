@@ -0,0 +1,93 @@
+# payroll/management/commands/sql_profile_report.py
+import json
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+SORT_KEYS = {
+    "sql_ms": "total SQL time",
+    "queries": "queries per request",
+    "duplicates": "repeated queries per request",
+}
+
+
+def read_records(lines):
+    """Profile records from log lines; anything before the JSON object (timestamps, levels) is ignored."""
+    for line in lines:
+        start = line.find("{")
+        if start < 0:
+            continue
+        try:
+            record = json.loads(line[start:])
+        except ValueError:
+            continue
+        if isinstance(record, dict) and "queries" in record and "sql_ms" in record:
+            yield record
+
+
+def aggregate(records) -> list[dict]:
+    views = defaultdict(lambda: {"requests": 0, "sql_ms": 0.0, "queries": 0, "duplicates": 0,
+                                 "max_queries": 0, "groups": defaultdict(int)})
+    for record in records:
+        row = views[record.get("view") or record.get("path") or "?"]
+        row["requests"] += 1
+        row["sql_ms"] += record["sql_ms"]
+        row["queries"] += record["queries"]
+        row["duplicates"] += record.get("duplicate_queries", 0)
+        row["max_queries"] = max(row["max_queries"], record["queries"])
+        for group in record.get("duplicate_groups", []):
+            row["groups"][group["sql"]] += group["count"]
+    report = []
+    for view, row in views.items():
+        n = row["requests"]
+        worst = max(row["groups"].items(), key=lambda item: item[1], default=(None, 0))
+        report.append({
+            "view": view,
+            "requests": n,
+            "sql_ms": round(row["sql_ms"], 2),
+            "avg_sql_ms": round(row["sql_ms"] / n, 2),
+            "avg_queries": round(row["queries"] / n, 1),
+            "max_queries": row["max_queries"],
+            "avg_duplicates": round(row["duplicates"] / n, 1),
+            "worst_repeated_sql": worst[0],
+            "worst_repeated_count": worst[1],
+        })
+    return report
+
+
+class Command(BaseCommand):
+    help = "Aggregate payroll.sql_profile log lines into a per-view report of the worst offenders"
+
+    def add_arguments(self, parser):
+        parser.add_argument("logfile", nargs="+", help="Log file(s) written by SQLProfileMiddleware")
+        parser.add_argument("--sort", choices=sorted(SORT_KEYS), default="sql_ms")
+        parser.add_argument("--top", type=int, default=20, help="Number of views to show (default 20)")
+        parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+
+    def handle(self, *args, **options):
+        records = []
+        for path in options["logfile"]:
+            try:
+                with open(path) as fh:
+                    records.extend(read_records(fh))
+            except OSError as exc:
+                raise CommandError(f"Cannot read {path}: {exc}")
+        if not records:
+            raise CommandError("No SQL profile records found")
+
+        sort_key = {"sql_ms": "sql_ms", "queries": "avg_queries", "duplicates": "avg_duplicates"}[options["sort"]]
+        report = sorted(aggregate(records), key=lambda row: row[sort_key], reverse=True)[: options["top"]]
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"{len(records)} profiled requests, worst views by {SORT_KEYS[options['sort']]}:")
+        self.stdout.write(f"{'view':<32} {'reqs':>6} {'sql ms':>10} {'avg ms':>8} {'avg q':>7} {'max q':>6} {'dup q':>6}")
+        for row in report:
+            self.stdout.write(
+                f"{row['view'][:32]:<32} {row['requests']:>6} {row['sql_ms']:>10.1f} {row['avg_sql_ms']:>8.2f} "
+                f"{row['avg_queries']:>7.1f} {row['max_queries']:>6} {row['avg_duplicates']:>6.1f}"
+            )
+            if row["worst_repeated_sql"]:
+                self.stdout.write(f"    repeated x{row['worst_repeated_count']}: {row['worst_repeated_sql'][:110]}")
@@ -0,0 +1,30 @@
+# payroll/management/commands/sync_reporting_db.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payroll.services.reporting_sync import sync_reporting_db
+
+
+class Command(BaseCommand):
+    help = "Refresh the SQLite snapshot behind the reporting database alias"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", type=str, default=None,
+                            help="Reporting alias to refresh (default: PAYROLL_REPORTING_DB)")
+        parser.add_argument("--loop", action="store_true", help="Keep refreshing every --interval seconds")
+        parser.add_argument("--interval", type=float, default=60.0)
+
+    def handle(self, *args, **options):
+        while True:
+            try:
+                path, seconds = sync_reporting_db(options["database"])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            self.stdout.write(self.style.SUCCESS(f"Reporting snapshot {path} refreshed in {seconds:.2f}s"))
+            if not options["loop"]:
+                return
+            try:
+                time.sleep(options["interval"])
+            except KeyboardInterrupt:
+                return
@@ -0,0 +1,77 @@
+# payroll/management/commands/variance_report.py
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.serializers.json import DjangoJSONEncoder
+
+from payroll.models import PayrollRun
+from payroll.services.variance import (
+    OK, STATUSES, Thresholds, iter_variance_csv, previous_run, prior_period, variance_rows, variance_summary,
+)
+
+
+class Command(BaseCommand):
+    help = "Compare every payslip of a run with the same employee's payslip in the previous month's approved run"
+
+    def add_arguments(self, parser):
+        parser.add_argument("run_id", type=int)
+        parser.add_argument("--net-pct", type=float, default=None,
+                            help="Flag net pay changes of at least this percentage (PAYROLL_VARIANCE_NET_PCT)")
+        parser.add_argument("--gross-pct", type=float, default=None,
+                            help="Flag gross pay changes of at least this percentage (PAYROLL_VARIANCE_GROSS_PCT)")
+        parser.add_argument("--min-amount", type=str, default=None,
+                            help="Ignore changes smaller than this amount (PAYROLL_VARIANCE_MIN_AMOUNT)")
+        parser.add_argument("--only", type=str, default=None,
+                            help=f"Comma-separated statuses to include ({', '.join(STATUSES)}); "
+                                 f"default: all but {OK} for text, everything for exports")
+        parser.add_argument("--format", choices=["text", "csv", "json"], default="text")
+        parser.add_argument("--output", type=str, default=None, help="Write the export here instead of stdout")
+
+    def handle(self, *args, **options):
+        run = PayrollRun.objects.select_related("period").filter(pk=options["run_id"]).first()
+        if run is None:
+            raise CommandError(f"Payroll run {options['run_id']} does not exist")
+        try:
+            thresholds = Thresholds.from_settings(net_pct=options["net_pct"], gross_pct=options["gross_pct"],
+                                                  amount=options["min_amount"])
+        except ArithmeticError:
+            raise CommandError("--min-amount must be a number")
+        statuses = None
+        if options["only"]:
+            statuses = [status.strip() for status in options["only"].split(",")]
+            unknown = set(statuses) - set(STATUSES)
+            if unknown:
+                raise CommandError(f"Unknown status {', '.join(sorted(unknown))}; choose from {', '.join(STATUSES)}")
+        elif options["format"] == "text":
+            statuses = [status for status in STATUSES if status != OK]
+
+        previous = previous_run(run)
+        compared = "{}-{:02d}".format(*prior_period(run.period))
+        started = time.perf_counter()
+        rows = list(variance_rows(run, previous, thresholds, statuses))
+        seconds = time.perf_counter() - started
+
+        fh = open(options["output"], "w", newline="") if options["output"] else None
+        write = fh.write if fh else (lambda text: self.stdout.write(text, ending=""))
+        try:
+            if options["format"] == "csv":
+                for line in iter_variance_csv(rows):
+                    write(line)
+            elif options["format"] == "json":
+                write(json.dumps({"run": run.pk, "previous_period": compared,
+                                  "previous_run": previous.pk if previous else None, "rows": rows},
+                                 cls=DjangoJSONEncoder, indent=2) + "\n")
+            else:
+                for row in rows:
+                    change = "" if row["net_pct"] is None else f" net {row['net_delta']:+} ({row['net_pct']:+}%)"
+                    write(f"{row['status']:<8} {row['employee_id']:>7} {row['first_name']} {row['last_name']}{change}\n")
+        finally:
+            if fh:
+                fh.close()
+
+        against = f"run {previous.pk} ({previous.period})" if previous else f"no approved run for {compared}"
+        counts = ", ".join(f"{n} {status}" for status, n in sorted(variance_summary(rows).items()))
+        self.stderr.write(self.style.SUCCESS(
+            f"Run {run.pk} ({run.period}) against {against}: {counts or 'no rows'} in {seconds:.2f}s"
+        ))
@@ -0,0 +1,25 @@
+# payroll/management/commands/verify_ytd.py
+from django.core.management.base import BaseCommand, CommandError
+
+from payroll.services.ytd import verify_ytd
+
+
+class Command(BaseCommand):
+    help = "Rebuild the year-to-date totals from the payslips and report rows that drifted"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--year", type=int, default=None, help="Only check this year")
+        parser.add_argument("--repair", action="store_true", help="Rewrite drifted rows from the payslips")
+
+    def handle(self, *args, **options):
+        drift = verify_ytd(options["year"], repair=options["repair"])
+        for d in drift:
+            self.stdout.write(f"employee {d.employee_id} {d.year} {d.field}: stored {d.stored}, expected {d.expected}")
+
+        rows = len({(d.employee_id, d.year) for d in drift})
+        if not drift:
+            self.stdout.write(self.style.SUCCESS("Year-to-date totals match the payslips."))
+        elif options["repair"]:
+            self.stdout.write(self.style.SUCCESS(f"Repaired {rows} year-to-date rows."))
+        else:
+            raise CommandError(f"{rows} year-to-date rows drifted; run with --repair to rewrite them")
@@ -0,0 +1,164 @@
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+
+from payroll.db_router import SESSION_LAST_WRITE
+
+logger = logging.getLogger("payroll.sql_profile")
+
+# A statement repeated this many times within one request is reported as a
+# duplicate group: the usual shape of an N+1 such as Employee.__str__
+# loading self.user once per row.
+DEFAULT_DUPLICATE_THRESHOLD = 3
+MAX_REPORTED_GROUPS = 5
+
+
+class _QueryRecorder:
+    """execute_wrapper that times every statement and counts them by SQL template."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+        self.templates = Counter()
+        self.template_seconds = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.seconds += elapsed
+            self.templates[sql] += 1
+            self.template_seconds[sql] += elapsed
+
+    def duplicates(self, threshold):
+        return [
+            {"sql": sql[:300], "count": n, "ms": round(self.template_seconds[sql] * 1000, 2)}
+            for sql, n in self.templates.most_common()
+            if n >= threshold
+        ]
+
+
+class SQLProfileMiddleware:
+    """
+    Samples requests (PAYROLL_SQL_PROFILE_SAMPLE_RATE, 0 to 1) and records
+    their SQL: total time, query count and groups of repeated statements.
+    The numbers go out in a Server-Timing header and as one JSON log line on
+    the "payroll.sql_profile" logger, which the sql_profile_report command
+    aggregates per view. Parameters are never logged. Streaming responses
+    only count the queries made before the response is returned.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def sampled(self, request):
+        rate = getattr(settings, "PAYROLL_SQL_PROFILE_SAMPLE_RATE", 0.0)
+        return rate > 0 and random.random() < rate
+
+    @staticmethod
+    def wrap_connections(recorder) -> ExitStack:
+        stack = ExitStack()
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+        return stack
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not self.sampled(request):
+            return self.get_response(request)
+        recorder = _QueryRecorder()
+        started = time.perf_counter()
+        with self.wrap_connections(recorder):
+            response = self.get_response(request)
+        return self.report(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        if not self.sampled(request):
+            return await self.get_response(request)
+        recorder = _QueryRecorder()
+        started = time.perf_counter()
+        # Connections are per thread: install the wrappers on the thread that
+        # runs this request's sync_to_async ORM calls, not on the event loop.
+        stack = await sync_to_async(self.wrap_connections)(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.report(request, response, recorder, started)
+
+    def report(self, request, response, recorder, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        threshold = getattr(settings, "PAYROLL_SQL_PROFILE_DUPLICATE_THRESHOLD", DEFAULT_DUPLICATE_THRESHOLD)
+        duplicates = recorder.duplicates(threshold)
+        sql_ms = recorder.seconds * 1000
+        match = request.resolver_match
+        record = {
+            "view": match.view_name if match else None,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "total_ms": round(total_ms, 2),
+            "sql_ms": round(sql_ms, 2),
+            "queries": recorder.count,
+            "duplicate_queries": sum(group["count"] for group in duplicates),
+            "duplicate_groups": duplicates[:MAX_REPORTED_GROUPS],
+        }
+        logger.info(json.dumps(record))
+
+        timing = (f'sql;dur={sql_ms:.2f};desc="{recorder.count} queries", '
+                  f'dupes;desc="{len(duplicates)} repeated statements", app;dur={total_ms:.2f}')
+        response["Server-Timing"] = ", ".join(filter(None, [response.get("Server-Timing"), timing]))
+        return response
+
+
+class ReadYourWritesMiddleware:
+    """
+    Stamps the session when a user sends a write request, so reporting
+    views keep reading that user's data from default until the reporting
+    copy has caught up (see payroll.db_router). Must come after
+    SessionMiddleware and AuthenticationMiddleware.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        response = self.get_response(request)
+        user = getattr(request, "user", None)
+        if request.method not in self.SAFE_METHODS and user is not None and user.is_authenticated:
+            request.session[SESSION_LAST_WRITE] = time.time()
+        return response
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        if request.method not in self.SAFE_METHODS and hasattr(request, "auser"):
+            user = await request.auser()
+            if user.is_authenticated:
+                await request.session.aset(SESSION_LAST_WRITE, time.time())
+        return response
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0005_employee_bank_branch'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='allowance',
+            name='employee_id',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='allowances', to='payroll.employee'),
+        ),
+        migrations.AddField(
+            model_name='deduction',
+            name='employee_id',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='deductions', to='payroll.employee'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0006_allowance_deduction_employee'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='payslip',
+            name='fingerprint',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
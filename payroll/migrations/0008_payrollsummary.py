@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0007_payslip_fingerprint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayrollSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('employment_type', models.CharField(choices=[('permanent', 'Permanent'), ('contract', 'Contract'), ('adjunct', 'Adjunct')], max_length=20)),
+                ('headcount', models.PositiveIntegerField(default=0)),
+                ('gross_pay', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('tax', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('statutory_employee', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('statutory_employer', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_deductions', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('net_pay', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('department', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='payroll_summaries', to='payroll.department')),
+                ('period', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='summaries', to='payroll.payrollperiod')),
+            ],
+            options={
+                'ordering': ['-period__year', '-period__month', 'department__name', 'employment_type'],
+                'unique_together': {('period', 'department', 'employment_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,80 @@
+from django.db import DatabaseError, migrations, transaction
+
+# SQLite-only FTS5 index over employee search fields, kept in sync by
+# triggers so every write path (ORM, bulk, raw SQL, admin) updates it.
+# Other backends, or SQLite builds without FTS5, fall back to LIKE filters
+# (see payroll.services.search).
+
+FTS_COLUMNS = "first_name, last_name, email, phone, position, department, bank_account_number"
+ROW_SELECT = (
+    "SELECT e.id, e.first_name, e.last_name, e.email, e.phone, e.position, "
+    "COALESCE(d.name, ''), e.bank_account_number "
+    "FROM payroll_employee e LEFT JOIN payroll_department d ON d.id = e.department_id"
+)
+
+
+def _row_values(alias):
+    return (
+        f"{alias}.id, {alias}.first_name, {alias}.last_name, {alias}.email, {alias}.phone, {alias}.position, "
+        f"COALESCE((SELECT name FROM payroll_department WHERE id = {alias}.department_id), ''), "
+        f"{alias}.bank_account_number"
+    )
+
+
+CREATE_SQL = [
+    f"CREATE VIRTUAL TABLE payroll_employee_fts USING fts5({FTS_COLUMNS}, tokenize = 'unicode61')",
+    f"INSERT INTO payroll_employee_fts (rowid, {FTS_COLUMNS}) {ROW_SELECT}",
+    f"""CREATE TRIGGER payroll_employee_fts_ai AFTER INSERT ON payroll_employee BEGIN
+        INSERT INTO payroll_employee_fts (rowid, {FTS_COLUMNS}) VALUES ({_row_values('new')});
+    END""",
+    f"""CREATE TRIGGER payroll_employee_fts_au AFTER UPDATE ON payroll_employee BEGIN
+        DELETE FROM payroll_employee_fts WHERE rowid = old.id;
+        INSERT INTO payroll_employee_fts (rowid, {FTS_COLUMNS}) VALUES ({_row_values('new')});
+    END""",
+    """CREATE TRIGGER payroll_employee_fts_ad AFTER DELETE ON payroll_employee BEGIN
+        DELETE FROM payroll_employee_fts WHERE rowid = old.id;
+    END""",
+    f"""CREATE TRIGGER payroll_department_fts_au AFTER UPDATE OF name ON payroll_department BEGIN
+        DELETE FROM payroll_employee_fts
+            WHERE rowid IN (SELECT id FROM payroll_employee WHERE department_id = new.id);
+        INSERT INTO payroll_employee_fts (rowid, {FTS_COLUMNS})
+            {ROW_SELECT} WHERE e.department_id = new.id;
+    END""",
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS payroll_department_fts_au",
+    "DROP TRIGGER IF EXISTS payroll_employee_fts_ad",
+    "DROP TRIGGER IF EXISTS payroll_employee_fts_au",
+    "DROP TRIGGER IF EXISTS payroll_employee_fts_ai",
+    "DROP TABLE IF EXISTS payroll_employee_fts",
+]
+
+
+def create_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            for sql in CREATE_SQL:
+                schema_editor.execute(sql)
+    except DatabaseError:
+        pass  # no FTS5 in this SQLite build; search falls back to LIKE
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for sql in DROP_SQL:
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0008_payrollsummary'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
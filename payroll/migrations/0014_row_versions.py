@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:45
+
+import importlib
+
+from django.db import migrations, models
+
+# SQLite rebuilds payroll_employee to add a column, which the FTS triggers
+# of 0009 cannot survive; take the index down around the change.
+fts = importlib.import_module("payroll.migrations.0009_employee_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0013_run_checkpoint'),
+    ]
+
+    operations = [
+        migrations.RunPython(fts.drop_fts, fts.create_fts),
+        migrations.AddField(
+            model_name='employee',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.RunPython(fts.create_fts, fts.drop_fts),
+        migrations.AddField(
+            model_name='payrollperiod',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='payrollrun',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='payslip',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+
+YTD_FIELDS = ("gross_pay", "taxable_income", "tax", "statutory_employee", "statutory_employer",
+              "total_deductions", "net_pay")
+
+
+def backfill_year_to_date(apps, schema_editor):
+    Payslip = apps.get_model("payroll", "Payslip")
+    YearToDate = apps.get_model("payroll", "YearToDate")
+    rows = (
+        Payslip.objects.filter(run__status__in=["approved", "paid"])
+        .values("employee_id", year=F("run__period__year"))
+        .annotate(payslips=Count("pk"), **{field: Sum(field) for field in YTD_FIELDS})
+        .order_by()
+    )
+    YearToDate.objects.bulk_create([YearToDate(**row) for row in rows], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('payroll', '0014_row_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='YearToDate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField()),
+                ('payslips', models.PositiveIntegerField(default=0)),
+                ('gross_pay', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('taxable_income', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('tax', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('statutory_employee', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('statutory_employer', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_deductions', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('net_pay', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='year_to_date', to='payroll.employee')),
+            ],
+            options={
+                'ordering': ['-year', 'employee_id'],
+                'unique_together': {('employee', 'year')},
+            },
+        ),
+        migrations.RunPython(backfill_year_to_date, migrations.RunPython.noop),
+    ]
@@ -1,4 +1,6 @@
 from __future__ import annotations
+import calendar
+from datetime import date
 from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator
@@ -53,6 +55,11 @@ class Employee(models.Model):
     basic_salary = models.DecimalField(max_digits=12, decimal_places=2)
     date_created = models.DateField(auto_now_add=True)
     is_active = models.BooleanField(default=True)
+    # Row version for API ETags; writes that bypass save() must set it too.
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["is_active", "department"], name="employee_active_dept_idx")]
 
     def __str__(self):
 
@@ -82,7 +89,7 @@ class DeductionType(models.Model):
         return self.name
 
 class Allowance(models.Model):
-
+    employee_id = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="allowances", null=True, blank=True)
     allowance_type = models.ForeignKey(AllowanceType, on_delete=models.PROTECT)
     amount = models.DecimalField(max_digits=12, decimal_places=2, validators=[MinValueValidator(0)])
     active = models.BooleanField(default=True)
@@ -91,6 +98,7 @@ class Allowance(models.Model):
         unique_together = ("id", "amount")
 
 class Deduction(models.Model):
+    employee_id = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="deductions", null=True, blank=True)
     deduction_type = models.ForeignKey(DeductionType, on_delete=models.PROTECT)
     amount = models.DecimalField(max_digits=12, decimal_places=2, validators=[MinValueValidator(0)])
     active = models.BooleanField(default=True)
@@ -131,6 +139,7 @@ class PayrollPeriod(models.Model):
     year = models.PositiveIntegerField()
     month = models.PositiveIntegerField()  # 1–12
     is_closed = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("year", "month")
@@ -139,6 +148,14 @@ class PayrollPeriod(models.Model):
     def __str__(self):
         return f"{self.year}-{self.month:02d}"
 
+    @property
+    def start_date(self) -> date:
+        return date(self.year, self.month, 1)
+
+    @property
+    def end_date(self) -> date:
+        return date(self.year, self.month, calendar.monthrange(self.year, self.month)[1])
+
 class PayrollRun(models.Model):
     DRAFT = "draft"
     APPROVED = "approved"
@@ -149,6 +166,11 @@ class PayrollRun(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(User, on_delete=models.PROTECT, related_name="payroll_created")
     status = models.CharField(max_length=20, choices=STATUS, default=DRAFT)
+    # Highest employee pk whose payslip is committed; advanced with every chunk
+    # so an interrupted run can be resumed (see services.run_pipeline).
+    checkpoint = models.PositiveBigIntegerField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Run {self.id} – {self.period} ({self.status})"
@@ -163,6 +185,8 @@ class Payslip(models.Model):
     statutory_employer = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     total_deductions = models.DecimalField(max_digits=12, decimal_places=2)
     net_pay = models.DecimalField(max_digits=12, decimal_places=2)
+    fingerprint = models.CharField(max_length=64, blank=True)  # hash of the engine inputs; see services.fingerprint
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ("run", "employee_id")
@@ -177,6 +201,127 @@ class PayslipLine(models.Model):
     label = models.CharField(max_length=120)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
 
+class PayrollSummary(models.Model):
+    """
+    Totals of approved payslips per (period, department, employment_type),
+    rebuilt by services.summary when a run is approved.
+    """
+    period = models.ForeignKey(PayrollPeriod, on_delete=models.CASCADE, related_name="summaries")
+    department = models.ForeignKey(Department, on_delete=models.CASCADE, related_name="payroll_summaries", null=True, blank=True)
+    employment_type = models.CharField(max_length=20, choices=Employee.EMPLOYMENT_TYPES)
+    headcount = models.PositiveIntegerField(default=0)
+    gross_pay = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    tax = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    statutory_employee = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    statutory_employer = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_deductions = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    net_pay = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("period", "department", "employment_type")
+        ordering = ["-period__year", "-period__month", "department__name", "employment_type"]
+
+    def __str__(self):
+        return f"{self.period} – {self.department or 'No department'} ({self.employment_type})"
+
+class YearToDate(models.Model):
+    """
+    Running totals of an employee's approved payslips for one calendar year,
+    added to by approve_run and subtracted from by rollback_run
+    (services.ytd). verify_ytd rebuilds them from the payslips.
+    """
+    employee = models.ForeignKey(Employee, on_delete=models.CASCADE, related_name="year_to_date")
+    year = models.PositiveIntegerField()
+    payslips = models.PositiveIntegerField(default=0)
+    gross_pay = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    taxable_income = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    tax = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    statutory_employee = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    statutory_employer = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_deductions = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    net_pay = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ("employee", "year")
+        ordering = ["-year", "employee_id"]
+
+    def __str__(self):
+        return f"{self.employee} – {self.year}"
+
+class PayrollJob(models.Model):
+    """
+    A payroll run requested from the web UI and executed by the
+    payroll_worker command (see services.jobs). At most one job per period
+    can be running; a running job whose heartbeat is older than the lease
+    is taken over by another worker and resumed from its run's checkpoint.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    STATUS = [(QUEUED, "Queued"), (RUNNING, "Running"), (SUCCEEDED, "Succeeded"), (FAILED, "Failed"),
+              (CANCELLED, "Cancelled")]
+    ACTIVE = (QUEUED, RUNNING)
+
+    period = models.ForeignKey(PayrollPeriod, on_delete=models.CASCADE, related_name="jobs")
+    run = models.ForeignKey(PayrollRun, on_delete=models.SET_NULL, related_name="jobs", null=True, blank=True)
+    mode = models.CharField(max_length=20, default="scalar")
+    chunk_size = models.PositiveIntegerField(default=500)
+    status = models.CharField(max_length=20, choices=STATUS, default=QUEUED)
+    cancel_requested = models.BooleanField(default=False)
+    total = models.PositiveIntegerField(default=0)
+    done = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=120, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.PROTECT, related_name="payroll_jobs")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["period"], condition=models.Q(status="running"),
+                                    name="one_running_job_per_period"),
+        ]
+        indexes = [models.Index(fields=["status", "created_at"], name="payroll_job_status_idx")]
+
+    def __str__(self):
+        return f"Job {self.id} – {self.period} ({self.status})"
+
+class PayslipEmail(models.Model):
+    """
+    Outbound payslip e-mail, queued when a run is approved and sent by the
+    send_payslip_emails worker (see services.email_queue).
+    """
+    QUEUED = "queued"
+    SENDING = "sending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS = [(QUEUED, "Queued"), (SENDING, "Sending"), (SENT, "Sent"), (FAILED, "Failed")]
+
+    run = models.ForeignKey(PayrollRun, on_delete=models.CASCADE, related_name="emails")
+    payslip = models.OneToOneField(Payslip, on_delete=models.CASCADE, related_name="email")
+    to_address = models.EmailField()
+    status = models.CharField(max_length=10, choices=STATUS, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim_token = models.CharField(max_length=32, blank=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "next_attempt_at"], name="payslip_email_due_idx")]
+
+    def __str__(self):
+        return f"Payslip {self.payslip_id} to {self.to_address} ({self.status})"
+
 class PayrollRecord(models.Model):
     """
     Stores each payroll line item (component) linked to a Payslip.
@@ -205,6 +350,10 @@ class PayrollRecord(models.Model):
 
     class Meta:
         ordering = ["employee_id", "component_type"]
+        indexes = [
+            models.Index(fields=["employee_id", "period_start"], name="record_employee_period_idx"),
+            models.Index(fields=["period_start"], name="record_period_idx"),
+        ]
 
     def __str__(self):
         return f"{self.employee_id} - {self.component_type}: {self.amount}"
@@ -0,0 +1,180 @@
+import base64
+import hashlib
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, connections
+from django.db.models import Q
+
+COUNT_CACHE_SECONDS = 300
+
+
+class KeysetPage:
+    """One page of a KeysetPaginator; iterable like a Django Page."""
+
+    def __init__(self, object_list, has_next, has_previous, next_cursor, previous_cursor, total=None):
+        self.object_list = object_list
+        self.has_next = has_next
+        self.has_previous = has_previous
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.total = total
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Cursor pagination on the queryset's ordering (model Meta.ordering unless
+    given), with the primary key appended as a tie-breaker. Each page is one
+    indexed range query: no COUNT(*) and no OFFSET, however deep the page.
+    Ordering fields must be non-null.
+    """
+
+    def __init__(self, queryset, per_page=20, ordering=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        ordering = list(ordering or queryset.query.order_by or queryset.model._meta.ordering or [])
+        if not any(f.lstrip("-") in ("pk", queryset.model._meta.pk.name) for f in ordering):
+            ordering.append("pk")
+        self.ordering = ordering
+
+    def _attname(self, name):
+        meta = self.queryset.model._meta
+        if name == "pk":
+            return meta.pk.attname
+        if name in self.queryset.query.annotations:
+            return name
+        return meta.get_field(name).attname
+
+    def _key(self, obj):
+        return [getattr(obj, self._attname(f.lstrip("-"))) for f in self.ordering]
+
+    def _encode(self, obj, direction):
+        payload = json.dumps({"d": direction, "k": self._key(obj)}, cls=DjangoJSONEncoder)
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def _decode(self, cursor):
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if payload["d"] in ("n", "p") and len(payload["k"]) == len(self.ordering):
+                return payload["d"], payload["k"]
+        except (ValueError, KeyError, TypeError):
+            pass
+        return None, None
+
+    def _after(self, key, backwards):
+        """Q for rows strictly after `key` in the ordering (before it if backwards)."""
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            name = field.lstrip("-")
+            ascending = not field.startswith("-")
+            op = "gt" if ascending != backwards else "lt"
+            term = Q(**{f"{name}__{op}": key[i]})
+            for prev_field, prev_value in zip(self.ordering[:i], key[:i]):
+                term &= Q(**{prev_field.lstrip("-"): prev_value})
+            condition |= term
+        return condition
+
+    def _page_query(self, cursor):
+        """(queryset for one page plus a look-ahead row, cursor key, backwards)."""
+        direction, key = self._decode(cursor) if cursor else (None, None)
+        backwards = direction == "p"
+        ordering = [f[1:] if f.startswith("-") else f"-{f}" for f in self.ordering] if backwards else self.ordering
+        qs = self.queryset.order_by(*ordering)
+        if key is not None:
+            qs = qs.filter(self._after(key, backwards))
+        return qs[: self.per_page + 1], key, backwards
+
+    def _page(self, rows, key, backwards, total):
+        more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if backwards:
+            rows.reverse()
+            has_next, has_previous = True, more
+        else:
+            has_next, has_previous = more, key is not None
+        return KeysetPage(
+            rows,
+            has_next=has_next and bool(rows),
+            has_previous=has_previous and bool(rows),
+            next_cursor=self._encode(rows[-1], "n") if rows else None,
+            previous_cursor=self._encode(rows[0], "p") if rows else None,
+            total=total,
+        )
+
+    def get_page(self, cursor=None, with_count=False):
+        qs, key, backwards = self._page_query(cursor)
+        rows = list(qs)
+        return self._page(rows, key, backwards, approximate_count(self.queryset) if with_count else None)
+
+    async def aget_page(self, cursor=None, with_count=False):
+        qs, key, backwards = self._page_query(cursor)
+        rows = [obj async for obj in qs]
+        return self._page(rows, key, backwards, await aapproximate_count(self.queryset) if with_count else None)
+
+
+def _table_estimate(model, using):
+    """Row estimate from planner statistics, or None when there are none."""
+    connection = connections[using]
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [table])
+            elif connection.vendor == "sqlite":
+                # Filled in by ANALYZE; the first number of `stat` is the row count.
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if not row:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    return estimate if estimate >= 0 else None
+
+
+def _count_key(queryset):
+    sql, params = queryset.query.sql_with_params()
+    return "payroll:count:" + hashlib.md5(f"{queryset.db}:{sql}:{params}".encode()).hexdigest()
+
+
+def approximate_count(queryset, timeout=COUNT_CACHE_SECONDS):
+    """
+    Table statistics for an unfiltered queryset, otherwise an exact COUNT;
+    either is cached for `timeout` seconds per distinct query. An empty
+    (.none()) queryset has no SQL to key on and counts 0.
+    """
+    if queryset.query.is_empty():
+        return 0
+    key = _count_key(queryset)
+    count = cache.get(key)
+    if count is None:
+        count = _table_estimate(queryset.model, queryset.db) if not queryset.query.where else None
+        if count is None:
+            count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+async def aapproximate_count(queryset, timeout=COUNT_CACHE_SECONDS):
+    """approximate_count for async views."""
+    if queryset.query.is_empty():
+        return 0
+    key = _count_key(queryset)
+    count = await cache.aget(key)
+    if count is None:
+        if not queryset.query.where:
+            count = await sync_to_async(_table_estimate)(queryset.model, queryset.db)
+        if count is None:
+            count = await queryset.acount()
+        await cache.aset(key, count, timeout)
+    return count
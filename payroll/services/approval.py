@@ -0,0 +1,52 @@
+from __future__ import annotations
+from django.db import transaction
+from payroll.models import PayrollPeriod, PayrollRun, PayslipEmail
+from payroll.services.summary import COUNTED_STATUSES, rebuild_period_summary
+from payroll.services.ytd import post_run, unpost_run
+
+
+def approve_run(run: PayrollRun) -> PayrollRun:
+    """
+    Move a finished draft run of an open period to approved and refresh the derived period and
+    year-to-date tables in the same transaction. A period has at most one
+    approved (or paid) run; roll it back before approving another.
+    """
+    with transaction.atomic():
+        # Lock the period first so two runs of it cannot be approved concurrently.
+        PayrollPeriod.objects.select_for_update().get(pk=run.period_id)
+        run = PayrollRun.objects.select_for_update().select_related("period").get(pk=run.pk)
+        if run.status != PayrollRun.DRAFT:
+            raise ValueError(f"Run {run.pk} is {run.status}; only draft runs can be approved")
+        if run.period.is_closed:
+            raise ValueError(f"Period {run.period} is closed; its runs cannot be approved")
+        if run.completed_at is None:
+            raise ValueError(f"Run {run.pk} has not finished; resume it before approving")
+        counted = PayrollRun.objects.filter(period=run.period, status__in=COUNTED_STATUSES).first()
+        if counted is not None:
+            raise ValueError(f"Period {run.period} already has {counted.status} run {counted.pk}; "
+                             f"roll it back before approving run {run.pk}")
+        run.status = PayrollRun.APPROVED
+        run.save(update_fields=["status", "updated_at"])
+        rebuild_period_summary(run.period)
+        post_run(run)
+    return run
+
+
+def rollback_run(run: PayrollRun) -> PayrollRun:
+    """
+    Move an approved run of an open period back to draft, undoing what
+    approve_run derived from it. Payslip e-mails not yet sent are withdrawn;
+    they are queued afresh if the run is approved again.
+    """
+    with transaction.atomic():
+        run = PayrollRun.objects.select_for_update().select_related("period").get(pk=run.pk)
+        if run.status != PayrollRun.APPROVED:
+            raise ValueError(f"Run {run.pk} is {run.status}; only approved runs can be rolled back")
+        if run.period.is_closed:
+            raise ValueError(f"Period {run.period} is closed; its runs cannot be rolled back")
+        run.status = PayrollRun.DRAFT
+        run.save(update_fields=["status", "updated_at"])
+        rebuild_period_summary(run.period)
+        unpost_run(run)
+        run.emails.filter(status__in=(PayslipEmail.QUEUED, PayslipEmail.SENDING)).delete()
+    return run
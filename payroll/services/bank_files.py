@@ -0,0 +1,177 @@
+from __future__ import annotations
+import csv
+from dataclasses import dataclass, field
+from decimal import Decimal
+from pathlib import Path
+from django.db.models import Count, Sum
+from django.db.models.functions import Trim, Upper
+from django.utils import timezone
+from django.utils.text import slugify
+from payroll.models import PayrollRun, Payslip
+
+BANK_FILE_FORMATS = ("csv", "fixed")
+UNASSIGNED = "UNASSIGNED"
+
+# Fixed-width layout: (width, align) per field, amounts in pesewas, zero-padded.
+FIXED_LAYOUT = {
+    "H": [(1, "<"), (35, "<"), (10, ">"), (8, "<"), (7, ">"), (15, ">")],  # bank, run, date, count, total
+    "D": [(1, "<"), (35, "<"), (20, "<"), (35, "<"), (15, ">"), (18, "<")],  # branch, account, name, amount, ref
+    "B": [(1, "<"), (35, "<"), (7, ">"), (15, ">")],  # branch control: branch, count, total
+    "T": [(1, "<"), (7, ">"), (15, ">")],  # file control: count, total
+}
+ACCOUNT_WIDTH = FIXED_LAYOUT["D"][2][0]
+
+
+# bank_name and bank_branch are free text: group on a normalised spelling so
+# "Ecobank" and "ECOBANK " end up in one file.
+GROUPING = {"bank": Upper(Trim("employee_id__bank_name")), "branch": Upper(Trim("employee_id__bank_branch"))}
+
+
+@dataclass
+class BankFile:
+    bank: str
+    path: Path
+    count: int = 0
+    total: Decimal = Decimal("0.00")
+    branches: dict = field(default_factory=dict)  # branch -> (count, total)
+
+
+def _pesewas(amount: Decimal) -> int:
+    return int(amount * 100)
+
+
+def _fixed(kind, values) -> str:
+    # Names may be cut to fit; counts and amounts never are.
+    out = []
+    for (width, align), value in zip(FIXED_LAYOUT[kind], (kind, *values)):
+        text = str(value)
+        if align == ">" and text.isdigit():
+            if len(text) > width:
+                raise ValueError(f"{text} does not fit the {width}-digit field of a {kind} record")
+            out.append(text.zfill(width))
+        else:
+            out.append(f"{text[:width]:{align}{width}}")
+    return "".join(out) + "\r\n"
+
+
+class _Writer:
+    def __init__(self, fileobj, fmt):
+        self.fileobj = fileobj
+        self.fmt = fmt
+        self.csv = csv.writer(fileobj) if fmt == "csv" else None
+
+    def record(self, kind, *values):
+        if self.csv:
+            self.csv.writerow([kind, *values])
+        else:
+            self.fileobj.write(_fixed(kind, [_pesewas(v) if isinstance(v, Decimal) else v for v in values]))
+
+
+def control_totals(run: PayrollRun) -> dict:
+    """(bank, branch) -> (count, total net pay), aggregated by the database."""
+    rows = (
+        Payslip.objects.filter(run=run, net_pay__gt=0)
+        .values(**GROUPING)
+        .annotate(n=Count("pk"), total=Sum("net_pay"))
+        .order_by()
+    )
+    return {(row["bank"] or UNASSIGNED, row["branch"] or ""): (row["n"], row["total"]) for row in rows}
+
+
+def write_bank_files(run: PayrollRun, out_dir, fmt: str = "csv", chunk_size: int = 2000) -> list[BankFile]:
+    """
+    One transfer file per bank for an approved run, written in a single
+    ordered pass over its payslips. Each file carries a header, branch
+    control records and a trailer; running totals are checked against the
+    database aggregates before a file is closed. A payslip without a usable
+    account number, or a value too long for its fixed-width field, raises
+    ValueError and no files are left behind.
+    """
+    if fmt not in BANK_FILE_FORMATS:
+        raise ValueError(f"format must be one of {', '.join(BANK_FILE_FORMATS)}")
+    if run.status not in (PayrollRun.APPROVED, PayrollRun.PAID):
+        raise ValueError(f"Run {run.pk} is {run.status}; bank files need an approved run")
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    expected = control_totals(run)
+    bank_totals = {}
+    for (bank, _), (n, total) in expected.items():
+        count, amount = bank_totals.get(bank, (0, Decimal("0.00")))
+        bank_totals[bank] = (count + n, amount + total)
+
+    ext = "csv" if fmt == "csv" else "txt"
+    paths = {}
+    for bank in bank_totals:
+        path = out_dir / f"run{run.pk}_{slugify(bank) or 'bank'}.{ext}"
+        if path in paths.values():
+            other = next(name for name, p in paths.items() if p == path)
+            raise ValueError(f"Banks {other!r} and {bank!r} would share {path.name}; make their names consistent")
+        paths[bank] = path
+
+    rows = (
+        Payslip.objects.filter(run=run, net_pay__gt=0)
+        .annotate(**GROUPING)
+        .order_by("bank", "branch", "employee_id")
+        .values_list("bank", "branch", "employee_id__bank_account_number",
+                     "employee_id__first_name", "employee_id__last_name", "employee_id", "net_pay")
+        .iterator(chunk_size=chunk_size)
+    )
+    date = timezone.now().strftime("%Y%m%d")
+    files, current, handle, writer, branch = [], None, None, None, None
+
+    def close_branch():
+        n, total = current.branches[branch]
+        if (n, total) != expected[(current.bank, branch)]:
+            raise RuntimeError(f"Control total mismatch for {current.bank}/{branch}")
+        writer.record("B", branch, n, total)
+
+    def close_file():
+        close_branch()
+        writer.record("T", current.count, current.total)
+        handle.close()
+
+    try:
+        for bank, branch_name, account, first, last, emp_pk, net in rows:
+            bank, branch_name = bank or UNASSIGNED, branch_name or ""
+            if current is None or bank != current.bank:
+                if current is not None:
+                    close_file()
+                current = BankFile(bank, paths[bank])
+                files.append(current)
+                handle = open(current.path, "w", newline="")
+                writer = _Writer(handle, fmt)
+                n, total = bank_totals[bank]
+                writer.record("H", bank, run.pk, date, n, total)
+                branch = None
+            if branch_name != branch:
+                if branch is not None:
+                    close_branch()
+                branch = branch_name
+                current.branches[branch] = (0, Decimal("0.00"))
+            n, total = current.branches[branch]
+            current.branches[branch] = (n + 1, total + net)
+            current.count += 1
+            current.total += net
+            who = f"Employee {emp_pk} ({first} {last})"
+            account = (account or "").strip()
+            if not account:
+                raise ValueError(f"{who} has no bank account number")
+            if fmt == "fixed" and len(account) > ACCOUNT_WIDTH:
+                raise ValueError(f"{who}: account number {account} is longer than {ACCOUNT_WIDTH} characters")
+            try:
+                writer.record("D", branch, account, f"{first} {last}", net, f"RUN{run.pk}-EMP{emp_pk}")
+            except ValueError as exc:
+                raise ValueError(f"{who}: {exc}") from exc
+        if current is not None:
+            close_file()
+    except Exception:
+        if handle is not None:
+            handle.close()
+        for bank_file in files:
+            bank_file.path.unlink(missing_ok=True)
+        raise
+    finally:
+        if handle is not None and not handle.closed:
+            handle.close()
+    return files
@@ -0,0 +1,134 @@
+from __future__ import annotations
+import math
+import platform
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+import django
+from django.db import connection
+from django.utils import timezone
+from payroll.models import PayrollRun
+from payroll.services.run_pipeline import DEFAULT_CHUNK_SIZE, PIPELINES, ColumnarRunPipeline
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class Phase:
+    seconds: float = 0.0
+    queries: int = 0
+
+
+@dataclass
+class BenchResult:
+    mode: str
+    chunk_size: int
+    employees: int = 0
+    payslips: int = 0
+    lines: int = 0
+    phases: dict = field(default_factory=lambda: {name: Phase() for name in ("load", "compute", "write")})
+    latencies: list = field(default_factory=list, repr=False)  # seconds per employee, compute phase only
+
+    @property
+    def seconds(self) -> float:
+        return sum(phase.seconds for phase in self.phases.values())
+
+    @property
+    def queries(self) -> int:
+        return sum(phase.queries for phase in self.phases.values())
+
+    def as_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "recorded_at": timezone.now().isoformat(),
+            "environment": {"python": platform.python_version(), "django": django.get_version(),
+                            "database": connection.vendor},
+            "mode": self.mode,
+            "chunk_size": self.chunk_size,
+            "employees": self.employees,
+            "payslips": self.payslips,
+            "lines": self.lines,
+            "seconds": round(self.seconds, 6),
+            "employees_per_second": round(self.employees / self.seconds, 1) if self.seconds else 0.0,
+            "queries": self.queries,
+            "queries_per_employee": round(self.queries / self.employees, 3) if self.employees else 0.0,
+            "phases": {name: {k: round(v, 6) if isinstance(v, float) else v for k, v in asdict(phase).items()}
+                       for name, phase in self.phases.items()},
+            # Per-employee compute latency in milliseconds; empty for the columnar
+            # engine, which computes the workforce in one vectorized pass.
+            "latency_ms": {f"p{pct}": None if percentile(latencies, pct) is None
+                           else round(percentile(latencies, pct) * 1000, 4) for pct in PERCENTILES},
+        }
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+@contextmanager
+def _phase(result: BenchResult, name: str, counter: _QueryCounter):
+    before = counter.count
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        result.phases[name].seconds += time.perf_counter() - started
+        result.phases[name].queries += counter.count - before
+
+
+def benchmark_run(run: PayrollRun, mode: str = "scalar", chunk_size: int = DEFAULT_CHUNK_SIZE) -> BenchResult:
+    """
+    Drive a pipeline chunk by chunk the way RunPipeline.execute does, timing
+    and counting queries for the load, compute and write phases separately.
+    The run's payslips are written for real.
+    """
+    pipeline = PIPELINES[mode](run, chunk_size=chunk_size)
+    result = BenchResult(mode=mode, chunk_size=chunk_size)
+    compute_one = pipeline.compute_one
+
+    def timed_compute_one(emp):
+        started = time.perf_counter()
+        try:
+            return compute_one(emp)
+        finally:
+            result.latencies.append(time.perf_counter() - started)
+
+    pipeline.compute_one = timed_compute_one
+    counter = _QueryCounter()
+    with connection.execute_wrapper(counter):
+        if isinstance(pipeline, ColumnarRunPipeline):
+            # The columnar engine computes the whole workforce before the
+            # first chunk: book its array loading and its vectorized pass
+            # as the load and compute phases; the chunks then only write.
+            with _phase(result, "load", counter):
+                columns = pipeline.engine.load(pipeline.base_queryset())
+            with _phase(result, "compute", counter):
+                chunks = pipeline.chunked(pipeline.engine.compute_loaded(columns))
+        else:
+            chunks = pipeline.iter_chunks()
+        while True:
+            with _phase(result, "load", counter):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            with _phase(result, "compute", counter):
+                results = pipeline.compute_chunk(chunk)
+            with _phase(result, "write", counter):
+                n_slips, n_lines = pipeline.write_chunk(results)
+            result.employees += len(chunk)
+            result.payslips += n_slips
+            result.lines += n_lines
+    return result
@@ -0,0 +1,171 @@
+from __future__ import annotations
+from decimal import Decimal
+import numpy as np
+from payroll.models import (
+    Allowance, AllowanceType, Deduction, DeductionType,
+    Employee, PayslipLine,
+)
+from payroll.services.payroll_engine import PayrollEngine, Result, DEC
+from payroll.services.tax_table import get_tax_table
+
+# All arithmetic is done on int64 pesewas (1/100 of the currency unit) and
+# basis points (1/100 of a percent), so every rounding step can be reproduced
+# exactly with integer division instead of Decimal.
+BP_DENOMINATOR = 10000
+
+
+def to_minor(value) -> int:
+    return int(DEC(value) * 100) if value is not None else 0
+
+
+def to_bp(value) -> int:
+    return int(DEC(value) * 100) if value is not None else 0
+
+
+def from_minor(value) -> Decimal:
+    return DEC(int(value)).scaleb(-2)
+
+
+def _round_bp(values):
+    """Divide a non-negative pesewa×bp array by 10000, rounding half up like money()."""
+    return (values + BP_DENOMINATOR // 2) // BP_DENOMINATOR
+
+
+class ColumnarEngine(PayrollEngine):
+    """
+    Computes the whole workforce at once from column arrays instead of one
+    Employee at a time. Totals match compute_employee to the pesewa.
+    """
+
+    def _load_matrix(self, model, type_field, employees, pks):
+        """(amount matrix, assignment-count matrix, type pk list) for active rows."""
+        rows = list(
+            model.objects
+            .filter(active=True, employee_id__in=employees.values("pk"))
+            .values_list("employee_id", type_field, "amount")
+        )
+        type_ids = sorted({t for _, t, _ in rows})
+        col = {t: i for i, t in enumerate(type_ids)}
+        amounts = np.zeros((len(pks), len(type_ids)), dtype=np.int64)
+        counts = np.zeros((len(pks), len(type_ids)), dtype=np.int64)
+        if rows:
+            r = np.searchsorted(pks, np.fromiter((e for e, _, _ in rows), dtype=np.int64, count=len(rows)))
+            c = np.fromiter((col[t] for _, t, _ in rows), dtype=np.int64, count=len(rows))
+            a = np.fromiter((to_minor(x) for _, _, x in rows), dtype=np.int64, count=len(rows))
+            np.add.at(amounts, (r, c), a)
+            np.add.at(counts, (r, c), 1)
+        return amounts, counts, type_ids
+
+    def _tax_vector(self, taxable):
+        # TaxTable.tax across every employee: searchsorted finds each bracket,
+        # cumulative tax is kept in pesewa×bp so nothing rounds until the end.
+        table = get_tax_table(self.period.year)
+        if not table.lowers:
+            return np.zeros_like(taxable)
+        lowers = np.array([to_minor(v) for v in table.lowers], dtype=np.int64)
+        uppers = np.array([to_minor(v) if v is not None else np.iinfo(np.int64).max for v in table.uppers], dtype=np.int64)
+        rates = np.array([int(r * BP_DENOMINATOR) for r in table.rates], dtype=np.int64)
+        cumulative = np.array([int(c * 100 * BP_DENOMINATOR) for c in table.cumulative], dtype=np.int64)
+
+        i = np.searchsorted(lowers, taxable, side="right") - 1
+        below = i < 0
+        i = np.where(below, 0, i)
+        acc = cumulative[i] + (np.minimum(taxable, uppers[i]) - lowers[i]) * rates[i]
+        return np.where(below, 0, _round_bp(acc))
+
+    def load(self, employees=None) -> dict | None:
+        """
+        Every database read compute() needs, as column arrays: basic pay,
+        allowance and deduction matrices with their type metadata, and the
+        statutory rates and tax table (warmed into their caches). None when
+        there are no employees.
+        """
+        qs = employees if employees is not None else Employee.objects.filter(is_active=True)
+        emps = list(qs.order_by("pk").values_list("pk", "grade_step__basic_salary", "basic_salary"))
+        if not emps:
+            return None
+        pks = np.array([pk for pk, _, _ in emps], dtype=np.int64)
+        al_amounts, al_counts, al_types = self._load_matrix(Allowance, "allowance_type_id", qs, pks)
+        dd_amounts, dd_counts, dd_types = self._load_matrix(Deduction, "deduction_type_id", qs, pks)
+        self._stat_rates(applies_to_employee=True)
+        self._stat_rates(applies_to_employee=False)
+        get_tax_table(self.period.year)
+        al_meta = AllowanceType.objects.in_bulk(al_types)
+        dd_meta = DeductionType.objects.in_bulk(dd_types)
+        return {
+            "pks": pks,
+            "basic": np.array([to_minor(gs if gs is not None else b) for _, gs, b in emps], dtype=np.int64),
+            "al_amounts": al_amounts, "al_counts": al_counts, "al_types": [al_meta[t] for t in al_types],
+            "dd_amounts": dd_amounts, "dd_counts": dd_counts, "dd_types": [dd_meta[t] for t in dd_types],
+        }
+
+    def compute(self, employees=None) -> list[tuple[int, Result]]:
+        """Return (employee pk, Result) for `employees` (default: all active), ordered by pk."""
+        return self.compute_loaded(self.load(employees))
+
+    def compute_loaded(self, columns: dict | None) -> list[tuple[int, Result]]:
+        """The vectorized part of compute(), on the arrays from load(); no queries."""
+        if columns is None:
+            return []
+        pks, basic = columns["pks"], columns["basic"]
+
+        # Earnings
+        al_amounts, al_counts, al_types = columns["al_amounts"], columns["al_counts"], columns["al_types"]
+        is_pct = np.array([t.is_percent_of_basic for t in al_types], dtype=bool)
+        pct_bp = np.array([to_bp(t.percent) for t in al_types], dtype=np.int64)
+        is_taxable = np.array([t.is_taxable for t in al_types], dtype=bool)
+        al_values = np.where(is_pct, _round_bp(basic[:, None] * pct_bp) * al_counts, al_amounts)
+        gross = basic + al_values.sum(axis=1)
+        exempt = (al_values * ~is_taxable).sum(axis=1)
+
+        # Deductions
+        dd_amounts, dd_counts, dd_types = columns["dd_amounts"], columns["dd_counts"], columns["dd_types"]
+        is_pre = np.array([t.is_pre_tax for t in dd_types], dtype=bool)
+        pre_tax = (dd_amounts * is_pre).sum(axis=1)
+        post_tax = (dd_amounts * ~is_pre).sum(axis=1)
+
+        # Statutory, PAYE and net
+        stat_schemes = [
+            (name, _round_bp(gross * int(rate * BP_DENOMINATOR)))
+            for name, rate in self._stat_rates(applies_to_employee=True).items()
+        ]
+        stat_employee = sum((amt for _, amt in stat_schemes), np.zeros_like(gross))
+        stat_employer = sum(
+            (_round_bp(gross * int(rate * BP_DENOMINATOR)) for rate in self._stat_rates(applies_to_employee=False).values()),
+            np.zeros_like(gross),
+        )
+        taxable = np.maximum(gross - exempt - pre_tax - stat_employee, 0)
+        tax = self._tax_vector(taxable)
+        net = gross - pre_tax - stat_employee - tax - post_tax
+
+        al_names = [t.name for t in al_types]
+        dd_names = [t.name for t in dd_types]
+        results = []
+        for i, pk in enumerate(pks.tolist()):
+            lines = [(PayslipLine.EARNING, "Basic Salary", from_minor(basic[i]))]
+            lines += [
+                (PayslipLine.EARNING, al_names[j], from_minor(al_values[i, j]))
+                for j in np.flatnonzero(al_counts[i])
+            ]
+            lines += [
+                (PayslipLine.DEDUCTION, dd_names[j], from_minor(dd_amounts[i, j]))
+                for j in np.flatnonzero(dd_counts[i])
+            ]
+            lines += [
+                (PayslipLine.DEDUCTION, name, from_minor(amt[i]))
+                for name, amt in stat_schemes if amt[i]
+            ]
+            if tax[i]:
+                lines.append((PayslipLine.DEDUCTION, "PAYE", from_minor(tax[i])))
+            results.append((pk, Result(
+                gross=from_minor(gross[i]),
+                pre_tax_deductions=from_minor(pre_tax[i]),
+                taxable_income=from_minor(taxable[i]),
+                tax=from_minor(tax[i]),
+                statutory_employee=from_minor(stat_employee[i]),
+                statutory_employer=from_minor(stat_employer[i]),
+                other_deductions=from_minor(post_tax[i]),
+                net=from_minor(net[i]),
+                lines=lines,
+            )))
+        return results
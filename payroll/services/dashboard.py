@@ -0,0 +1,79 @@
+from __future__ import annotations
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max, Q, Sum
+from django.utils import timezone
+from payroll.models import Employee, PayrollRecord, PayrollRun, PayrollSummary, Payslip
+from payroll.services.summary import SUMMED_FIELDS
+
+CACHE_KEY = "payroll:dashboard_metrics"
+# Safety net for writes that bypass signals (queryset.update(), raw SQL).
+CACHE_TIMEOUT = getattr(settings, "PAYROLL_DASHBOARD_CACHE_SECONDS", 300)
+
+
+def compute_dashboard_metrics() -> dict:
+    """Landing-page KPIs, one aggregate query per model."""
+    employees = Employee.objects.aggregate(
+        total_employees=Count("pk"),
+        active_employees=Count("pk", filter=Q(is_active=True)),
+        permanent_employees=Count("pk", filter=Q(is_active=True, employment_type=Employee.PERMANENT)),
+        contract_employees=Count("pk", filter=Q(is_active=True, employment_type=Employee.CONTRACT)),
+        adjunct_employees=Count("pk", filter=Q(is_active=True, employment_type=Employee.ADJUNCT)),
+        active_basic_salary=Sum("basic_salary", filter=Q(is_active=True)),
+    )
+    runs = PayrollRun.objects.aggregate(
+        draft_runs=Count("pk", filter=Q(status=PayrollRun.DRAFT)),
+        approved_runs=Count("pk", filter=Q(status=PayrollRun.APPROVED)),
+        paid_runs=Count("pk", filter=Q(status=PayrollRun.PAID)),
+        last_run_at=Max("created_at"),
+    )
+    payslips = Payslip.objects.aggregate(total_payslips=Count("pk"), total_net_paid=Sum("net_pay"))
+    records = PayrollRecord.objects.aggregate(total_payroll_records=Count("pk"), last_record_at=Max("created_at"))
+
+    # Latest approved period, read from the materialized summary table
+    rows = list(
+        PayrollSummary.objects
+        .filter(period=PayrollSummary.objects.values("period")[:1])
+        .select_related("period", "department")
+    )
+    summary = None
+    if rows:
+        summary = {
+            "period": str(rows[0].period),
+            "totals": {
+                "headcount": sum(r.headcount for r in rows),
+                **{f: sum(getattr(r, f) for r in rows) for f in SUMMED_FIELDS},
+            },
+            "rows": [
+                {
+                    "department": str(r.department) if r.department else "–",
+                    "employment_type": r.get_employment_type_display(),
+                    "headcount": r.headcount,
+                    **{f: getattr(r, f) for f in SUMMED_FIELDS},
+                }
+                for r in rows
+            ],
+        }
+
+    return {**employees, **runs, **payslips, **records, "summary": summary, "computed_at": timezone.now()}
+
+
+def get_dashboard_metrics() -> dict:
+    metrics = cache.get(CACHE_KEY)
+    if metrics is None:
+        metrics = compute_dashboard_metrics()
+        cache.set(CACHE_KEY, metrics, CACHE_TIMEOUT)
+    return metrics
+
+
+async def aget_dashboard_metrics() -> dict:
+    metrics = await cache.aget(CACHE_KEY)
+    if metrics is None:
+        metrics = await sync_to_async(compute_dashboard_metrics)()
+        await cache.aset(CACHE_KEY, metrics, CACHE_TIMEOUT)
+    return metrics
+
+
+def invalidate_dashboard_metrics() -> None:
+    cache.delete(CACHE_KEY)
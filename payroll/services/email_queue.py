@@ -0,0 +1,189 @@
+from __future__ import annotations
+import threading
+import uuid
+from dataclasses import dataclass
+from datetime import timedelta
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection as db_connection
+from django.db.models import Count, Prefetch, Q
+from django.utils import timezone
+from payroll.models import PayrollRun, Payslip, PayslipEmail, PayslipLine
+from payroll.services.payslip_pdf import get_payslip_pdf
+
+DEFAULT_BATCH_SIZE = 50
+DEFAULT_MAX_ATTEMPTS = 5
+DEFAULT_RETRY_SECONDS = 60  # doubled after every failed attempt
+DEFAULT_LEASE_SECONDS = 600  # a claim older than this is assumed to belong to a dead worker
+
+
+def _setting(name, default):
+    return getattr(settings, f"PAYROLL_EMAIL_{name}", default)
+
+
+def enqueue_run_emails(run: PayrollRun) -> int:
+    """Queue one e-mail per payslip of an approved run; already queued payslips are skipped."""
+    if run.status not in (PayrollRun.APPROVED, PayrollRun.PAID):
+        raise ValueError(f"Run {run.pk} is {run.status}; payslips are only e-mailed for approved runs")
+    queued = set(PayslipEmail.objects.filter(run=run).values_list("payslip_id", flat=True))
+    rows = [
+        PayslipEmail(run=run, payslip_id=slip_pk, to_address=address)
+        for slip_pk, address in Payslip.objects.filter(run=run).exclude(employee_id__email="")
+        .order_by("pk").values_list("pk", "employee_id__email")
+        if slip_pk not in queued
+    ]
+    PayslipEmail.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def email_progress(run: PayrollRun) -> dict:
+    counts = dict(PayslipEmail.objects.filter(run=run).values_list("status").annotate(n=Count("pk")).order_by())
+    progress = {status: counts.get(status, 0) for status, _ in PayslipEmail.STATUS}
+    progress["total"] = sum(counts.values())
+    return progress
+
+
+def claim_batch(batch_size: int = DEFAULT_BATCH_SIZE, run: PayrollRun | None = None) -> list[PayslipEmail]:
+    """
+    Claim up to batch_size due e-mails for this worker. The claim is one
+    conditional UPDATE, so two workers can never claim the same row; claims
+    left behind by a dead worker become due again after the lease. Only
+    e-mails of approved or paid runs are claimed.
+    """
+    now = timezone.now()
+    lease = timedelta(seconds=_setting("LEASE_SECONDS", DEFAULT_LEASE_SECONDS))
+    due = PayslipEmail.objects.filter(
+        Q(status=PayslipEmail.QUEUED, next_attempt_at__lte=now)
+        | Q(status=PayslipEmail.SENDING, claimed_at__lt=now - lease),
+        run__status__in=(PayrollRun.APPROVED, PayrollRun.PAID),
+    )
+    if run is not None:
+        due = due.filter(run=run)
+    ids = list(due.order_by("next_attempt_at", "pk").values_list("pk", flat=True)[:batch_size])
+    if not ids:
+        return []
+    token = uuid.uuid4().hex
+    due.filter(pk__in=ids).update(status=PayslipEmail.SENDING, claim_token=token, claimed_at=now)
+    return list(
+        PayslipEmail.objects.filter(claim_token=token, status=PayslipEmail.SENDING)
+        .select_related("payslip__run__period", "payslip__employee_id__department", "payslip__employee_id__grade_step")
+        .prefetch_related(Prefetch("payslip__lines", queryset=PayslipLine.objects.order_by("pk")))
+        .order_by("pk")
+    )
+
+
+def build_message(email: PayslipEmail, connection=None) -> EmailMessage:
+    slip = email.payslip
+    emp = slip.employee_id
+    message = EmailMessage(
+        subject=f"Payslip for {slip.run.period}",
+        body=(f"Dear {emp.first_name},\n\nPlease find attached your payslip for {slip.run.period}.\n"
+              f"Net pay: {slip.net_pay}\n"),
+        to=[email.to_address],
+        connection=connection,
+    )
+    message.attach(f"payslip_{slip.run.period}.pdf", get_payslip_pdf(slip).read_bytes(), "application/pdf")
+    return message
+
+
+@dataclass
+class SendStats:
+    sent: int = 0
+    retried: int = 0
+    failed: int = 0
+
+    def add(self, other: "SendStats"):
+        self.sent += other.sent
+        self.retried += other.retried
+        self.failed += other.failed
+
+
+def _reconnect(connection) -> None:
+    """The server may have dropped us after an error; start the rest of the batch on a fresh session."""
+    try:
+        connection.close()
+        connection.open()
+    except Exception:
+        pass  # send_messages opens a connection per message while this one is down
+
+
+def send_batch(emails: list[PayslipEmail], connection) -> SendStats:
+    """
+    Send claimed e-mails over one already-open SMTP connection. A failure
+    only affects its own message: it is retried with exponential backoff
+    until PAYROLL_EMAIL_MAX_ATTEMPTS, then marked failed. Results are only
+    written to rows still held under this batch's claim, so a worker whose
+    lease expired cannot overwrite the next claimant's outcome.
+    """
+    stats = SendStats()
+    tokens = {email.claim_token for email in emails}
+    max_attempts = _setting("MAX_ATTEMPTS", DEFAULT_MAX_ATTEMPTS)
+    retry_seconds = _setting("RETRY_SECONDS", DEFAULT_RETRY_SECONDS)
+    for email in emails:
+        email.attempts += 1
+        email.claim_token = ""
+        try:
+            connection.send_messages([build_message(email, connection)])
+        except Exception as exc:
+            email.last_error = repr(exc)[:2000]
+            if email.attempts >= max_attempts:
+                email.status = PayslipEmail.FAILED
+                stats.failed += 1
+            else:
+                email.status = PayslipEmail.QUEUED
+                email.next_attempt_at = timezone.now() + timedelta(seconds=retry_seconds * 2 ** (email.attempts - 1))
+                stats.retried += 1
+            _reconnect(connection)
+        else:
+            email.status = PayslipEmail.SENT
+            email.sent_at = timezone.now()
+            email.last_error = ""
+            stats.sent += 1
+    PayslipEmail.objects.filter(status=PayslipEmail.SENDING, claim_token__in=tokens).bulk_update(
+        emails, ["status", "attempts", "claim_token", "last_error", "next_attempt_at", "sent_at"]
+    )
+    return stats
+
+
+def drain_queue(batch_size: int = DEFAULT_BATCH_SIZE, run: PayrollRun | None = None) -> SendStats:
+    """Claim and send batches over one reused SMTP connection until nothing is due."""
+    stats = SendStats()
+    connection = get_connection()
+    connection.open()
+    try:
+        while True:
+            emails = claim_batch(batch_size, run)
+            if not emails:
+                return stats
+            stats.add(send_batch(emails, connection))
+    finally:
+        connection.close()
+
+
+def run_workers(concurrency: int = 1, batch_size: int = DEFAULT_BATCH_SIZE, run: PayrollRun | None = None) -> SendStats:
+    """drain_queue in `concurrency` threads, each with its own SMTP and database connection."""
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if concurrency == 1:
+        return drain_queue(batch_size, run)
+
+    total, lock, errors = SendStats(), threading.Lock(), []
+
+    def worker():
+        try:
+            stats = drain_queue(batch_size, run)
+            with lock:
+                total.add(stats)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            db_connection.close()
+
+    threads = [threading.Thread(target=worker, name=f"payslip-mail-{i}") for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+    return total
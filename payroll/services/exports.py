@@ -0,0 +1,75 @@
+from __future__ import annotations
+import csv
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (header, values_list path) for every exported PayrollRecord column.
+RECORD_COLUMNS = [
+    ("Record ID", "pk"),
+    ("Payslip ID", "payslip_id"),
+    ("Employee ID", "employee_id"),
+    ("First Name", "employee_id__first_name"),
+    ("Last Name", "employee_id__last_name"),
+    ("Component", "component_type"),
+    ("Description", "description"),
+    ("Gross Salary", "gross_salary"),
+    ("Tax", "tax"),
+    ("Net Salary", "net_salary"),
+    ("Period Start", "period_start"),
+    ("Period End", "period_end"),
+]
+EXPORT_FORMATS = ("csv", "xlsx")
+
+
+class _Echo:
+    """csv.writer target that hands each row straight back instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_record_rows(queryset, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """
+    Header then one tuple per record. Walks the primary key with
+    iterator(chunk_size) so memory stays flat and the first rows come back
+    without waiting for a sort over the whole result.
+    """
+    yield tuple(header for header, _ in RECORD_COLUMNS)
+    yield from (
+        queryset.order_by("pk")
+        .values_list(*(path for _, path in RECORD_COLUMNS))
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def iter_csv(queryset, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """Yield CSV-encoded lines for StreamingHttpResponse or a file."""
+    writer = csv.writer(_Echo())
+    for row in iter_record_rows(queryset, chunk_size):
+        yield writer.writerow(row)
+
+
+async def aiter_csv(queryset, chunk_size: int = EXPORT_CHUNK_SIZE):
+    """iter_csv over aiterator(), for async streaming responses under ASGI."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(tuple(header for header, _ in RECORD_COLUMNS))
+    paths = [path for _, path in RECORD_COLUMNS]
+    # values(), not values_list(): ValuesListIterable runs its query when the
+    # iterator is created, which aiterator() does on the event loop thread.
+    async for row in queryset.order_by("pk").values(*paths).aiterator(chunk_size=chunk_size):
+        yield writer.writerow([row[path] for path in paths])
+
+
+def write_xlsx(queryset, fileobj, chunk_size: int = EXPORT_CHUNK_SIZE) -> None:
+    """
+    Write an XLSX workbook with openpyxl's write-only mode, which flushes rows
+    to disk as it goes. XLSX is a zip archive, so it cannot be sent before it
+    is finished; callers serve the finished file.
+    """
+    from openpyxl import Workbook  # optional dependency, only needed for XLSX
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Payroll Records")
+    for row in iter_record_rows(queryset, chunk_size):
+        ws.append(row)
+    wb.save(fileobj)
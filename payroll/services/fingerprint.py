@@ -0,0 +1,32 @@
+from __future__ import annotations
+import hashlib
+from payroll.services.payroll_engine import PayrollEngine
+from payroll.services.tax_table import get_tax_table
+
+
+def run_context(engine: PayrollEngine) -> str:
+    """Digest of the run-wide inputs: tax table version and statutory rates in effect."""
+    parts = [get_tax_table(engine.period.year).version]
+    for applies_to_employee in (True, False):
+        parts += [f"{applies_to_employee}:{name}:{rate}"
+                  for name, rate in engine._stat_rates(applies_to_employee=applies_to_employee).items()]
+    return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+
+def employee_fingerprint(emp, context: str) -> str:
+    """
+    Hash of everything compute_employee reads for `emp`, plus the run
+    context. Expects allowances/deductions prefetched as in RunPipeline.
+    """
+    basic = emp.grade_step.basic_salary if emp.grade_step_id else emp.basic_salary
+    allowances = sorted(
+        (al.pk, al.amount, al.allowance_type.name, al.allowance_type.is_percent_of_basic, al.allowance_type.percent,
+         al.allowance_type.is_taxable)
+        for al in emp.allowances.all() if al.active
+    )
+    deductions = sorted(
+        (dd.pk, dd.amount, dd.deduction_type.name, dd.deduction_type.is_pre_tax)
+        for dd in emp.deductions.all() if dd.active
+    )
+    payload = repr((context, str(basic), allowances, deductions))
+    return hashlib.sha256(payload.encode()).hexdigest()
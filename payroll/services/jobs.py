@@ -0,0 +1,185 @@
+from __future__ import annotations
+import os
+import socket
+import traceback
+from datetime import timedelta
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from payroll.models import PayrollJob, PayrollPeriod, PayrollRun
+from payroll.services.run_pipeline import DEFAULT_CHUNK_SIZE, PIPELINES
+from payroll.services.statutory import invalidate_statutory_resolver
+from payroll.services.tax_table import invalidate_tax_table
+
+DEFAULT_LEASE_SECONDS = 600  # a running job without a heartbeat for this long is assumed to belong to a dead worker
+
+
+class JobCancelled(Exception):
+    """Raised from the progress callback when a cancel was requested."""
+
+
+class JobLost(Exception):
+    """Raised from the progress callback when another worker has reclaimed the job."""
+
+
+def default_worker_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def start_job(period: PayrollPeriod, user, mode: str = "scalar", chunk_size: int = DEFAULT_CHUNK_SIZE) -> PayrollJob:
+    """Queue a payroll run for the worker. Refused while the period already has a queued or running job."""
+    if mode not in PIPELINES:
+        raise ValueError(f"mode must be one of {', '.join(sorted(PIPELINES))}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    if period.is_closed:
+        raise ValueError(f"Payroll period {period} is closed")
+    with transaction.atomic():
+        PayrollPeriod.objects.select_for_update().get(pk=period.pk)
+        if PayrollJob.objects.filter(period=period, status__in=PayrollJob.ACTIVE).exists():
+            raise ValueError(f"A payroll job for {period} is already queued or running")
+        return PayrollJob.objects.create(period=period, created_by=user, mode=mode, chunk_size=chunk_size)
+
+
+def request_cancel(job: PayrollJob) -> None:
+    """A queued job is cancelled at once; a running one stops after its current chunk."""
+    now = timezone.now()
+    if PayrollJob.objects.filter(pk=job.pk, status=PayrollJob.QUEUED).update(
+            status=PayrollJob.CANCELLED, cancel_requested=True, finished_at=now):
+        return
+    PayrollJob.objects.filter(pk=job.pk, status=PayrollJob.RUNNING).update(cancel_requested=True)
+
+
+def _lease() -> timedelta:
+    return timedelta(seconds=getattr(settings, "PAYROLL_JOB_LEASE_SECONDS", DEFAULT_LEASE_SECONDS))
+
+
+def reclaim_job(worker: str | None = None) -> PayrollJob | None:
+    """
+    Take over the oldest running job whose worker stopped sending heartbeats.
+    The job stays running (so its period stays blocked) and execute_job
+    resumes its run from the checkpoint. Compare-and-set on the old
+    heartbeat, so only one worker wins.
+    """
+    worker = worker or default_worker_name()
+    cutoff = timezone.now() - _lease()
+    stale = PayrollJob.objects.filter(status=PayrollJob.RUNNING).filter(
+        Q(heartbeat_at__lt=cutoff) | Q(heartbeat_at__isnull=True, started_at__lt=cutoff))
+    for job in stale.order_by("created_at", "pk")[:20]:
+        if PayrollJob.objects.filter(pk=job.pk, status=PayrollJob.RUNNING, heartbeat_at=job.heartbeat_at).update(
+                worker=worker, heartbeat_at=timezone.now()):
+            return PayrollJob.objects.select_related("period", "created_by", "run").get(pk=job.pk)
+    return None
+
+
+def claim_job(worker: str | None = None) -> PayrollJob | None:
+    """
+    Take the oldest queued job whose period has no running job. The period
+    row is locked while checking, and a partial unique index backs it up on
+    databases without SELECT ... FOR UPDATE.
+    """
+    worker = worker or default_worker_name()
+    for job in PayrollJob.objects.filter(status=PayrollJob.QUEUED).order_by("created_at", "pk")[:20]:
+        try:
+            with transaction.atomic():
+                PayrollPeriod.objects.select_for_update().get(pk=job.period_id)
+                if PayrollJob.objects.filter(period_id=job.period_id, status=PayrollJob.RUNNING).exists():
+                    continue
+                claimed = PayrollJob.objects.filter(pk=job.pk, status=PayrollJob.QUEUED).update(
+                    status=PayrollJob.RUNNING, started_at=timezone.now(), heartbeat_at=timezone.now(), worker=worker)
+        except IntegrityError:
+            continue
+        if claimed:
+            return PayrollJob.objects.select_related("period", "created_by").get(pk=job.pk)
+    return None
+
+
+def _owned(job: PayrollJob):
+    """The job's row, as long as it is still running under this worker's name."""
+    return PayrollJob.objects.filter(pk=job.pk, status=PayrollJob.RUNNING, worker=job.worker)
+
+
+def execute_job(job: PayrollJob) -> PayrollJob:
+    """
+    Run a claimed job through the chunked pipeline, recording progress and a
+    heartbeat after every chunk. A reclaimed job already has a run and
+    carries on from its checkpoint. A cancelled or failed job leaves no run
+    behind. A worker whose job was reclaimed stops at its next heartbeat and
+    leaves the job and its run to the new owner.
+    """
+    # Tax brackets and statutory rates are usually edited in the web process,
+    # whose signals cannot reach this worker's caches.
+    invalidate_tax_table()
+    invalidate_statutory_resolver()
+    if job.run_id is not None:
+        run = job.run
+        pipeline = PIPELINES[job.mode](run, chunk_size=job.chunk_size, resume=True)
+        already_done = run.payslips.count()
+    else:
+        with transaction.atomic():
+            run = PayrollRun.objects.create(period=job.period, created_by=job.created_by)
+            pipeline = PIPELINES[job.mode](run, chunk_size=job.chunk_size)
+            job.run = run
+            job.total = pipeline.base_queryset().count()
+            PayrollJob.objects.filter(pk=job.pk).update(run=run, total=job.total)
+        already_done = 0
+
+    def progress(stats):
+        if not _owned(job).update(done=already_done + stats.employees, heartbeat_at=timezone.now()):
+            raise JobLost
+        if PayrollJob.objects.filter(pk=job.pk, cancel_requested=True).exists():
+            raise JobCancelled
+
+    try:
+        stats = pipeline.execute(progress=progress)
+    except JobLost:
+        job.refresh_from_db()
+        return job
+    except JobCancelled:
+        job.status = PayrollJob.CANCELLED
+    except Exception:
+        job.status = PayrollJob.FAILED
+        job.error = traceback.format_exc()
+    else:
+        job.status = PayrollJob.SUCCEEDED
+        job.done = already_done + stats.employees
+    with transaction.atomic():
+        if not _owned(job).select_for_update().exists():
+            # Reclaimed while the last chunk ran: the run is the new owner's now.
+            job.refresh_from_db()
+            return job
+        if job.status != PayrollJob.SUCCEEDED:
+            run.delete()
+            job.run = None
+            job.done = PayrollJob.objects.values_list("done", flat=True).get(pk=job.pk)
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "error", "done", "run", "finished_at"])
+    return job
+
+
+def run_next_job(worker: str | None = None) -> PayrollJob | None:
+    job = reclaim_job(worker) or claim_job(worker)
+    return execute_job(job) if job is not None else None
+
+
+def job_progress(job: PayrollJob) -> dict:
+    """done/total, throughput (employees per second) and ETA for the progress endpoint."""
+    end = job.finished_at or timezone.now()
+    elapsed = (end - job.started_at).total_seconds() if job.started_at else 0.0
+    rate = job.done / elapsed if elapsed > 0 else 0.0
+    remaining = max(job.total - job.done, 0)
+    return {
+        "id": job.pk,
+        "period": str(job.period),
+        "status": job.status,
+        "run": job.run_id,
+        "done": job.done,
+        "total": job.total,
+        "percent": round(100 * job.done / job.total, 1) if job.total else (100.0 if job.status == job.SUCCEEDED else 0.0),
+        "elapsed_seconds": round(elapsed, 1),
+        "employees_per_second": round(rate, 1),
+        "eta_seconds": round(remaining / rate, 1) if rate and job.status == PayrollJob.RUNNING else None,
+        "cancel_requested": job.cancel_requested,
+        "error": job.error.strip().splitlines()[-1] if job.error else "",
+    }
@@ -0,0 +1,143 @@
+from __future__ import annotations
+import asyncio
+import time
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.utils import timezone
+from django.utils.module_loading import import_string
+from payroll.services.benchmark import PERCENTILES, percentile
+
+DEFAULT_LEVELS = (10, 50, 100, 200, 400)
+DEFAULT_TIMEOUT = 30.0
+# A level "holds" while at most this share of requests fail or time out.
+MAX_ERROR_RATE = 0.01
+
+
+@dataclass
+class LevelResult:
+    concurrency: int
+    requests: int = 0
+    ok: int = 0
+    errors: dict = field(default_factory=dict)  # status code or exception name -> count
+    peak_in_flight: int = 0
+    seconds: float = 0.0
+    bytes: int = 0
+    latencies: list = field(default_factory=list, repr=False)  # seconds, successful requests only
+
+    @property
+    def error_rate(self) -> float:
+        return (self.requests - self.ok) / self.requests if self.requests else 0.0
+
+    def as_dict(self) -> dict:
+        latencies = sorted(self.latencies)
+        return {
+            "concurrency": self.concurrency,
+            "requests": self.requests,
+            "ok": self.ok,
+            "errors": self.errors,
+            "error_rate": round(self.error_rate, 4),
+            "peak_in_flight": self.peak_in_flight,
+            "seconds": round(self.seconds, 3),
+            "requests_per_second": round(self.ok / self.seconds, 1) if self.seconds else 0.0,
+            "bytes": self.bytes,
+            "latency_ms": {f"p{p}": round(percentile(latencies, p) * 1000, 1) if latencies else None
+                           for p in PERCENTILES},
+        }
+
+
+def session_cookie(user) -> str:
+    """Cookie header value for a fresh logged-in session of `user`, so the load test can reach protected views."""
+    store = import_string(settings.SESSION_ENGINE + ".SessionStore")()
+    store[SESSION_KEY] = user._meta.pk.value_to_string(user)
+    store[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    store[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    store.save()
+    return f"{settings.SESSION_COOKIE_NAME}={store.session_key}"
+
+
+async def fetch(url: str, headers: dict, timeout: float) -> tuple[int, int]:
+    """One HTTP/1.1 GET on its own connection; (status, body bytes). The body is read to the end."""
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+    lines = [f"GET {path} HTTP/1.1", f"Host: {parts.netloc}", "Connection: close",
+             *(f"{name}: {value}" for name, value in headers.items())]
+
+    async def exchange():
+        reader, writer = await asyncio.open_connection(parts.hostname, port, ssl=parts.scheme == "https")
+        try:
+            writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+            await writer.drain()
+            status_line = await reader.readline()
+            status = int(status_line.split()[1])
+            while await reader.readline() not in (b"\r\n", b"\n", b""):
+                pass  # headers
+            received = 0
+            while chunk := await reader.read(65536):
+                received += len(chunk)
+            return status, received
+        finally:
+            writer.close()
+
+    return await asyncio.wait_for(exchange(), timeout)
+
+
+async def run_level(url: str, concurrency: int, requests: int, headers: dict | None = None,
+                    timeout: float = DEFAULT_TIMEOUT) -> LevelResult:
+    """`requests` GETs of `url`, `concurrency` connections open at a time."""
+    result = LevelResult(concurrency=concurrency)
+    remaining = requests
+    in_flight = 0
+
+    async def client():
+        nonlocal remaining, in_flight
+        while remaining > 0:
+            remaining -= 1
+            in_flight += 1
+            result.peak_in_flight = max(result.peak_in_flight, in_flight)
+            started = time.perf_counter()
+            try:
+                status, received = await fetch(url, headers or {}, timeout)
+            except (OSError, ValueError, IndexError, asyncio.TimeoutError) as exc:
+                failure = type(exc).__name__
+            else:
+                result.bytes += received
+                failure = None if 200 <= status < 300 else str(status)
+                if failure is None:
+                    result.ok += 1
+                    result.latencies.append(time.perf_counter() - started)
+            finally:
+                in_flight -= 1
+                result.requests += 1
+            if failure is not None:
+                result.errors[failure] = result.errors.get(failure, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    result.seconds = time.perf_counter() - started
+    return result
+
+
+def ramp(url: str, levels=DEFAULT_LEVELS, requests_per_client: int = 5, headers: dict | None = None,
+         timeout: float = DEFAULT_TIMEOUT, max_p95_ms: float | None = None) -> dict:
+    """
+    Run each concurrency level in turn against a running server and report
+    the highest one it held: error rate within MAX_ERROR_RATE and, when
+    given, p95 latency within max_p95_ms. Point it at the same view served
+    by WSGI and by ASGI to compare how many concurrent connections one
+    process sustains.
+    """
+    results = []
+    capacity = None
+    for concurrency in levels:
+        level = asyncio.run(run_level(url, concurrency, concurrency * requests_per_client, headers, timeout))
+        report = level.as_dict()
+        p95 = report["latency_ms"]["p95"]
+        report["held"] = level.ok > 0 and level.error_rate <= MAX_ERROR_RATE and (
+            max_p95_ms is None or (p95 is not None and p95 <= max_p95_ms))
+        results.append(report)
+        if report["held"]:
+            capacity = concurrency
+    return {"recorded_at": timezone.now().isoformat(), "url": url, "capacity": capacity, "levels": results}
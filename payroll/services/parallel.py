@@ -0,0 +1,108 @@
+from __future__ import annotations
+import multiprocessing
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from django.db import connections
+from payroll.models import Employee, PayrollRun
+from payroll.services.run_pipeline import DEFAULT_CHUNK_SIZE, PIPELINES, RunPipeline
+
+
+@dataclass
+class ShardFailure:
+    pk_range: tuple[int, int]
+    error: str
+
+
+class ShardError(Exception):
+    """One or more shards failed; nothing was written for the run."""
+
+    def __init__(self, failures: list[ShardFailure]):
+        self.failures = failures
+        ranges = ", ".join(f"{f.pk_range[0]}-{f.pk_range[1]}" for f in failures)
+        super().__init__(f"{len(failures)} shard(s) failed (employee ids {ranges})")
+
+
+def shard_ranges(workers: int, queryset=None) -> list[tuple[int, int]]:
+    """Split active employees into up to `workers` inclusive pk ranges of near-equal size."""
+    pks = list((queryset if queryset is not None else Employee.objects.filter(is_active=True))
+               .order_by("pk").values_list("pk", flat=True))
+    if not pks:
+        return []
+    size = -(-len(pks) // workers)
+    return [(pks[i], pks[min(i + size, len(pks)) - 1]) for i in range(0, len(pks), size)]
+
+
+def _init_worker():
+    # Under spawn/forkserver the child starts without Django configured.
+    import django
+    from django.apps import apps
+    if not apps.ready:
+        django.setup()
+
+
+def compute_shard(run_pk: int, mode: str, pk_range: tuple[int, int], chunk_size: int, resume: bool = False):
+    """
+    Worker entry point: compute one shard on the worker's own DB connection
+    and its own tax-table/statutory caches. Returns (pk_range, results, error).
+    """
+    try:
+        run = PayrollRun.objects.select_related("period").get(pk=run_pk)
+        pipeline = PIPELINES[mode](run, chunk_size=chunk_size, pk_range=pk_range, resume=resume)
+        results = [pair for chunk in pipeline.iter_chunks() for pair in pipeline.compute_chunk(chunk)]
+        return pk_range, results, None
+    except Exception:
+        return pk_range, [], traceback.format_exc()
+
+
+class ParallelRunPipeline(RunPipeline):
+    """
+    Computes id-range shards in a process pool, then writes every result from
+    the parent under the one PayrollRun, in employee pk order, so the output
+    is identical to a serial run. If any shard fails nothing is written and
+    ShardError lists the failed ranges.
+    """
+
+    def __init__(self, run: PayrollRun, chunk_size: int = DEFAULT_CHUNK_SIZE, workers: int = 2,
+                 mode: str = "scalar", mp_context=None, resume: bool = False):
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        super().__init__(run, chunk_size=chunk_size, resume=resume)
+        self.workers = workers
+        self.mode = mode
+        self.mp_context = mp_context or multiprocessing.get_context(
+            "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+
+    def compute_shards(self) -> list[tuple[int, object]]:
+        shards = shard_ranges(self.workers, self.base_queryset())
+        # Children must not share the parent's sockets/file handles.
+        connections.close_all()
+        failures, results = [], []
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=self.mp_context,
+                                 initializer=_init_worker) as pool:
+            futures = [
+                pool.submit(compute_shard, self.run.pk, self.mode, shard, self.chunk_size, self.resume)
+                for shard in shards
+            ]
+            for future in futures:
+                try:
+                    pk_range, shard_results, error = future.result()
+                except Exception as exc:  # worker died (e.g. BrokenProcessPool)
+                    failures.append(ShardFailure(shards[futures.index(future)], repr(exc)))
+                    continue
+                if error:
+                    failures.append(ShardFailure(pk_range, error))
+                results.extend(shard_results)
+        if failures:
+            raise ShardError(failures)
+        results.sort(key=lambda pair: pair[0])
+        return results
+
+    def iter_chunks(self):
+        results = self.compute_shards()
+        for start in range(0, len(results), self.chunk_size):
+            yield results[start:start + self.chunk_size]
+
+    def compute_chunk(self, results):
+        return results
@@ -1,15 +1,16 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from decimal import Decimal
-from django.db import transaction
-from django.utils import timezone
-from payroll.models import (
-    Employee, EmployeeAllowance, EmployeeDeduction,
-    PayrollRun, PayrollPeriod, Payslip, PayslipLine,
-    StatutoryConfig, TaxBracket
-)
+from dataclasses import dataclass, field
+from decimal import Decimal, ROUND_HALF_UP
+from payroll.models import Employee, PayrollPeriod, PayslipLine
+from payroll.services.statutory import get_statutory_resolver
+from payroll.services.tax_table import get_tax_table
 
 DEC = Decimal
+CENT = DEC("0.01")
+
+
+def money(value: Decimal) -> Decimal:
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
 
 @dataclass
 class Result:
@@ -21,54 +22,94 @@ class Result:
     statutory_employer: Decimal
     other_deductions: Decimal
     net: Decimal
+    lines: list = field(default_factory=list)  # (kind, label, amount) for PayslipLine
+    fingerprint: str = ""  # set by the run pipeline, see services.fingerprint
+
+    @property
+    def total_deductions(self) -> Decimal:
+        return self.pre_tax_deductions + self.statutory_employee + self.tax + self.other_deductions
 
 class PayrollEngine:
     def __init__(self, period: PayrollPeriod):
         self.period = period
+        self._stat_cache = {}
 
-    def _stat_rate(self, applies_to_employee=True) -> Decimal:
-        cfg = (
-            StatutoryConfig.objects
-            .filter(effective_from__lte=timezone.now().date(), applies_to_employee=applies_to_employee)
-            .order_by("-effective_from")
-            .first()
-        )
-        return DEC(str(cfg.rate_percent)) / DEC("100") if cfg else DEC("0")
+    def _stat_rates(self, applies_to_employee=True) -> dict[str, Decimal]:
+        """Statutory schemes in effect at the end of the payroll period, by name."""
+        if applies_to_employee not in self._stat_cache:
+            self._stat_cache[applies_to_employee] = get_statutory_resolver().rates_on(
+                self.period.end_date, applies_to_employee=applies_to_employee
+            )
+        return self._stat_cache[applies_to_employee]
 
     def _calc_tax(self, year: int, taxable: Decimal) -> Decimal:
-        brackets = TaxBracket.objects.filter(year=year).order_by("lower_bound")
-        tax = DEC("0")
-        remaining = taxable
-        for b in brackets:
-            lb = b.lower_bound
-            ub = b.upper_bound if b.upper_bound is not None else taxable
-            if remaining <= 0:
-                break
-            span = max(DEC("0"), min(remaining, ub - lb)) if b.upper_bound else remaining
-            tax += span * (DEC(str(b.rate_percent)) / DEC("100"))
-            remaining -= span
-        return tax
+        return get_tax_table(year).tax(taxable)
+
+    @staticmethod
+    def _active(emp: Employee, relation: str, type_field: str):
+        # Use a prefetch (see services.run_pipeline) when there is one, else
+        # one query per relation with the type joined in.
+        if relation in getattr(emp, "_prefetched_objects_cache", {}):
+            return [row for row in getattr(emp, relation).all() if row.active]
+        return getattr(emp, relation).filter(active=True).select_related(type_field)
 
     def compute_employee(self, emp: Employee) -> Result:
-        basic = emp.grade_step.basic_salary
-        # Earnings
+        basic = emp.grade_step.basic_salary if emp.grade_step_id else emp.basic_salary
+        lines = [(PayslipLine.EARNING, "Basic Salary", money(basic))]
+
+        # Earnings; non-taxable allowances are paid but kept out of PAYE.
         earnings = [basic]
-        for al in emp.allowances.filter(active=True).select_related("allowance_type"):
+        exempt = DEC("0.00")
+        for al in self._active(emp, "allowances", "allowance_type"):
             if al.allowance_type.is_percent_of_basic:
-                amt = basic * (DEC(str(al.allowance_type.percent)) / DEC("100"))
+                amt = money(basic * (DEC(str(al.allowance_type.percent)) / DEC("100")))
             else:
                 amt = al.amount
             earnings.append(amt)
-        gross = sum(earnings, DEC("0"))
+            if not al.allowance_type.is_taxable:
+                exempt += money(amt)
+            lines.append((PayslipLine.EARNING, al.allowance_type.name, money(amt)))
+        gross = money(sum(earnings, DEC("0")))
 
         # Deductions
         pre_tax = DEC("0.00")
         post_tax = DEC("0.00")
 
-        for dd in emp.deductions.filter(active=True).select_related("deduction_type"):
+        for dd in self._active(emp, "deductions", "deduction_type"):
             amount = dd.amount
 
             if dd.deduction_type.is_pre_tax:
                 pre_tax += amount
             else:
                 post_tax += amount
+            lines.append((PayslipLine.DEDUCTION, dd.deduction_type.name, money(amount)))
+
+        # Statutory contributions are levied on gross, rounded per scheme; the
+        # employee share is relieved from PAYE.
+        statutory_lines = []
+        for name, rate in self._stat_rates(applies_to_employee=True).items():
+            statutory_lines.append((PayslipLine.DEDUCTION, name, money(gross * rate)))
+        statutory_employee = sum((amt for _, _, amt in statutory_lines), DEC("0.00"))
+        statutory_employer = sum(
+            (money(gross * rate) for rate in self._stat_rates(applies_to_employee=False).values()), DEC("0.00")
+        )
+
+        taxable = max(DEC("0.00"), gross - exempt - money(pre_tax) - statutory_employee)
+        tax = money(self._calc_tax(self.period.year, taxable))
+        net = gross - money(pre_tax) - statutory_employee - tax - money(post_tax)
+
+        lines += [line for line in statutory_lines if line[2]]
+        if tax:
+            lines.append((PayslipLine.DEDUCTION, "PAYE", tax))
+
+        return Result(
+            gross=gross,
+            pre_tax_deductions=money(pre_tax),
+            taxable_income=money(taxable),
+            tax=tax,
+            statutory_employee=statutory_employee,
+            statutory_employer=statutory_employer,
+            other_deductions=money(post_tax),
+            net=money(net),
+            lines=lines,
+        )
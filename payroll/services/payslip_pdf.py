@@ -0,0 +1,183 @@
+from __future__ import annotations
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from django.conf import settings
+from django.db import connections
+from django.db.models import Prefetch
+from payroll.models import PayrollRun, Payslip, PayslipLine
+from payroll.services.pdf import SimplePDF
+
+# Bump when the layout changes so cached files are not served in the old one.
+LAYOUT_VERSION = 1
+RENDER_CHUNK_SIZE = 200
+
+
+def pdf_dir() -> Path:
+    return Path(getattr(settings, "PAYROLL_PAYSLIP_PDF_DIR", Path(settings.BASE_DIR) / "var" / "payslips"))
+
+
+def payslip_queryset():
+    return Payslip.objects.select_related(
+        "run__period", "employee_id__department", "employee_id__grade_step",
+    ).prefetch_related(Prefetch("lines", queryset=PayslipLine.objects.order_by("pk")))
+
+
+def payslip_document(slip: Payslip) -> dict:
+    """Everything printed on the payslip, as plain strings so it pickles cheaply and hashes stably."""
+    emp = slip.employee_id
+    account = emp.bank_account_number
+    return {
+        "organisation": getattr(settings, "PAYROLL_ORGANISATION_NAME", ""),
+        "period": str(slip.run.period),
+        "run": slip.run_id,
+        "employee": {
+            "id": emp.pk,
+            "name": f"{emp.first_name} {emp.last_name}",
+            "position": emp.position,
+            "department": emp.department.name if emp.department else "",
+            "grade": str(emp.grade_step) if emp.grade_step else "",
+            "bank": " ".join(filter(None, [emp.bank_name, emp.bank_branch])),
+            "account": f"****{account[-4:]}" if account else "",
+        },
+        "lines": [[line.kind, line.label, str(line.amount)] for line in slip.lines.all()],
+        "totals": {
+            "Gross pay": str(slip.gross_pay),
+            "Taxable income": str(slip.taxable_income),
+            "Total deductions": str(slip.total_deductions),
+            "Net pay": str(slip.net_pay),
+            "Employer contributions": str(slip.statutory_employer),
+        },
+    }
+
+
+def content_hash(document: dict) -> str:
+    payload = json.dumps([LAYOUT_VERSION, document], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def cache_path(digest: str) -> Path:
+    return pdf_dir() / digest[:2] / f"{digest}.pdf"
+
+
+def render_payslip(document: dict) -> bytes:
+    pdf = SimplePDF()
+    left, right = 50, 545
+    pdf.text(left, 60, document["organisation"] or "Payslip", size=16, bold=True)
+    pdf.text(right, 60, f"Period {document['period']}", size=11, align="right")
+    pdf.rule(left, 72, right, width=1)
+    emp = document["employee"]
+    details = [("Employee", f"{emp['name']} (#{emp['id']})"), ("Position", emp["position"]),
+               ("Department", emp["department"]), ("Grade", emp["grade"]),
+               ("Bank", f"{emp['bank']} {emp['account']}".strip()), ("Payroll run", str(document["run"]))]
+    y = 95
+    for label, value in details:
+        pdf.text(left, y, label, bold=True)
+        pdf.text(left + 100, y, value)
+        y += 15
+
+    for kind, heading in ((PayslipLine.EARNING, "Earnings"), (PayslipLine.DEDUCTION, "Deductions")):
+        y += 15
+        pdf.text(left, y, heading, size=12, bold=True)
+        pdf.rule(left, y + 5, right)
+        y += 20
+        for line_kind, label, amount in document["lines"]:
+            if line_kind == kind:
+                pdf.text(left, y, label)
+                pdf.text(right, y, amount, align="right")
+                y += 15
+
+    y += 10
+    pdf.rule(left, y, right, width=1)
+    y += 18
+    for label, amount in document["totals"].items():
+        bold = label == "Net pay"
+        pdf.text(left, y, label, bold=bold)
+        pdf.text(right, y, amount, bold=bold, align="right")
+        y += 15
+    return pdf.render()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write via a temporary file and rename, so readers never see half a PDF."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def render_to_cache(document: dict, digest: str) -> str:
+    """Worker entry point: render one document into the cache; no database access."""
+    path = cache_path(digest)
+    if not path.exists():
+        _write_atomic(path, render_payslip(document))
+    return str(path)
+
+
+def get_payslip_pdf(slip: Payslip) -> Path:
+    """Path of the payslip's PDF, rendered now if this content has not been rendered before."""
+    document = payslip_document(slip)
+    return Path(render_to_cache(document, content_hash(document)))
+
+
+@dataclass
+class RenderStats:
+    payslips: int = 0
+    rendered: int = 0
+    cached: int = 0
+    seconds: float = 0.0
+
+
+def render_run_pdfs(run: PayrollRun, workers: int = 1, chunk_size: int = RENDER_CHUNK_SIZE,
+                    mp_context=None) -> RenderStats:
+    """
+    Make sure every payslip of the run has a cached PDF. The parent reads the
+    payslips in chunks and hashes them; only documents whose hash has no file
+    yet go to the process pool, so a repeat call renders nothing.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    stats = RenderStats()
+    started = time.perf_counter()
+    missing = []
+    qs = payslip_queryset().filter(run=run).order_by("pk")
+    last_pk = 0
+    while True:
+        chunk = list(qs.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+        for slip in chunk:
+            document = payslip_document(slip)
+            digest = content_hash(document)
+            if cache_path(digest).exists():
+                stats.cached += 1
+            else:
+                missing.append((document, digest))
+        stats.payslips += len(chunk)
+
+    if workers == 1 or len(missing) < 2:
+        for document, digest in missing:
+            render_to_cache(document, digest)
+    elif missing:
+        # Children must not share the parent's sockets/file handles.
+        connections.close_all()
+        mp_context = mp_context or multiprocessing.get_context(
+            "fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn"
+        )
+        with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as pool:
+            list(pool.map(render_to_cache, *zip(*missing), chunksize=max(1, len(missing) // (workers * 4))))
+    stats.rendered = len(missing)
+    stats.seconds = time.perf_counter() - started
+    return stats
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+# Just enough PDF for one-page text documents such as payslips: the two
+# standard Helvetica faces, text and rules. No dependencies, deterministic
+# output (no timestamps or ids), so equal input gives byte-identical files.
+
+A4 = (595, 842)
+FONTS = {False: "F1", True: "F2"}
+
+
+def _escape(text: str) -> str:
+    text = str(text).encode("cp1252", "replace").decode("latin-1")
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def text_width(text: str, size: float) -> float:
+    """Rough Helvetica advance width, good enough for right-aligning figures."""
+    return len(str(text)) * size * 0.5
+
+
+class SimplePDF:
+    def __init__(self, size=A4):
+        self.width, self.height = size
+        self.ops: list[str] = []
+
+    def text(self, x: float, y: float, text, size: float = 10, bold: bool = False, align: str = "left"):
+        """Draw text with its baseline at (x, y), measured from the top-left corner."""
+        if align == "right":
+            x -= text_width(text, size)
+        self.ops.append(f"BT /{FONTS[bold]} {size:g} Tf {x:.2f} {self.height - y:.2f} Td ({_escape(text)}) Tj ET")
+
+    def rule(self, x1: float, y: float, x2: float, width: float = 0.5):
+        self.ops.append(f"{width:g} w {x1:.2f} {self.height - y:.2f} m {x2:.2f} {self.height - y:.2f} l S")
+
+    def render(self) -> bytes:
+        stream = "\n".join(self.ops).encode("latin-1")
+        objects = [
+            b"<< /Type /Catalog /Pages 2 0 R >>",
+            b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+            (f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {self.width} {self.height}] "
+             f"/Resources << /Font << /F1 5 0 R /F2 6 0 R >> >> /Contents 4 0 R >>").encode(),
+            b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+            b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        ]
+        out = bytearray(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(len(out))
+            out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+        xref = len(out)
+        out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+        out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+        out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+        return bytes(out)
@@ -0,0 +1,46 @@
+from __future__ import annotations
+import os
+import sqlite3
+import time
+from pathlib import Path
+from django.db import connections
+from payroll.db_router import reporting_alias
+
+BACKUP_PAGES = 1024  # pages copied per step; writers on default get a turn between steps
+
+
+def snapshot_sqlite(dest, source_alias: str = "default") -> Path:
+    """
+    Copy the source SQLite database to `dest` with the online backup API and
+    swap it in with a rename, so readers see either the old snapshot or the
+    new one, never a partial copy. The file's mtime is the sync time the
+    router uses for read-your-writes.
+    """
+    source = connections[source_alias]
+    if source.vendor != "sqlite":
+        raise ValueError(f"Database {source_alias!r} is {source.vendor}; snapshots need SQLite")
+    dest = Path(dest)
+    tmp = dest.with_name(dest.name + ".tmp")
+    source.ensure_connection()
+    target = sqlite3.connect(tmp)
+    try:
+        source.connection.backup(target, pages=BACKUP_PAGES)
+    finally:
+        target.close()
+    os.replace(tmp, dest)
+    return dest
+
+
+def sync_reporting_db(alias: str | None = None) -> tuple[Path, float]:
+    """Refresh the reporting snapshot; returns its path and how long the copy took."""
+    alias = alias or reporting_alias()
+    if alias not in connections.settings:
+        raise ValueError(f"No {alias!r} database is configured")
+    target = connections[alias]
+    if target.vendor != "sqlite":
+        raise ValueError(f"{alias!r} is a {target.vendor} database; keep it current with replication instead")
+    started = time.perf_counter()
+    path = snapshot_sqlite(target.settings_dict["NAME"])
+    # This process may hold the replaced file open; the next query reopens it.
+    target.close()
+    return path, time.perf_counter() - started
@@ -0,0 +1,254 @@
+from __future__ import annotations
+import time
+from dataclasses import dataclass
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from payroll.models import (
+    Allowance, Deduction, Employee,
+    PayrollRun, Payslip, PayslipLine,
+)
+from payroll.services.dashboard import invalidate_dashboard_metrics
+from payroll.services.fingerprint import employee_fingerprint, run_context
+from payroll.services.payroll_engine import PayrollEngine
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+@dataclass
+class RunStats:
+    employees: int = 0
+    payslips: int = 0
+    lines: int = 0
+    reused: int = 0  # incremental re-runs: payslips left untouched
+    removed: int = 0  # incremental re-runs: payslips of employees no longer active
+    seconds: float = 0.0
+
+    @property
+    def rows(self) -> int:
+        return self.payslips + self.lines
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+class RunPipeline:
+    """
+    Chunked payroll run: load a chunk of active employees with everything the
+    engine reads prefetched, compute it, then write its payslips and lines
+    with bulk_create inside one transaction per chunk. Each chunk's
+    transaction also moves the run's checkpoint forward, so with
+    resume=True an interrupted run carries on after the last committed
+    chunk, skipping anyone who already has a payslip.
+    """
+
+    def __init__(self, run: PayrollRun, chunk_size: int = DEFAULT_CHUNK_SIZE, engine: PayrollEngine | None = None,
+                 pk_range: tuple[int, int] | None = None, resume: bool = False):
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        self.run = run
+        self.chunk_size = chunk_size
+        self.engine = engine or PayrollEngine(run.period)
+        self.pk_range = pk_range  # inclusive (lo, hi) employee pk shard
+        self.resume = resume
+
+    def base_queryset(self):
+        qs = Employee.objects.filter(is_active=True)
+        if self.pk_range is not None:
+            qs = qs.filter(pk__range=self.pk_range)
+        if self.resume:
+            if self.run.checkpoint is not None:
+                qs = qs.filter(pk__gt=self.run.checkpoint)
+            qs = qs.exclude(pk__in=Payslip.objects.filter(run=self.run).values("employee_id"))
+        return qs
+
+    def employee_queryset(self):
+        return (
+            self.base_queryset()
+            .select_related("grade_step")
+            .prefetch_related(
+                Prefetch("allowances", queryset=Allowance.objects.filter(active=True).select_related("allowance_type")),
+                Prefetch("deductions", queryset=Deduction.objects.filter(active=True).select_related("deduction_type")),
+            )
+            .order_by("pk")
+        )
+
+    def iter_chunks(self):
+        """Yield lists of employees, paging on primary key rather than OFFSET."""
+        qs = self.employee_queryset()
+        last_pk = 0
+        while True:
+            chunk = list(qs.filter(pk__gt=last_pk)[: self.chunk_size])
+            if not chunk:
+                return
+            yield chunk
+            last_pk = chunk[-1].pk
+
+    def fingerprint(self, emp) -> str:
+        if not hasattr(self, "_context"):
+            self._context = run_context(self.engine)
+        return employee_fingerprint(emp, self._context)
+
+    def compute_one(self, emp):
+        res = self.engine.compute_employee(emp)
+        res.fingerprint = self.fingerprint(emp)
+        return res
+
+    def compute_chunk(self, employees):
+        return [(emp.pk, self.compute_one(emp)) for emp in employees]
+
+    def build_payslip(self, emp_pk, res, pk=None) -> Payslip:
+        return Payslip(
+            pk=pk,
+            run=self.run,
+            employee_id_id=emp_pk,
+            gross_pay=res.gross,
+            taxable_income=res.taxable_income,
+            tax=res.tax,
+            statutory_employee=res.statutory_employee,
+            statutory_employer=res.statutory_employer,
+            total_deductions=res.total_deductions,
+            net_pay=res.net,
+            fingerprint=res.fingerprint,
+        )
+
+    def create_lines(self, payslips, results) -> int:
+        return len(PayslipLine.objects.bulk_create([
+            PayslipLine(payslip=slip, kind=kind, label=label, amount=amount)
+            for slip, (_, res) in zip(payslips, results)
+            for kind, label, amount in res.lines
+        ]))
+
+    def write_chunk(self, results) -> tuple[int, int]:
+        with transaction.atomic():
+            payslips = Payslip.objects.bulk_create([self.build_payslip(emp_pk, res) for emp_pk, res in results])
+            n_lines = self.create_lines(payslips, results)
+            if results:
+                self.save_checkpoint(results[-1][0])
+        return len(payslips), n_lines
+
+    def save_checkpoint(self, emp_pk: int) -> None:
+        # Chunks arrive in employee pk order, so the checkpoint only moves forward.
+        self.run.checkpoint = emp_pk
+        PayrollRun.objects.filter(pk=self.run.pk).update(checkpoint=emp_pk, updated_at=timezone.now())
+
+    def execute(self, progress=None) -> RunStats:
+        """Run every chunk; `progress(stats)` is called after each committed chunk and may raise to stop."""
+        stats = RunStats()
+        started = time.perf_counter()
+        for chunk in self.iter_chunks():
+            n_slips, n_lines = self.write_chunk(self.compute_chunk(chunk))
+            stats.employees += len(chunk)
+            stats.payslips += n_slips
+            stats.lines += n_lines
+            if progress is not None:
+                progress(stats)
+        stats.seconds = time.perf_counter() - started
+        self.run.completed_at = timezone.now()
+        PayrollRun.objects.filter(pk=self.run.pk).update(completed_at=self.run.completed_at,
+                                                          updated_at=self.run.completed_at)
+        invalidate_dashboard_metrics()
+        return stats
+
+
+class ColumnarRunPipeline(RunPipeline):
+    """
+    Same write path as RunPipeline, but the whole workforce is computed up
+    front by the vectorized ColumnarEngine; chunks only bound the writes.
+    Payslips are written without fingerprints, so the first incremental
+    re-run of a columnar run recomputes everyone.
+    """
+
+    def __init__(self, run: PayrollRun, chunk_size: int = DEFAULT_CHUNK_SIZE, engine=None, pk_range=None,
+                 resume=False):
+        from payroll.services.columnar_engine import ColumnarEngine
+        super().__init__(run, chunk_size=chunk_size, engine=engine or ColumnarEngine(run.period), pk_range=pk_range,
+                         resume=resume)
+
+    def iter_chunks(self):
+        return self.chunked(self.engine.compute(self.base_queryset()))
+
+    def chunked(self, results):
+        for start in range(0, len(results), self.chunk_size):
+            yield results[start:start + self.chunk_size]
+
+    def compute_chunk(self, results):
+        return results
+
+
+class IncrementalRunPipeline(RunPipeline):
+    """
+    Re-run of a draft PayrollRun: payslips whose input fingerprint still
+    matches are kept as they are; changed ones are recomputed and rewritten
+    in place, new employees are added and payslips of employees who are no
+    longer active are removed.
+    """
+
+    PAYSLIP_FIELDS = ["gross_pay", "taxable_income", "tax", "statutory_employee", "statutory_employer",
+                      "total_deductions", "net_pay", "fingerprint", "updated_at"]
+
+    def execute(self, progress=None) -> RunStats:
+        if self.run.status != PayrollRun.DRAFT:
+            raise ValueError(f"Run {self.run.pk} is {self.run.status}; only draft runs can be re-run")
+        stats = RunStats()
+        started = time.perf_counter()
+        existing = {
+            emp_pk: (slip_pk, fingerprint)
+            for slip_pk, emp_pk, fingerprint in
+            Payslip.objects.filter(run=self.run).values_list("pk", "employee_id", "fingerprint")
+        }
+        for chunk in self.iter_chunks():
+            stats.employees += len(chunk)
+            added, changed = [], []
+            for emp in chunk:
+                slip_pk, old_fingerprint = existing.pop(emp.pk, (None, None))
+                fingerprint = self.fingerprint(emp)
+                if fingerprint == old_fingerprint:
+                    stats.reused += 1
+                    continue
+                res = self.engine.compute_employee(emp)
+                res.fingerprint = fingerprint
+                if slip_pk is None:
+                    added.append((emp.pk, res))
+                else:
+                    changed.append((slip_pk, emp.pk, res))
+            n_slips, n_lines = self.write_changes(added, changed)
+            stats.payslips += n_slips
+            stats.lines += n_lines
+            if progress is not None:
+                progress(stats)
+        stale = [slip_pk for slip_pk, _ in existing.values()]
+        if stale:
+            Payslip.objects.filter(pk__in=stale).delete()
+            stats.removed = len(stale)
+        stats.seconds = time.perf_counter() - started
+        invalidate_dashboard_metrics()
+        return stats
+
+    def write_changes(self, added, changed) -> tuple[int, int]:
+        if not added and not changed:
+            return 0, 0
+        with transaction.atomic():
+            n_slips, n_lines = self.write_chunk(added) if added else (0, 0)
+            if changed:
+                payslips = [self.build_payslip(emp_pk, res, pk=slip_pk) for slip_pk, emp_pk, res in changed]
+                now = timezone.now()
+                for slip in payslips:
+                    slip.updated_at = now  # bulk_update() skips auto_now
+                PayslipLine.objects.filter(payslip__in=[slip.pk for slip in payslips]).delete()
+                Payslip.objects.bulk_update(payslips, self.PAYSLIP_FIELDS)
+                n_lines += self.create_lines(payslips, [(emp_pk, res) for _, emp_pk, res in changed])
+                n_slips += len(payslips)
+        return n_slips, n_lines
+
+    def save_checkpoint(self, emp_pk: int) -> None:
+        # Added employees can sit below the checkpoint (e.g. reactivated), so never move it back.
+        if self.run.checkpoint is None or emp_pk > self.run.checkpoint:
+            super().save_checkpoint(emp_pk)
+
+
+PIPELINES = {
+    "scalar": RunPipeline,
+    "columnar": ColumnarRunPipeline,  # needs numpy
+}
@@ -0,0 +1,64 @@
+from __future__ import annotations
+import re
+from functools import reduce
+from operator import and_, or_
+from django.db import DatabaseError, connections
+from django.db.models import FloatField, IntegerField, Q, Value
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = "payroll_employee_fts"
+# Fields the LIKE fallback searches, mirroring the FTS columns.
+FALLBACK_FIELDS = ("first_name", "last_name", "email", "phone", "position", "department__name", "bank_account_number")
+
+_available: dict[str, bool] = {}
+
+
+def fts_available(using: str = "default") -> bool:
+    """Whether the FTS5 index from migration 0009 exists on this database."""
+    if using not in _available:
+        connection = connections[using]
+        found = False
+        if connection.vendor == "sqlite":
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [FTS_TABLE])
+                    found = cursor.fetchone() is not None
+            except DatabaseError:
+                found = False
+        _available[using] = found
+    return _available[using]
+
+
+def _terms(text: str) -> list[str]:
+    return re.findall(r"\w+", text)
+
+
+def fts_query(text: str) -> str:
+    """User text -> FTS5 MATCH expression: every word must match as a prefix."""
+    return " ".join(f'"{term}"*' for term in _terms(text))
+
+
+def search_employees(queryset, text: str):
+    """
+    Employees matching `text`, best match first (annotated `search_rank`,
+    lower is better). Uses the FTS5 index when present, otherwise the
+    icontains filters EmployeeFilter has always used. Either way every
+    match is returned, so other filters and pagination see all of them.
+    """
+    terms = _terms(text)
+    if not terms:
+        return queryset
+    if not fts_available(queryset.db):
+        return queryset.filter(reduce(and_, (
+            reduce(or_, (Q(**{f"{field}__icontains": term}) for field in FALLBACK_FIELDS)) for term in terms
+        ))).annotate(search_rank=Value(0, output_field=IntegerField())).order_by("search_rank", "pk")
+
+    # The match and its bm25 rank stay in SQL: a rowid IN (...) filter and a
+    # correlated rank lookup by rowid, which FTS5 answers from the index.
+    match = fts_query(text)
+    qn = connections[queryset.db].ops.quote_name
+    pk_column = f"{qn(queryset.model._meta.db_table)}.{qn(queryset.model._meta.pk.column)}"
+    hits = RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [match])
+    rank = RawSQL(f"SELECT rank FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND rowid = {pk_column}", [match],
+                  output_field=FloatField())
+    return queryset.filter(pk__in=hits).annotate(search_rank=rank).order_by("search_rank", "pk")
@@ -0,0 +1,62 @@
+from __future__ import annotations
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from payroll.models import StatutoryConfig
+
+DEC = Decimal
+
+
+class StatutoryResolver:
+    """
+    All StatutoryConfig rows indexed by (applies_to_employee, name), each key
+    holding its effective dates in order. Answers "rate in effect on date D"
+    from memory. Every scheme (Tier 1, Tier 2, employer share...) is tracked
+    separately; a scheme is ended by a later row with a 0% rate.
+    """
+
+    def __init__(self, rows):
+        grouped = defaultdict(list)
+        for applies_to_employee, name, effective_from, rate_percent in rows:
+            grouped[(applies_to_employee, name)].append((effective_from, DEC(str(rate_percent)) / DEC("100")))
+        self._index = {}
+        for key, versions in grouped.items():
+            versions.sort(key=lambda v: v[0])
+            self._index[key] = ([d for d, _ in versions], [r for _, r in versions])
+
+    @classmethod
+    def load(cls) -> "StatutoryResolver":
+        return cls(StatutoryConfig.objects.values_list("applies_to_employee", "name", "effective_from", "rate_percent"))
+
+    def rate(self, name: str, on: date, applies_to_employee: bool = True) -> Decimal:
+        dates, rates = self._index.get((applies_to_employee, name), ((), ()))
+        i = bisect_right(dates, on) - 1
+        return rates[i] if i >= 0 else DEC("0")
+
+    def rates_on(self, on: date, applies_to_employee: bool = True) -> dict[str, Decimal]:
+        """Non-zero rate of every scheme in effect on `on`, by scheme name."""
+        rates = {}
+        for (employee_side, name) in sorted(self._index, key=lambda k: k[1]):
+            if employee_side == applies_to_employee:
+                rate = self.rate(name, on, applies_to_employee)
+                if rate:
+                    rates[name] = rate
+        return rates
+
+
+# Per-process cache, invalidated by the StatutoryConfig signals in payroll.signals
+# (and by services.jobs before every job, for edits made in another process).
+_resolver: StatutoryResolver | None = None
+
+
+def get_statutory_resolver() -> StatutoryResolver:
+    global _resolver
+    if _resolver is None:
+        _resolver = StatutoryResolver.load()
+    return _resolver
+
+
+def invalidate_statutory_resolver() -> None:
+    global _resolver
+    _resolver = None
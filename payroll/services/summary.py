@@ -0,0 +1,45 @@
+from __future__ import annotations
+from django.db import transaction
+from django.db.models import Count, Sum
+from payroll.models import PayrollPeriod, PayrollRun, PayrollSummary, Payslip
+
+SUMMED_FIELDS = ("gross_pay", "tax", "statutory_employee", "statutory_employer", "total_deductions", "net_pay")
+COUNTED_STATUSES = (PayrollRun.APPROVED, PayrollRun.PAID)
+
+
+def rebuild_period_summary(period: PayrollPeriod) -> int:
+    """
+    Replace the period's PayrollSummary rows with one GROUP BY over the
+    payslips of its approved and paid runs. Returns the number of rows.
+    """
+    from payroll.services.dashboard import invalidate_dashboard_metrics
+
+    rows = (
+        Payslip.objects
+        .filter(run__period=period, run__status__in=COUNTED_STATUSES)
+        .values("employee_id__department", "employee_id__employment_type")
+        .annotate(headcount=Count("employee_id", distinct=True), **{f: Sum(f) for f in SUMMED_FIELDS})
+        .order_by()
+    )
+    with transaction.atomic():
+        PayrollSummary.objects.filter(period=period).delete()
+        created = PayrollSummary.objects.bulk_create([
+            PayrollSummary(
+                period=period,
+                department_id=row["employee_id__department"],
+                employment_type=row["employee_id__employment_type"],
+                headcount=row["headcount"],
+                **{f: row[f] for f in SUMMED_FIELDS},
+            )
+            for row in rows
+        ])
+        transaction.on_commit(invalidate_dashboard_metrics)
+    return len(created)
+
+
+def period_totals(period: PayrollPeriod) -> dict:
+    """Whole-period totals read from the summary table."""
+    totals = PayrollSummary.objects.filter(period=period).aggregate(
+        headcount=Sum("headcount"), **{f: Sum(f) for f in SUMMED_FIELDS}
+    )
+    return {k: v or 0 for k, v in totals.items()}
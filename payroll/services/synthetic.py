@@ -0,0 +1,117 @@
+from __future__ import annotations
+import random
+from datetime import date
+from decimal import Decimal
+from django.db import transaction
+from payroll.models import (
+    Allowance, AllowanceType, Deduction, DeductionType, Department, Employee,
+    GradeStep, StatutoryConfig, TaxBracket,
+)
+
+# Seeded employees are recognisable by their e-mail domain, so they can be
+# removed again without touching real staff.
+SEED_DOMAIN = "seed.payroll.test"
+SEED_GRADE = "SYN"
+
+FIRST_NAMES = ["Kwame", "Ama", "Kofi", "Akosua", "Yaw", "Abena", "Kojo", "Efua", "Kwesi", "Adwoa",
+               "Kwabena", "Yaa", "Fiifi", "Esi", "Nana", "Afia", "Ekow", "Araba", "Mensah", "Dzifa"]
+LAST_NAMES = ["Mensah", "Owusu", "Boateng", "Asante", "Osei", "Addo", "Appiah", "Agyeman", "Ofori", "Darko",
+              "Amoah", "Frimpong", "Quaye", "Tetteh", "Annan", "Badu", "Nkrumah", "Sarpong", "Ansah", "Opoku"]
+POSITIONS = ["Lecturer", "Senior Lecturer", "Administrator", "Accountant", "Technician", "Librarian", "Registrar"]
+BANKS = {"GCB Bank": ["Accra Main", "Kumasi", "Tamale"], "Ecobank": ["Ridge", "Osu"], "Stanbic": ["Airport City"],
+         "CalBank": ["Legon", "Tema"]}
+ALLOWANCES = [("Housing", True, False, 0), ("Transport", True, False, 0), ("Research", True, True, 10),
+              ("Book and Research", False, False, 0), ("Responsibility", True, True, 5)]
+DEDUCTIONS = [("Provident Fund", True), ("Staff Loan", False), ("Union Dues", False), ("Welfare", False)]
+# GRA monthly PAYE bands: (band width, rate %); the last band is open-ended.
+TAX_BANDS = [(490, 0), (110, 5), (130, 10), (3166.67, 17.5), (16000, 25), (30520, 30), (None, 35)]
+STATUTORY = [("SSNIT Tier 1", Decimal("5.5"), True), ("SSNIT Tier 2 (Employer)", Decimal("13"), False)]
+
+
+def _catalog(departments: int, grade_steps: int, tax_year: int):
+    depts = [Department.objects.get_or_create(code=f"SYN{i:03d}", defaults={"name": f"Synthetic Department {i}"})[0]
+             for i in range(1, departments + 1)]
+    steps = [
+        GradeStep.objects.get_or_create(grade_code=SEED_GRADE, step=i, defaults={
+            "title": "Synthetic Grade", "basic_salary": Decimal(1800 + 450 * (i - 1))})[0]
+        for i in range(1, grade_steps + 1)
+    ]
+    allowance_types = [
+        AllowanceType.objects.get_or_create(name=name, defaults={
+            "is_taxable": taxable, "is_percent_of_basic": pct, "percent": Decimal(percent)})[0]
+        for name, taxable, pct, percent in ALLOWANCES
+    ]
+    deduction_types = [DeductionType.objects.get_or_create(name=name, defaults={"is_pre_tax": pre_tax})[0]
+                       for name, pre_tax in DEDUCTIONS]
+    if not TaxBracket.objects.filter(year=tax_year).exists():
+        lower = Decimal("0")
+        for width, rate in TAX_BANDS:
+            upper = None if width is None else lower + Decimal(str(width))
+            TaxBracket.objects.create(year=tax_year, lower_bound=lower, upper_bound=upper,
+                                      rate_percent=Decimal(str(rate)))
+            lower = upper
+    if not StatutoryConfig.objects.exists():
+        for name, rate, employee in STATUTORY:
+            StatutoryConfig.objects.create(name=name, rate_percent=rate, effective_from=date(tax_year, 1, 1),
+                                           applies_to_employee=employee)
+    return depts, steps, allowance_types, deduction_types
+
+
+def seed_workforce(employees: int, departments: int = 10, grade_steps: int = 12, seed: int = 0,
+                   tax_year: int | None = None, batch_size: int = 1000) -> dict:
+    """
+    Create a reproducible synthetic workforce: the same arguments always
+    produce the same employees, assignments and amounts. Catalog rows (tax
+    brackets, statutory configs, types) are only added where missing.
+    Returns the number of rows created per model.
+    """
+    if Employee.objects.filter(email__endswith=f"@{SEED_DOMAIN}").exists():
+        raise ValueError("Synthetic employees already exist; remove them first (clear_workforce)")
+    rng = random.Random(seed)
+    tax_year = tax_year or date.today().year
+    with transaction.atomic():
+        depts, steps, allowance_types, deduction_types = _catalog(departments, grade_steps, tax_year)
+        banks = sorted(BANKS)
+        people = []
+        for i in range(employees):
+            bank = rng.choice(banks)
+            step = rng.choice(steps)
+            people.append(Employee(
+                first_name=rng.choice(FIRST_NAMES),
+                last_name=rng.choice(LAST_NAMES),
+                email=f"emp{i:07d}@{SEED_DOMAIN}",
+                phone=f"+99{i:09d}",
+                position=rng.choice(POSITIONS),
+                department=rng.choice(depts),
+                grade_step=step,
+                basic_salary=step.basic_salary,
+                employment_type=rng.choices([Employee.PERMANENT, Employee.CONTRACT, Employee.ADJUNCT], [8, 3, 1])[0],
+                bank_name=bank,
+                bank_branch=rng.choice(BANKS[bank]),
+                bank_account_number=f"{rng.randrange(10 ** 12):013d}",
+                is_active=rng.random() > 0.03,
+            ))
+        people = Employee.objects.bulk_create(people, batch_size=batch_size)
+
+        allowances, deductions = [], []
+        for emp in people:
+            for at in rng.sample(allowance_types, rng.randint(1, 3)):
+                amount = Decimal(0) if at.is_percent_of_basic else Decimal(rng.randrange(100, 1500, 25))
+                allowances.append(Allowance(employee_id=emp, allowance_type=at, amount=amount,
+                                            active=rng.random() > 0.05))
+            for dt in rng.sample(deduction_types, rng.randint(0, 2)):
+                deductions.append(Deduction(employee_id=emp, deduction_type=dt,
+                                            amount=Decimal(rng.randrange(20, 600, 5))))
+        Allowance.objects.bulk_create(allowances, batch_size=batch_size)
+        Deduction.objects.bulk_create(deductions, batch_size=batch_size)
+    return {"departments": len(depts), "grade_steps": len(steps), "employees": len(people),
+            "allowances": len(allowances), "deductions": len(deductions)}
+
+
+def clear_workforce() -> int:
+    """Delete synthetic employees (and their assignments); returns how many were removed."""
+    qs = Employee.objects.filter(email__endswith=f"@{SEED_DOMAIN}")
+    count = qs.count()
+    with transaction.atomic():
+        qs.delete()
+    return count
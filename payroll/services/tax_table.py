@@ -0,0 +1,65 @@
+from __future__ import annotations
+import hashlib
+from bisect import bisect_right
+from dataclasses import dataclass
+from decimal import Decimal
+from payroll.models import TaxBracket
+
+DEC = Decimal
+
+
+@dataclass(frozen=True)
+class TaxTable:
+    """
+    A year's PAYE brackets compiled for lookup. cumulative[i] is the tax due on
+    income up to lowers[i], so tax(x) is one bisect plus one multiply.
+    """
+    year: int
+    lowers: tuple[Decimal, ...]
+    uppers: tuple[Decimal | None, ...]  # None means infinity
+    rates: tuple[Decimal, ...]          # fractions, e.g. 0.175
+    cumulative: tuple[Decimal, ...]
+    version: str                        # content hash; changes when any bracket does
+
+    @classmethod
+    def from_brackets(cls, year: int, brackets) -> "TaxTable":
+        lowers, uppers, rates, cumulative = [], [], [], []
+        running = DEC("0")
+        digest = hashlib.sha1(str(year).encode())
+        for b in sorted(brackets, key=lambda b: b.lower_bound):
+            rate = DEC(str(b.rate_percent)) / DEC("100")
+            lowers.append(b.lower_bound)
+            uppers.append(b.upper_bound)
+            rates.append(rate)
+            cumulative.append(running)
+            if b.upper_bound is not None:
+                running += max(DEC("0"), b.upper_bound - b.lower_bound) * rate
+            digest.update(f"|{b.lower_bound}:{b.upper_bound}:{b.rate_percent}".encode())
+        return cls(year, tuple(lowers), tuple(uppers), tuple(rates), tuple(cumulative), digest.hexdigest())
+
+    def tax(self, taxable: Decimal) -> Decimal:
+        i = bisect_right(self.lowers, taxable) - 1
+        if i < 0:
+            return DEC("0")
+        upper = self.uppers[i]
+        top = taxable if upper is None else min(taxable, upper)
+        return self.cumulative[i] + (top - self.lowers[i]) * self.rates[i]
+
+
+# Per-process cache, invalidated by the TaxBracket signals in payroll.signals
+# (and by services.jobs before every job, for edits made in another process).
+_tables: dict[int, TaxTable] = {}
+
+
+def get_tax_table(year: int) -> TaxTable:
+    table = _tables.get(year)
+    if table is None:
+        table = _tables[year] = TaxTable.from_brackets(year, TaxBracket.objects.filter(year=year))
+    return table
+
+
+def invalidate_tax_table(year: int | None = None) -> None:
+    if year is None:
+        _tables.clear()
+    else:
+        _tables.pop(year, None)
@@ -0,0 +1,150 @@
+from __future__ import annotations
+import csv
+from collections import Counter
+from dataclasses import dataclass
+from decimal import Decimal
+from django.conf import settings
+from django.db.models import Case, DecimalField, F, FloatField, Max, Q, Value, When
+from django.db.models.functions import Abs, Cast, NullIf
+from payroll.models import PayrollRun, Payslip
+from payroll.services.exports import _Echo
+
+NEW = "new"
+MISSING = "missing"
+FLAGGED = "flagged"
+OK = "ok"
+STATUSES = (FLAGGED, NEW, MISSING, OK)
+CENT = Decimal("0.01")
+
+VARIANCE_COLUMNS = [
+    "employee_id", "first_name", "last_name", "department", "status",
+    "prev_gross", "curr_gross", "gross_delta", "gross_pct",
+    "prev_net", "curr_net", "net_delta", "net_pct",
+]
+
+
+@dataclass(frozen=True)
+class Thresholds:
+    """A change is flagged when it is at least `pct` percent AND at least `amount` in absolute terms."""
+    net_pct: float
+    gross_pct: float
+    amount: Decimal
+
+    @classmethod
+    def from_settings(cls, **overrides) -> "Thresholds":
+        values = {
+            "net_pct": getattr(settings, "PAYROLL_VARIANCE_NET_PCT", 10),
+            "gross_pct": getattr(settings, "PAYROLL_VARIANCE_GROSS_PCT", 10),
+            "amount": getattr(settings, "PAYROLL_VARIANCE_MIN_AMOUNT", 0),
+        }
+        values.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(float(values["net_pct"]), float(values["gross_pct"]), Decimal(str(values["amount"])))
+
+
+def prior_period(period) -> tuple[int, int]:
+    """(year, month) of the calendar month before `period`."""
+    return (period.year, period.month - 1) if period.month > 1 else (period.year - 1, 12)
+
+
+def previous_run(run: PayrollRun) -> PayrollRun | None:
+    """
+    The latest approved (or paid) run of the month immediately before the
+    run's period. None if that month has none: an older month is not a
+    like-for-like comparison.
+    """
+    year, month = prior_period(run.period)
+    return (
+        PayrollRun.objects
+        .filter(status__in=[PayrollRun.APPROVED, PayrollRun.PAID], period__year=year, period__month=month)
+        .select_related("period")
+        .order_by("-created_at")
+        .first()
+    )
+
+
+def _changed(field: str, pct: float, amount: Decimal) -> Q:
+    # From a zero base the percentage is undefined; the absolute floor alone decides.
+    return (Q(**{f"{field}_abs_pct__gte": pct, f"{field}_abs_delta__gte": amount})
+            | Q(**{f"prev_{field}": 0, f"{field}_abs_delta__gte": amount}) & Q(**{f"{field}_abs_delta__gt": 0}))
+
+
+def variance_queryset(run: PayrollRun, previous: PayrollRun | None, thresholds: Thresholds):
+    """
+    One grouped query over the payslips of both runs: each employee's row
+    carries the previous and current gross/net (conditional MAX over the
+    (run, employee) index), their deltas and percentage changes, and a
+    status computed in SQL. Employees only in the previous run are
+    "missing", only in this one "new". Filtering on status is a HAVING.
+    """
+    curr = Q(run_id=run.pk)
+    if previous is None:
+        runs = [run.pk]
+        prev_gross = prev_net = Value(None, output_field=DecimalField(max_digits=12, decimal_places=2))
+    else:
+        runs = [run.pk, previous.pk]
+        prev_gross = Max("gross_pay", filter=Q(run_id=previous.pk))
+        prev_net = Max("net_pay", filter=Q(run_id=previous.pk))
+    pct = {}
+    for field in ("gross", "net"):
+        pct[f"{field}_pct"] = (
+            Cast(F(f"{field}_delta"), FloatField()) * Value(100.0)
+            / NullIf(Cast(F(f"prev_{field}"), FloatField()), Value(0.0))
+        )
+    return (
+        Payslip.objects
+        .filter(run_id__in=runs)
+        .values(
+            "employee_id",
+            first_name=F("employee_id__first_name"),
+            last_name=F("employee_id__last_name"),
+            department=F("employee_id__department__name"),
+        )
+        .annotate(
+            prev_gross=prev_gross,
+            curr_gross=Max("gross_pay", filter=curr),
+            prev_net=prev_net,
+            curr_net=Max("net_pay", filter=curr),
+        )
+        .annotate(gross_delta=F("curr_gross") - F("prev_gross"), net_delta=F("curr_net") - F("prev_net"))
+        .annotate(**pct)
+        .annotate(
+            gross_abs_delta=Abs("gross_delta"), net_abs_delta=Abs("net_delta"),
+            gross_abs_pct=Abs("gross_pct"), net_abs_pct=Abs("net_pct"),
+        )
+        .annotate(status=Case(
+            When(prev_net__isnull=True, then=Value(NEW)),
+            When(curr_net__isnull=True, then=Value(MISSING)),
+            When(_changed("net", thresholds.net_pct, thresholds.amount)
+                 | _changed("gross", thresholds.gross_pct, thresholds.amount), then=Value(FLAGGED)),
+            default=Value(OK),
+        ))
+        .order_by("employee_id")
+    )
+
+
+def variance_rows(run: PayrollRun, previous: PayrollRun | None, thresholds: Thresholds | None = None,
+                  statuses=None, chunk_size: int = 2000):
+    """
+    Yield one dict per employee (VARIANCE_COLUMNS), compared with `previous`
+    (usually previous_run(run)), optionally only rows whose status is in
+    `statuses`.
+    """
+    qs = variance_queryset(run, previous, thresholds or Thresholds.from_settings())
+    if statuses:
+        qs = qs.filter(status__in=list(statuses))
+    for row in qs.iterator(chunk_size=chunk_size):
+        for field in VARIANCE_COLUMNS[5:]:
+            if row[field] is not None:
+                row[field] = round(row[field], 2) if field.endswith("_pct") else row[field].quantize(CENT)
+        yield {column: row[column] for column in VARIANCE_COLUMNS}
+
+
+def variance_summary(rows) -> Counter:
+    return Counter(row["status"] for row in rows)
+
+
+def iter_variance_csv(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(VARIANCE_COLUMNS)
+    for row in rows:
+        yield writer.writerow([row[column] for column in VARIANCE_COLUMNS])
@@ -0,0 +1,114 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+from payroll.models import PayrollRun, Payslip, YearToDate
+from payroll.services.summary import COUNTED_STATUSES
+
+YTD_FIELDS = ("gross_pay", "taxable_income", "tax", "statutory_employee", "statutory_employer",
+              "total_deductions", "net_pay")
+CHECKED_FIELDS = ("payslips", *YTD_FIELDS)
+BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class Drift:
+    employee_id: int
+    year: int
+    field: str
+    stored: Decimal | int
+    expected: Decimal | int
+
+
+def _post_run(run: PayrollRun, sign: int) -> int:
+    """
+    Add (sign=1) or subtract (sign=-1) every payslip of `run` to its
+    employee's YearToDate row for the run's year: one read of the payslips,
+    one locked read of the affected rows, then bulk writes. Rows whose
+    last payslip is subtracted are deleted. Returns the number of rows touched.
+    """
+    year = run.period.year
+    with transaction.atomic():
+        rows = {
+            ytd.employee_id: ytd
+            for ytd in YearToDate.objects.select_for_update()
+            .filter(year=year, employee_id__in=run.payslips.values("employee_id"))
+        }
+        now = timezone.now()
+        created, updated = [], []
+        for slip in run.payslips.values("employee_id", *YTD_FIELDS).iterator(chunk_size=BATCH_SIZE):
+            ytd = rows.get(slip["employee_id"])
+            if ytd is None:
+                ytd = rows[slip["employee_id"]] = YearToDate(employee_id=slip["employee_id"], year=year)
+                created.append(ytd)
+            else:
+                updated.append(ytd)
+            ytd.payslips += sign
+            for field in YTD_FIELDS:
+                setattr(ytd, field, getattr(ytd, field) + sign * slip[field])
+            ytd.updated_at = now
+
+        emptied = [ytd.pk for ytd in updated if ytd.payslips == 0]
+        YearToDate.objects.filter(pk__in=emptied).delete()
+        YearToDate.objects.bulk_update([ytd for ytd in updated if ytd.payslips != 0],
+                                       [*CHECKED_FIELDS, "updated_at"], batch_size=BATCH_SIZE)
+        YearToDate.objects.bulk_create(created, batch_size=BATCH_SIZE)
+    return len(created) + len(updated)
+
+
+def post_run(run: PayrollRun) -> int:
+    """Add an approved run's payslips to the year-to-date totals."""
+    return _post_run(run, 1)
+
+
+def unpost_run(run: PayrollRun) -> int:
+    """Take a run's payslips back out of the year-to-date totals."""
+    return _post_run(run, -1)
+
+
+def ytd_from_payslips(year: int | None = None):
+    """The YearToDate values recomputed from approved and paid payslips, one row per (employee, year)."""
+    qs = Payslip.objects.filter(run__status__in=COUNTED_STATUSES)
+    if year is not None:
+        qs = qs.filter(run__period__year=year)
+    return (
+        qs.values("employee_id", year=F("run__period__year"))
+        .annotate(payslips=Count("pk"), **{field: Sum(field) for field in YTD_FIELDS})
+        .order_by()
+    )
+
+
+def verify_ytd(year: int | None = None, repair: bool = False) -> list[Drift]:
+    """
+    Compare the YearToDate table with totals rebuilt from the payslips and
+    return every difference. With repair=True the drifted rows are
+    rewritten from the payslips; the runs of the year are locked first so
+    no approval or rollback can post in between.
+    """
+    with transaction.atomic():
+        if repair:
+            runs = PayrollRun.objects.select_for_update()
+            list((runs if year is None else runs.filter(period__year=year)).values_list("pk", flat=True))
+        stored_qs = YearToDate.objects.all() if year is None else YearToDate.objects.filter(year=year)
+        stored = {(ytd.employee_id, ytd.year): ytd for ytd in stored_qs.iterator(chunk_size=BATCH_SIZE)}
+        expected = {(row["employee_id"], row["year"]): row for row in ytd_from_payslips(year)}
+
+        drift = []
+        for key in sorted(stored.keys() | expected.keys()):
+            have, want = stored.get(key), expected.get(key)
+            for field in CHECKED_FIELDS:
+                value = getattr(have, field) if have else 0
+                target = want[field] if want else 0
+                if value != target:
+                    drift.append(Drift(*key, field, value, target))
+
+        if repair and drift:
+            keys = {(d.employee_id, d.year) for d in drift}
+            YearToDate.objects.filter(pk__in=[stored[key].pk for key in keys if key in stored]).delete()
+            YearToDate.objects.bulk_create([
+                YearToDate(employee_id=key[0], year=key[1], **{field: expected[key][field] for field in CHECKED_FIELDS})
+                for key in sorted(keys) if key in expected
+            ], batch_size=BATCH_SIZE)
+    return drift
@@ -0,0 +1,40 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Employee, PayrollRecord, PayrollRun, PayrollSummary, Payslip, StatutoryConfig, TaxBracket
+from .services.dashboard import invalidate_dashboard_metrics
+from .services.statutory import invalidate_statutory_resolver
+from .services.tax_table import invalidate_tax_table
+
+
+@receiver(post_save, sender=TaxBracket)
+def tax_bracket_saved(sender, instance, **kwargs):
+    # An edit may have moved the bracket to another year, so drop every table.
+    invalidate_tax_table()
+
+
+@receiver(post_delete, sender=TaxBracket)
+def tax_bracket_deleted(sender, instance, **kwargs):
+    invalidate_tax_table(instance.year)
+
+
+@receiver(post_save, sender=StatutoryConfig)
+@receiver(post_delete, sender=StatutoryConfig)
+def statutory_config_changed(sender, instance, **kwargs):
+    invalidate_statutory_resolver()
+
+
+# bulk_create/bulk_update send no signals; the run pipelines and
+# rebuild_period_summary invalidate explicitly after writing. Payslips and
+# records get no post_delete receiver, which would stop Django from deleting
+# them in one query: they go with their run (whose delete is caught below) or
+# through the pipelines, which invalidate after pruning.
+@receiver(post_save, sender=Employee)
+@receiver(post_delete, sender=Employee)
+@receiver(post_save, sender=PayrollRun)
+@receiver(post_delete, sender=PayrollRun)
+@receiver(post_save, sender=Payslip)
+@receiver(post_save, sender=PayrollRecord)
+@receiver(post_delete, sender=PayrollSummary)
+def dashboard_data_changed(sender, instance, **kwargs):
+    invalidate_dashboard_metrics()
@@ -0,0 +1,19 @@
+import pytest
+from django.core.cache import cache
+
+from accounts.backends import user_cache
+from payroll.services.statutory import invalidate_statutory_resolver
+from payroll.services.tax_table import invalidate_tax_table
+
+
+@pytest.fixture(autouse=True)
+def clear_payroll_caches():
+    # Per-process caches survive the per-test transaction rollback.
+    invalidate_tax_table()
+    invalidate_statutory_resolver()
+    cache.clear()
+    user_cache().clear()  # shared, so it also outlives the test process
+    yield
+    invalidate_tax_table()
+    invalidate_statutory_resolver()
+    user_cache().clear()
@@ -0,0 +1,137 @@
+# tests/test_api.py
+import pytest
+from datetime import date
+from decimal import Decimal as DEC
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from payroll.models import Department, Employee, GradeStep, PayrollPeriod, PayrollRun, StatutoryConfig, TaxBracket
+from payroll.services.approval import approve_run
+from payroll.services.run_pipeline import IncrementalRunPipeline, RunPipeline
+
+
+@pytest.mark.django_db
+class TestReadOnlyApi:
+    def setup_method(self):
+        self.user = get_user_model().objects.create_user(email="auditor@example.com", password="x",
+                                                         username="auditor", role="auditor")
+        TaxBracket.objects.create(year=2025, lower_bound=DEC("0"), upper_bound=None, rate_percent=DEC("10"))
+        StatutoryConfig.objects.create(name="SSNIT Tier 1", rate_percent=DEC("5.5"), effective_from=date(2020, 1, 1))
+        self.employees = [
+            Employee.objects.create(first_name=f"E{i}", last_name="T", email=f"e{i}@example.com", phone=f"0{i}",
+                                    position="Staff", basic_salary=DEC(1000 + i))
+            for i in range(7)
+        ]
+        self.period = PayrollPeriod.objects.create(year=2025, month=8)
+        self.run = PayrollRun.objects.create(period=self.period, created_by=self.user)
+        RunPipeline(self.run).execute()
+
+    def test_cursor_pagination_and_fields(self, client):
+        client.force_login(self.user)
+        url = reverse("payroll:api_employee_list")
+        data = client.get(url, {"limit": 3, "fields": "id,first_name"}).json()
+        assert data["results"] == [{"id": e.pk, "first_name": e.first_name} for e in self.employees[:3]]
+        assert data["previous"] is None
+
+        seen = [row["id"] for row in data["results"]]
+        while data["next"]:
+            data = client.get(data["next"]).json()
+            seen += [row["id"] for row in data["results"]]
+            assert set(data["results"][0]) == {"id", "first_name"}
+        assert seen == [e.pk for e in self.employees]
+
+        assert client.get(url, {"fields": "id,salary"}).json() == {"error": "Unknown fields: salary"}
+        assert client.get(url, {"limit": 0}).status_code == 400
+        assert client.get(url, {"department": "x"}).status_code == 400
+
+    def test_payslips_with_lines_and_filters(self, client):
+        client.force_login(self.user)
+        data = client.get(reverse("payroll:api_payslip_list"), {"period": "2025-08"}).json()
+        assert len(data["results"]) == 7
+        slip = data["results"][0]
+        assert slip["period"] == "2025-08" and slip["lines"]
+        assert {"kind", "label", "amount"} == set(slip["lines"][0])
+        assert client.get(reverse("payroll:api_payslip_list"), {"period": "2025-09"}).json()["results"] == []
+
+        pk = slip["id"]
+        detail = client.get(reverse("payroll:api_payslip_detail", kwargs={"pk": pk}), {"fields": "net_pay"}).json()
+        assert detail == {"net_pay": slip["net_pay"]}
+        assert client.get(reverse("payroll:api_payslip_detail", kwargs={"pk": 10 ** 6})).status_code == 404
+
+    def test_etag_revalidation(self, client, django_assert_max_num_queries):
+        client.force_login(self.user)
+        emp = self.employees[0]
+        url = reverse("payroll:api_employee_detail", kwargs={"pk": emp.pk})
+        first = client.get(url)
+        etag = first["ETag"]
+        assert etag.startswith('"') and "no-cache" in first["Cache-Control"]
+
+        with django_assert_max_num_queries(3):  # session, user, the row's version
+            again = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert again.status_code == 304 and again["ETag"] == etag and not again.content
+
+        assert client.get(url, {"fields": "id"})["ETag"] != etag  # another representation
+        emp.position = "Senior Staff"
+        emp.save()
+        changed = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert changed.status_code == 200 and changed.json()["position"] == "Senior Staff"
+
+    def test_etag_follows_related_names(self, client):
+        client.force_login(self.user)
+        emp = self.employees[1]
+        emp.department = Department.objects.create(name="Science", code="SCI")
+        emp.grade_step = GradeStep.objects.create(title="Lecturer", grade_code="L", step=1, basic_salary=DEC("2000"))
+        emp.save()
+        url = reverse("payroll:api_employee_detail", kwargs={"pk": emp.pk})
+        etag = client.get(url)["ETag"]
+
+        Department.objects.filter(pk=emp.department_id).update(name="Natural Sciences")
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response.json()["department"] == "Natural Sciences"
+
+        etag = response["ETag"]
+        GradeStep.objects.filter(pk=emp.grade_step_id).update(title="Senior Lecturer")
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200 and response.json()["grade_step"] == "Senior Lecturer (L-1)"
+        list_url = reverse("payroll:api_employee_list")
+        assert client.get(list_url, HTTP_IF_NONE_MATCH=client.get(list_url)["ETag"]).status_code == 304
+
+    def test_list_etag_follows_rows(self, client):
+        client.force_login(self.user)
+        url = reverse("payroll:api_payslip_list")
+        etag = client.get(url, {"run": self.run.pk})["ETag"]
+        assert client.get(url, {"run": self.run.pk}, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+        Employee.objects.filter(pk=self.employees[2].pk).update(basic_salary=DEC("5000"))
+        IncrementalRunPipeline(self.run).execute()  # bulk_update of the changed payslip
+        assert client.get(url, {"run": self.run.pk}, HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_closed_period_is_cacheable(self, client):
+        client.force_login(self.user)
+        slips = reverse("payroll:api_payslip_list")
+        run_url = reverse("payroll:api_run_detail", kwargs={"pk": self.run.pk})
+        open_etag = client.get(run_url)["ETag"]
+
+        approve_run(self.run)
+        self.period.is_closed = True
+        self.period.save()
+
+        response = client.get(run_url, HTTP_IF_NONE_MATCH=open_etag)
+        assert response.status_code == 200 and response.json()["period_closed"] is True
+        assert "max-age=3600" in response["Cache-Control"] and "immutable" not in response["Cache-Control"]
+        assert client.get(run_url, HTTP_IF_NONE_MATCH=response["ETag"]).status_code == 304
+
+        assert "max-age=3600" in client.get(slips, {"period": "2025-08"})["Cache-Control"]
+        assert "no-cache" in client.get(slips)["Cache-Control"]  # new runs could still add rows
+        period = client.get(reverse("payroll:api_period_detail", kwargs={"pk": self.period.pk}))
+        assert "max-age=3600" in period["Cache-Control"]
+
+    def test_read_only_and_role_protected(self, client):
+        url = reverse("payroll:api_run_list")
+        assert client.get(url).status_code == 302
+        client.force_login(self.user)
+        assert client.post(url).status_code == 405
+        client.force_login(get_user_model().objects.create_user(email="kofi@example.com", password="x",
+                                                                username="kofi"))
+        assert client.get(url).status_code == 403
@@ -0,0 +1,164 @@
+# tests/test_async_views.py
+import csv
+import io
+import logging
+import threading
+import time
+import pytest
+from decimal import Decimal as DEC
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+
+from payroll.db_router import SESSION_LAST_WRITE
+from payroll.models import Employee, PayrollPeriod, PayrollRecord, PayrollRun, Payslip
+from payroll.services.loadtest import ramp, run_level, session_cookie
+
+
+async def body(response):
+    if response.is_async:
+        return b"".join([chunk async for chunk in response.streaming_content])
+    return b"".join(response.streaming_content)
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 64
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+@pytest.mark.django_db
+class TestAsyncViews:
+    def setup_method(self):
+        User = get_user_model()
+        self.officer = User.objects.create_user(email="officer@example.com", password="x", username="officer",
+                                                role="payroll_officer")
+        self.staff = User.objects.create_user(email="kofi@example.com", password="x", username="kofi")
+        period = PayrollPeriod.objects.create(year=2025, month=8)
+        run = PayrollRun.objects.create(period=period, created_by=self.officer)
+        for i in range(5):
+            emp = Employee.objects.create(user=self.staff if i == 0 else None, first_name=f"E{i}", last_name="T",
+                                          email=f"e{i}@example.com", phone=f"0{i}", position="Staff",
+                                          basic_salary=DEC("1000"))
+            slip = Payslip.objects.create(run=run, employee_id=emp, gross_pay=DEC("1000"), taxable_income=DEC("945"),
+                                          tax=DEC("100"), total_deductions=DEC("155"), net_pay=DEC("845"))
+            PayrollRecord.objects.create(payslip=slip, employee_id=emp, component_type="NET", gross_salary=DEC("1000"),
+                                         tax=DEC("100"), net_salary=DEC("845"), period_start=period.start_date,
+                                         period_end=period.end_date)
+            if i == 0:
+                self.slip = slip
+
+    @async_to_sync
+    async def get(self, user, url, **params):
+        client = AsyncClient()
+        if user is not None:
+            await client.aforce_login(user)
+        response = await client.get(url, params)
+        return response, (await body(response) if response.streaming else response.content)
+
+    def test_pages(self):
+        for name, kwargs in [("dashboard", {}), ("employee_list", {}), ("payroll_list", {}),
+                             ("employee_detail", {"pk": self.slip.employee_id_id}),
+                             ("payroll_detail", {"pk": PayrollRecord.objects.first().pk})]:
+            response, content = self.get(self.officer, reverse(f"payroll:{name}", kwargs=kwargs))
+            assert response.status_code == 200, name
+        response, content = self.get(self.officer, reverse("payroll:employee_list"))
+        assert b"E4" in content
+
+    def test_role_check(self):
+        response, _ = self.get(None, reverse("payroll:employee_list"))
+        assert response.status_code == 302 and "login" in response["Location"]
+        response, _ = self.get(self.staff, reverse("payroll:employee_list"))
+        assert response.status_code == 403
+        response, _ = self.get(self.officer, reverse("payroll:employee_detail", kwargs={"pk": 999}))
+        assert response.status_code == 404
+
+    def test_export_streams_asynchronously_under_asgi(self, client):
+        response, content = self.get(self.officer, reverse("payroll:payroll_export"), period="2025-08")
+        assert response.is_async
+        rows = list(csv.reader(io.StringIO(content.decode())))
+        assert rows[0][0] == "Record ID" and len(rows) == 6
+
+        client.force_login(self.officer)
+        wsgi = client.get(reverse("payroll:payroll_export"), {"period": "2025-08"})
+        assert not wsgi.is_async and b"".join(wsgi.streaming_content) == content
+
+    def test_payslip_download(self, settings, tmp_path):
+        settings.PAYROLL_PAYSLIP_PDF_DIR = tmp_path
+        url = reverse("payroll:payslip_pdf", kwargs={"pk": self.slip.pk})
+        response, content = self.get(self.staff, url)
+        assert response.status_code == 200 and response.is_async
+        assert content.startswith(b"%PDF") and int(response["Content-Length"]) == len(content)
+        assert 'filename="payslip_' in response["Content-Disposition"]
+
+        other = Payslip.objects.exclude(pk=self.slip.pk).first()
+        response, _ = self.get(self.staff, reverse("payroll:payslip_pdf", kwargs={"pk": other.pk}))
+        assert response.status_code == 403
+
+    def test_middleware_chain_runs_without_threads(self, caplog):
+        with caplog.at_level(logging.DEBUG, logger="django.request"), override_settings(DEBUG=True):
+            ASGIHandler().load_middleware(is_async=True)  # adaptations are only logged with DEBUG
+        assert not [r for r in caplog.records if "adapted" in r.getMessage()]
+
+    @override_settings(PAYROLL_SQL_PROFILE_SAMPLE_RATE=1.0)
+    def test_async_requests_are_profiled(self):
+        response, _ = self.get(self.officer, reverse("payroll:employee_list"))
+        assert response.status_code == 200 and 'queries"' in response["Server-Timing"]
+        assert 'desc="0 queries"' not in response["Server-Timing"]
+
+    def test_async_write_stamps_the_session(self):
+        @async_to_sync
+        async def post():
+            client = AsyncClient()
+            await client.aforce_login(self.officer)
+            await client.post(reverse("payroll:job_list"), {"period": "2025-09"})
+            return await (await client.asession()).aget(SESSION_LAST_WRITE)
+
+        assert post() is not None
+
+    def test_session_cookie_logs_in(self, client):
+        name, key = session_cookie(self.officer).split("=")
+        client.cookies[name] = key
+        assert client.get(reverse("payroll:employee_list")).status_code == 200
+
+
+class TestLoadTest:
+    def serve(self, app):
+        server = make_server("127.0.0.1", 0, app, server_class=ThreadingWSGIServer, handler_class=QuietHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server, f"http://127.0.0.1:{server.server_port}/slow/?x=1"
+
+    def test_levels(self):
+        seen = []
+
+        def app(environ, start_response):
+            seen.append(environ["PATH_INFO"] + "?" + environ["QUERY_STRING"])
+            time.sleep(0.05)
+            status = "200 OK" if environ.get("HTTP_X_TOKEN") == "t" else "403 Forbidden"
+            start_response(status, [("Content-Type", "text/plain")])
+            return [b"x" * 1000]
+
+        server, url = self.serve(app)
+        try:
+            level = async_to_sync(run_level)(url, 10, 30, {"X-Token": "t"})
+            assert (level.requests, level.ok, level.bytes) == (30, 30, 30000)
+            assert level.peak_in_flight == 10 and seen[0] == "/slow/?x=1"
+            # 30 requests of 50 ms over 10 connections take about 3 rounds, not 30
+            assert level.seconds < 1.0
+            assert level.as_dict()["latency_ms"]["p50"] >= 50
+
+            report = ramp(url, levels=(2, 4), requests_per_client=2, headers={"X-Token": "wrong"})
+            assert report["capacity"] is None
+            assert report["levels"][0]["errors"] == {"403": 4} and not report["levels"][0]["held"]
+        finally:
+            server.shutdown()
+            server.server_close()
@@ -0,0 +1,81 @@
+# tests/test_bank_files.py
+import csv
+import pytest
+from decimal import Decimal as DEC
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from payroll.models import Employee, PayrollPeriod, PayrollRun, Payslip
+from payroll.services.bank_files import FIXED_LAYOUT, write_bank_files
+
+
+@pytest.mark.django_db
+class TestBankFiles:
+    def setup_method(self):
+        user = get_user_model().objects.create_user(email="officer@example.com", password="x", username="officer")
+        self.run = PayrollRun.objects.create(period=PayrollPeriod.objects.create(year=2025, month=8),
+                                             created_by=user, status=PayrollRun.APPROVED)
+        layout = [("GCB", "Legon"), ("Ecobank", "Osu"), ("GCB ", "Accra Central"), ("gcb", "legon"), ("", "")]
+        for i, (bank, branch) in enumerate(layout * 3):
+            emp = Employee.objects.create(first_name=f"E{i}", last_name="T", email=f"e{i}@example.com", phone=f"0{i}",
+                                          position="Staff", basic_salary=DEC("1000"), bank_name=bank,
+                                          bank_branch=branch, bank_account_number=f"ACC{i:05d}")
+            Payslip.objects.create(run=self.run, employee_id=emp, gross_pay=DEC("1000"), taxable_income=DEC("1000"),
+                                   tax=DEC("0"), total_deductions=DEC("0"), net_pay=DEC("100.25") * (i + 1))
+
+    def test_one_csv_per_bank_with_control_totals(self, tmp_path):
+        files = {f.bank: f for f in write_bank_files(self.run, tmp_path)}
+        assert set(files) == {"GCB", "ECOBANK", "UNASSIGNED"}  # spellings of one bank share a file
+        assert files["GCB"].count == 9
+        assert sum(f.total for f in files.values()) == sum(DEC("100.25") * i for i in range(1, 16))
+
+        rows = list(csv.reader(files["GCB"].path.open()))
+        assert rows[0][0] == "H" and rows[0][4:] == ["9", str(files["GCB"].total)]
+        assert [r[1] for r in rows if r[0] == "B"] == ["ACCRA CENTRAL", "LEGON"]
+        assert rows[-1] == ["T", "9", str(files["GCB"].total)]
+
+    def test_fixed_width_records(self, tmp_path):
+        [path] = [f.path for f in write_bank_files(self.run, tmp_path, fmt="fixed") if f.bank == "ECOBANK"]
+        lines = path.read_text().splitlines()
+        assert {len(line) for line in lines if line[0] == "D"} == {124}
+        assert lines[-1] == "T" + "3".zfill(7) + str(int((DEC("100.25") * (2 + 7 + 12)) * 100)).zfill(15)
+
+    def test_names_that_share_a_file_are_refused(self, tmp_path):
+        Employee.objects.filter(bank_name="Ecobank").update(bank_name="G.C.B.")
+        with pytest.raises(ValueError, match="would share"):
+            write_bank_files(self.run, tmp_path)  # "GCB" and "G.C.B." both slugify to "gcb"
+        assert not list(tmp_path.iterdir())
+
+    def test_missing_account_is_refused(self, tmp_path):
+        emp = Employee.objects.get(first_name="E7")
+        Employee.objects.filter(pk=emp.pk).update(bank_account_number=" ")
+        with pytest.raises(ValueError, match=f"Employee {emp.pk} \\(E7 T\\) has no bank account number"):
+            write_bank_files(self.run, tmp_path)
+        assert not list(tmp_path.iterdir())
+
+    def test_long_account_is_refused_in_fixed_width(self, tmp_path):
+        emp = Employee.objects.get(first_name="E7")
+        Employee.objects.filter(pk=emp.pk).update(bank_account_number="1" * 21)
+        with pytest.raises(ValueError, match=f"Employee {emp.pk} .*longer than 20"):
+            write_bank_files(self.run, tmp_path, fmt="fixed")
+        assert not list(tmp_path.iterdir())
+        assert len(write_bank_files(self.run, tmp_path)) == 3  # CSV has no width limit
+
+    def test_amount_overflow_is_refused(self, tmp_path, monkeypatch):
+        layout = dict(FIXED_LAYOUT, D=[(1, "<"), (35, "<"), (20, "<"), (35, "<"), (5, ">"), (18, "<")])
+        monkeypatch.setattr("payroll.services.bank_files.FIXED_LAYOUT", layout)
+        emp = Employee.objects.get(first_name="E9")  # unassigned bank, written first; 1002.50
+        with pytest.raises(ValueError, match=f"Employee {emp.pk} .*100250 does not fit the 5-digit field"):
+            write_bank_files(self.run, tmp_path, fmt="fixed")
+        assert not list(tmp_path.iterdir())
+
+    def test_draft_run_is_refused(self, tmp_path):
+        self.run.status = PayrollRun.DRAFT
+        self.run.save()
+        with pytest.raises(ValueError):
+            write_bank_files(self.run, tmp_path)
+
+    def test_command(self, tmp_path, capsys):
+        call_command("bank_transfer_files", str(self.run.pk), "--output-dir", str(tmp_path))
+        assert "Wrote 3 bank files" in capsys.readouterr().out
@@ -0,0 +1,88 @@
+# tests/test_benchmark.py
+import json
+import time
+import pytest
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from payroll.models import Allowance, Employee, PayrollPeriod, PayrollRun, Payslip, TaxBracket
+from payroll.services.benchmark import benchmark_run, percentile
+from payroll.services.synthetic import SEED_DOMAIN, seed_workforce
+
+
+def snapshot():
+    return list(Employee.objects.order_by("email").values_list(
+        "first_name", "last_name", "email", "department__code", "grade_step__step", "bank_account_number"))
+
+
+@pytest.mark.django_db
+class TestSyntheticWorkforce:
+    def test_same_seed_same_data(self):
+        counts = seed_workforce(40, departments=3, seed=7, tax_year=2025)
+        assert counts["employees"] == 40 and counts["departments"] == 3
+        first = snapshot(), sorted(Allowance.objects.values_list("employee_id__email", "amount"))
+        call_command("seed_payroll", employees=40, departments=3, seed=7, tax_year=2025, reset=True)
+        assert (snapshot(), sorted(Allowance.objects.values_list("employee_id__email", "amount"))) == first
+        assert TaxBracket.objects.filter(year=2025).count() == 7  # catalog is not duplicated
+
+    def test_refuses_to_seed_twice(self):
+        seed_workforce(5, tax_year=2025)
+        with pytest.raises(CommandError):
+            call_command("seed_payroll", employees=5, tax_year=2025)
+        assert Employee.objects.filter(email__endswith=SEED_DOMAIN).count() == 5
+
+
+@pytest.mark.django_db
+class TestBenchPayroll:
+    def setup_method(self):
+        self.user = get_user_model().objects.create_superuser(email="admin@example.com", password="x",
+                                                              username="admin", role="admin")
+        seed_workforce(30, departments=2, seed=1, tax_year=2025)
+        self.active = Employee.objects.filter(is_active=True).count()
+
+    def test_phases_and_latencies(self):
+        run = PayrollRun.objects.create(period=PayrollPeriod.objects.create(year=2025, month=8), created_by=self.user)
+        result = benchmark_run(run, chunk_size=8)
+        report = result.as_dict()
+
+        assert report["employees"] == report["payslips"] == self.active == len(result.latencies)
+        assert set(report["phases"]) == {"load", "compute", "write"}
+        # Prefetched and cached: the compute phase never touches the database
+        assert report["phases"]["compute"]["queries"] <= 2  # first lookup of tax table and statutory rates
+        assert report["phases"]["load"]["queries"] == 3 * (-(-self.active // 8)) + 1
+        assert report["latency_ms"]["p50"] <= report["latency_ms"]["p99"]
+        assert Payslip.objects.filter(run=run).count() == self.active
+
+    def test_columnar_phases(self, monkeypatch):
+        from payroll.services.columnar_engine import ColumnarEngine
+
+        compute_loaded = ColumnarEngine.compute_loaded
+
+        def slow_compute(engine, columns):
+            time.sleep(0.05)
+            return compute_loaded(engine, columns)
+        monkeypatch.setattr(ColumnarEngine, "compute_loaded", slow_compute)
+
+        run = PayrollRun.objects.create(period=PayrollPeriod.objects.create(year=2025, month=8), created_by=self.user)
+        report = benchmark_run(run, mode="columnar", chunk_size=8).as_dict()
+        assert report["payslips"] == self.active
+        assert report["phases"]["compute"]["seconds"] >= 0.05  # the vectorized pass is booked as compute
+        assert report["phases"]["compute"]["queries"] == 0 and report["phases"]["load"]["queries"] > 0
+
+    def test_command_appends_json_and_discards_run(self, tmp_path):
+        out = tmp_path / "bench.jsonl"
+        call_command("bench_payroll", "2025-08", chunk_size=10, output=str(out), label="a")
+        call_command("bench_payroll", "2025-08", chunk_size=10, output=str(out), label="b")
+
+        reports = [json.loads(line) for line in out.read_text().splitlines()]
+        assert [r["label"] for r in reports] == ["a", "b"]
+        assert reports[0]["employees"] == self.active
+        assert reports[0]["queries_per_employee"] < 1
+        assert not PayrollRun.objects.exists()
+
+    def test_percentile(self):
+        assert percentile([], 50) is None
+        assert percentile([1, 2, 3, 4], 50) == 2
+        assert percentile([1, 2, 3, 4], 99) == 4
@@ -0,0 +1,58 @@
+# tests/test_dashboard.py
+import pytest
+from decimal import Decimal as DEC
+
+from django.contrib.auth import get_user_model
+from django.db.models.deletion import Collector
+from django.urls import reverse
+
+from payroll.models import Employee, PayrollPeriod, PayrollRecord, PayrollRun
+from payroll.services.dashboard import get_dashboard_metrics
+from payroll.services.run_pipeline import RunPipeline
+
+
+@pytest.mark.django_db
+class TestDashboardMetrics:
+    def setup_method(self):
+        self.user = get_user_model().objects.create_user(email="hr@example.com", password="x",
+                                                         username="hr", role="hr_manager")
+        for i in range(3):
+            Employee.objects.create(first_name=f"E{i}", last_name="T", email=f"e{i}@example.com", phone=f"0{i}",
+                                    position="Staff", basic_salary=DEC("1000"),
+                                    employment_type=Employee.CONTRACT if i else Employee.PERMANENT)
+
+    def test_cached_until_employee_changes(self, django_assert_num_queries):
+        metrics = get_dashboard_metrics()
+        assert (metrics["total_employees"], metrics["contract_employees"]) == (3, 2)
+        with django_assert_num_queries(0):
+            assert get_dashboard_metrics()["computed_at"] == metrics["computed_at"]
+
+        emp = Employee.objects.first()
+        emp.is_active = False
+        emp.save()
+        assert get_dashboard_metrics()["active_employees"] == 2
+
+    def test_bulk_written_payslips_invalidate(self):
+        assert get_dashboard_metrics()["total_payslips"] == 0
+        run = PayrollRun.objects.create(period=PayrollPeriod.objects.create(year=2025, month=8), created_by=self.user)
+        RunPipeline(run).execute()
+        metrics = get_dashboard_metrics()
+        assert (metrics["total_payslips"], metrics["draft_runs"]) == (3, 1)
+
+    def test_deleting_a_run_invalidates_without_payslip_signals(self, django_assert_num_queries):
+        run = PayrollRun.objects.create(period=PayrollPeriod.objects.create(year=2025, month=8), created_by=self.user)
+        RunPipeline(run).execute()
+        assert get_dashboard_metrics()["total_payslips"] == 3
+        assert Collector(using="default").can_fast_delete(PayrollRecord.objects.all())
+        with django_assert_num_queries(1):
+            PayrollRecord.objects.all().delete()
+        run.delete()
+        assert get_dashboard_metrics()["total_payslips"] == 0
+
+    def test_page_served_from_cache(self, client, django_assert_max_num_queries):
+        client.force_login(self.user)
+        client.get(reverse("payroll:dashboard"))
+        with django_assert_max_num_queries(2):  # session + user only
+            response = client.get(reverse("payroll:dashboard"))
+        assert response.status_code == 200
+        assert b"ago" in response.content
@@ -0,0 +1,203 @@
+# tests/test_email_queue.py
+import socketserver
+import threading
+import pytest
+from datetime import timedelta
+from decimal import Decimal as DEC
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail import get_connection
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.urls import reverse
+from django.utils import timezone
+
+from payroll.models import Employee, PayrollPeriod, PayrollRun, Payslip, PayslipEmail
+from payroll.services.approval import approve_run, rollback_run
+from payroll.services.email_queue import (
+    claim_batch, drain_queue, email_progress, enqueue_run_emails, run_workers, send_batch,
+)
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    """Just enough of an SMTP server to accept mail on localhost and count sessions."""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self):
+        self.sessions = 0
+        self.messages = []
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b"\r\n")
+
+    def handle(self):
+        self.server.sessions += 1
+        self.reply("220 sink ready")
+        while line := self.rfile.readline():
+            command = line.decode().strip().upper()
+            if command.startswith("EHLO"):
+                self.reply("250 sink")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                body = []
+                while (data := self.rfile.readline()) not in (b".\r\n", b""):
+                    body.append(data)
+                self.server.messages.append(b"".join(body))
+                self.reply("250 queued")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:  # HELO, MAIL, RCPT, RSET, NOOP
+                self.reply("250 ok")
+
+
+class FlakyBackend(EmailBackend):
+    """locmem backend that refuses one address."""
+
+    def send_messages(self, messages):
+        if any("e1@" in to for message in messages for to in message.to):
+            raise ConnectionError("mailbox unavailable")
+        return super().send_messages(messages)
+
+
+@pytest.mark.django_db
+class TestEmailQueue:
+    def setup_method(self):
+        self.user = get_user_model().objects.create_user(email="officer@example.com", password="x",
+                                                         username="officer", role="payroll_officer")
+        self.run = PayrollRun.objects.create(period=PayrollPeriod.objects.create(year=2025, month=8),
+                                             created_by=self.user, status=PayrollRun.APPROVED)
+        for i in range(7):
+            emp = Employee.objects.create(first_name=f"E{i}", last_name="T", email=f"e{i}@example.com", phone=f"0{i}",
+                                          position="Staff", basic_salary=DEC("1000"))
+            Payslip.objects.create(run=self.run, employee_id=emp, gross_pay=DEC("1000"), taxable_income=DEC("945"),
+                                   tax=DEC("100"), total_deductions=DEC("155"), net_pay=DEC("845"))
+
+    @pytest.fixture(autouse=True)
+    def pdf_dir(self, settings, tmp_path):
+        settings.PAYROLL_PAYSLIP_PDF_DIR = tmp_path
+
+    def test_enqueue_is_idempotent_and_needs_approval(self):
+        assert enqueue_run_emails(self.run) == 7
+        assert enqueue_run_emails(self.run) == 0
+        draft = PayrollRun.objects.create(period=self.run.period, created_by=self.user)
+        with pytest.raises(ValueError):
+            enqueue_run_emails(draft)
+
+    def test_claims_do_not_overlap(self):
+        enqueue_run_emails(self.run)
+        first, second = claim_batch(4), claim_batch(4)
+        assert len(first) == 4 and len(second) == 3
+        assert not {e.pk for e in first} & {e.pk for e in second}
+        assert claim_batch(4) == []
+
+        # A claim older than the lease belongs to a dead worker and is due again
+        PayslipEmail.objects.filter(pk=first[0].pk).update(claimed_at=timezone.now() - timedelta(hours=1))
+        assert [e.pk for e in claim_batch(4)] == [first[0].pk]
+
+    def test_only_approved_runs_are_claimed(self):
+        enqueue_run_emails(self.run)
+        PayrollRun.objects.filter(pk=self.run.pk).update(status=PayrollRun.DRAFT)
+        assert claim_batch(10) == []
+
+    def test_rollback_withdraws_unsent_emails(self):
+        PayrollRun.objects.filter(pk=self.run.pk).update(status=PayrollRun.DRAFT, completed_at=timezone.now())
+        approve_run(self.run)
+        enqueue_run_emails(self.run)
+        in_flight = claim_batch(3)
+        rollback_run(self.run)
+        assert not PayslipEmail.objects.exists()
+
+        send_batch(in_flight, get_connection())  # the worker that held the claim finishes
+        assert not PayslipEmail.objects.exists()
+        approve_run(self.run)
+        assert enqueue_run_emails(self.run) == 7
+
+    def test_expired_claim_cannot_overwrite_new_owner(self):
+        enqueue_run_emails(self.run)
+        stale = claim_batch(10)
+        PayslipEmail.objects.update(claimed_at=timezone.now() - timedelta(hours=1))
+        current = claim_batch(10)
+        assert {e.pk for e in current} == {e.pk for e in stale}
+
+        send_batch(stale, get_connection())
+        assert set(PayslipEmail.objects.values_list("status", "claim_token")) == {
+            (PayslipEmail.SENDING, current[0].claim_token)}
+        assert send_batch(current, get_connection()).sent == 7
+        assert email_progress(self.run)["sent"] == 7
+
+    def test_sends_batches_with_attachment(self):
+        enqueue_run_emails(self.run)
+        stats = run_workers(batch_size=3)
+        assert stats.sent == 7
+        assert len(mail.outbox) == 7
+        message = mail.outbox[0]
+        assert message.subject == "Payslip for 2025-08"
+        assert message.attachments[0][2] == "application/pdf"
+        assert email_progress(self.run) == {"queued": 0, "sending": 0, "sent": 7, "failed": 0, "total": 7}
+
+    def test_retry_with_backoff_then_fail(self, settings, monkeypatch):
+        monkeypatch.setattr("payroll.services.email_queue.get_connection", FlakyBackend)
+        settings.PAYROLL_EMAIL_MAX_ATTEMPTS = 2
+        settings.PAYROLL_EMAIL_RETRY_SECONDS = 60
+        enqueue_run_emails(self.run)
+
+        stats = drain_queue(batch_size=3)
+        assert (stats.sent, stats.retried, stats.failed) == (6, 1, 0)
+        flaky = PayslipEmail.objects.get(to_address="e1@example.com")
+        assert flaky.status == PayslipEmail.QUEUED and flaky.attempts == 1 and "mailbox" in flaky.last_error
+        assert flaky.next_attempt_at > timezone.now() + timedelta(seconds=50)
+        assert drain_queue().sent == 0  # not due yet
+
+        PayslipEmail.objects.filter(pk=flaky.pk).update(next_attempt_at=timezone.now())
+        assert drain_queue().failed == 1
+        assert email_progress(self.run)["failed"] == 1
+
+    def test_progress_endpoint(self, client):
+        enqueue_run_emails(self.run)
+        client.force_login(self.user)
+        response = client.get(reverse("payroll:run_email_progress", kwargs={"pk": self.run.pk}))
+        assert response.json() == {"run": self.run.pk, "queued": 7, "sending": 0, "sent": 0, "failed": 0, "total": 7}
+
+    def test_commands(self, capsys):
+        call_command("queue_payslip_emails", str(self.run.pk))
+        call_command("send_payslip_emails", "--run", str(self.run.pk), "--batch-size", "2")
+        out = capsys.readouterr().out
+        assert "Queued 7" in out and "Sent 7" in out
+        with pytest.raises(CommandError):
+            call_command("send_payslip_emails", "--concurrency", "0")
+
+
+@pytest.mark.django_db
+class TestSMTPDelivery:
+    def test_one_session_per_worker(self, settings, tmp_path):
+        settings.PAYROLL_PAYSLIP_PDF_DIR = tmp_path
+        user = get_user_model().objects.create_user(email="officer@example.com", password="x", username="officer")
+        run = PayrollRun.objects.create(period=PayrollPeriod.objects.create(year=2025, month=8),
+                                        created_by=user, status=PayrollRun.APPROVED)
+        for i in range(12):
+            emp = Employee.objects.create(first_name=f"E{i}", last_name="T", email=f"e{i}@example.com", phone=f"0{i}",
+                                          position="Staff", basic_salary=DEC("1000"))
+            Payslip.objects.create(run=run, employee_id=emp, gross_pay=DEC("1000"), taxable_income=DEC("945"),
+                                   tax=DEC("100"), total_deductions=DEC("155"), net_pay=DEC("845"))
+        enqueue_run_emails(run)
+
+        server = SMTPSink()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        settings.EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
+        settings.EMAIL_HOST, settings.EMAIL_PORT = server.server_address
+        try:
+            stats = drain_queue(batch_size=5)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert stats.sent == 12 and len(server.messages) == 12
+        assert server.sessions == 1  # three batches over one SMTP connection
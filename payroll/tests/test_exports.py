@@ -0,0 +1,56 @@
+# tests/test_exports.py
+import csv
+import io
+import pytest
+from datetime import date
+from decimal import Decimal as DEC
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+
+from payroll.models import Employee, PayrollPeriod, PayrollRecord, PayrollRun, Payslip
+
+
+@pytest.mark.django_db
+class TestPayrollRecordExport:
+    def setup_method(self):
+        self.auditor = get_user_model().objects.create_user(email="audit@example.com", password="x",
+                                                            username="audit", role="auditor")
+        run = PayrollRun.objects.create(period=PayrollPeriod.objects.create(year=2025, month=8), created_by=self.auditor)
+        for i in range(12):
+            emp = Employee.objects.create(first_name=f"Ama{i}" if i % 2 else f"Kofi{i}", last_name="T",
+                                          email=f"e{i}@example.com", phone=f"0{i}", position="Staff",
+                                          basic_salary=DEC("1000.00"))
+            slip = Payslip.objects.create(run=run, employee_id=emp, gross_pay=DEC("1000"), taxable_income=DEC("1000"),
+                                          tax=DEC("100"), total_deductions=DEC("100"), net_pay=DEC("900"))
+            for component, month in (("BASIC", 8), ("PAYE", 8), ("BASIC", 7)):
+                PayrollRecord.objects.create(payslip=slip, employee_id=emp, component_type=component,
+                                             gross_salary=DEC("1000"), tax=DEC("100"), net_salary=DEC("900"),
+                                             period_start=date(2025, month, 1), period_end=date(2025, month, 28))
+
+    def _rows(self, text):
+        return list(csv.reader(io.StringIO(text)))
+
+    def test_view_streams_filtered_csv(self, client):
+        client.force_login(self.auditor)
+        response = client.get(reverse("payroll:payroll_export"),
+                              {"period": "2025-08", "component_type": "PAYE", "employee__first_name": "ama"})
+        assert response.status_code == 200
+        assert response.streaming
+        rows = self._rows(b"".join(response.streaming_content).decode())
+        assert rows[0][:3] == ["Record ID", "Payslip ID", "Employee ID"]
+        assert len(rows) == 1 + 6
+        assert {row[5] for row in rows[1:]} == {"PAYE"}
+        assert all(row[3].startswith("Ama") for row in rows[1:])
+
+    def test_view_rejects_unknown_format(self, client):
+        client.force_login(self.auditor)
+        assert client.get(reverse("payroll:payroll_export"), {"format": "pdf"}).status_code == 400
+
+    def test_command_exports_period(self, tmp_path):
+        out = tmp_path / "records.csv"
+        call_command("export_payroll_records", "--period", "2025-08", "--chunk-size", "5", "-o", str(out))
+        rows = self._rows(out.read_text())
+        assert len(rows) == 1 + 24
+        assert [int(row[0]) for row in rows[1:]] == sorted(int(row[0]) for row in rows[1:])
@@ -0,0 +1,81 @@
+# tests/test_incremental_rerun.py
+import pytest
+from decimal import Decimal as DEC
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+
+from payroll.models import (
+    Allowance, AllowanceType, Employee, PayrollPeriod, PayrollRun, Payslip, StatutoryConfig, TaxBracket,
+)
+from payroll.services.run_pipeline import IncrementalRunPipeline, RunPipeline
+
+
+@pytest.mark.django_db
+class TestIncrementalRerun:
+    def setup_method(self):
+        self.user = get_user_model().objects.create_superuser(email="admin@example.com", password="x", username="admin")
+        self.period = PayrollPeriod.objects.create(year=2025, month=8)
+        TaxBracket.objects.create(year=2025, lower_bound=DEC("0"), upper_bound=None, rate_percent=DEC("10"))
+        StatutoryConfig.objects.create(name="SSNIT", rate_percent=DEC("5.5"), effective_from="2020-01-01")
+        self.transport = AllowanceType.objects.create(name="Transport")
+        self.employees = []
+        for i in range(5):
+            emp = Employee.objects.create(first_name=f"E{i}", last_name="T", email=f"e{i}@example.com", phone=f"0{i}",
+                                          position="Staff", basic_salary=DEC("2000.00"))
+            Allowance.objects.create(employee_id=emp, allowance_type=self.transport, amount=DEC("100.00"))
+            self.employees.append(emp)
+        self.run = PayrollRun.objects.create(period=self.period, created_by=self.user)
+        RunPipeline(self.run).execute()
+
+    def test_unchanged_inputs_reuse_every_payslip(self):
+        before = list(Payslip.objects.filter(run=self.run).values_list("pk", "net_pay", "fingerprint"))
+        stats = IncrementalRunPipeline(self.run).execute()
+        assert (stats.reused, stats.payslips, stats.removed) == (5, 0, 0)
+        assert list(Payslip.objects.filter(run=self.run).values_list("pk", "net_pay", "fingerprint")) == before
+
+    def test_only_changed_employee_is_recomputed(self):
+        al = Allowance.objects.get(employee_id=self.employees[2])
+        al.amount = DEC("300.00")
+        al.save()
+        Employee.objects.filter(pk=self.employees[4].pk).update(is_active=False)
+        Employee.objects.create(first_name="New", last_name="T", email="new@example.com", phone="09",
+                                position="Staff", basic_salary=DEC("1000.00"))
+
+        stats = IncrementalRunPipeline(self.run).execute()
+        assert (stats.reused, stats.payslips, stats.removed) == (3, 2, 1)
+        slip = Payslip.objects.get(run=self.run, employee_id=self.employees[2])
+        assert slip.gross_pay == DEC("2300.00")
+        assert slip.lines.filter(label="Transport").get().amount == DEC("300.00")
+        assert Payslip.objects.filter(run=self.run).count() == 5
+
+    def test_checkpoint_never_moves_back(self):
+        self.run.refresh_from_db()
+        assert self.run.checkpoint == self.employees[-1].pk
+        Payslip.objects.filter(run=self.run, employee_id=self.employees[1]).delete()  # e.g. was inactive
+        assert IncrementalRunPipeline(self.run).execute().payslips == 1
+        self.run.refresh_from_db()
+        assert self.run.checkpoint == self.employees[-1].pk
+
+    def test_rate_change_invalidates_every_fingerprint(self):
+        StatutoryConfig.objects.create(name="SSNIT", rate_percent=DEC("6"), effective_from="2025-08-01")
+        stats = IncrementalRunPipeline(self.run).execute()
+        assert (stats.reused, stats.payslips) == (0, 5)
+
+    def test_taxability_change_is_recomputed(self):
+        self.transport.is_taxable = False
+        self.transport.save()
+        stats = IncrementalRunPipeline(self.run).execute()
+        assert (stats.reused, stats.payslips) == (0, 5)
+        slip = Payslip.objects.get(run=self.run, employee_id=self.employees[0])
+        assert (slip.gross_pay, slip.taxable_income) == (DEC("2100.00"), DEC("1884.50"))  # 2100 - 100 - 115.50 SSNIT
+
+    def test_approved_run_is_refused(self):
+        self.run.status = PayrollRun.APPROVED
+        self.run.save()
+        with pytest.raises(ValueError):
+            IncrementalRunPipeline(self.run).execute()
+
+    def test_command_reports_reuse(self, capsys):
+        call_command("process_payroll", "2025-08", "--rerun", str(self.run.pk))
+        assert "5 payslips reused, 0 recomputed" in capsys.readouterr().out
@@ -0,0 +1,166 @@
+# tests/test_jobs.py
+import pytest
+from datetime import date, timedelta
+from decimal import Decimal as DEC
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from payroll.models import Employee, PayrollJob, PayrollPeriod, PayrollRun, Payslip, StatutoryConfig, TaxBracket
+from payroll.services.jobs import claim_job, execute_job, job_progress, request_cancel, run_next_job, start_job
+from payroll.services.run_pipeline import RunPipeline
+
+
+@pytest.mark.django_db
+class TestPayrollJobs:
+    def setup_method(self):
+        self.user = get_user_model().objects.create_user(email="officer@example.com", password="x",
+                                                         username="officer", role="payroll_officer")
+        TaxBracket.objects.create(year=2025, lower_bound=DEC("0"), upper_bound=None, rate_percent=DEC("10"))
+        StatutoryConfig.objects.create(name="SSNIT Tier 1", rate_percent=DEC("5.5"), effective_from=date(2020, 1, 1))
+        for i in range(9):
+            Employee.objects.create(first_name=f"E{i}", last_name="T", email=f"e{i}@example.com", phone=f"0{i}",
+                                    position="Staff", basic_salary=DEC("1000"))
+        self.period = PayrollPeriod.objects.create(year=2025, month=8)
+
+    def test_run_to_completion(self):
+        job = start_job(self.period, self.user, chunk_size=4)
+        assert job_progress(job)["status"] == PayrollJob.QUEUED
+
+        job = run_next_job("test-worker")
+        assert job.status == PayrollJob.SUCCEEDED and job.worker == "test-worker"
+        assert Payslip.objects.filter(run=job.run).count() == 9
+        progress = job_progress(job)
+        assert (progress["done"], progress["total"], progress["percent"]) == (9, 9, 100.0)
+        assert progress["eta_seconds"] is None
+        assert run_next_job() is None
+
+    def test_one_active_job_per_period(self):
+        first = start_job(self.period, self.user)
+        with pytest.raises(ValueError):
+            start_job(self.period, self.user)
+        other = start_job(PayrollPeriod.objects.create(year=2025, month=9), self.user)
+
+        # Even if two queued jobs exist for a period, only one can be running
+        second = PayrollJob.objects.create(period=self.period, created_by=self.user)
+        assert claim_job().pk == first.pk
+        assert claim_job().pk == other.pk  # second is skipped while first runs
+        assert claim_job() is None
+        with pytest.raises(IntegrityError), transaction.atomic():
+            PayrollJob.objects.filter(pk=second.pk).update(status=PayrollJob.RUNNING)
+
+    def test_cancel_running_job_discards_run(self, monkeypatch):
+        job = start_job(self.period, self.user, chunk_size=3)
+        write_chunk = RunPipeline.write_chunk
+
+        def write_then_cancel(pipeline, results):
+            written = write_chunk(pipeline, results)
+            request_cancel(job)
+            return written
+
+        monkeypatch.setattr(RunPipeline, "write_chunk", write_then_cancel)
+        job = execute_job(claim_job())
+        assert job.status == PayrollJob.CANCELLED and job.done == 3
+        assert job.run is None and not PayrollRun.objects.exists()
+
+    def test_dead_worker_job_is_resumed_after_the_lease(self, monkeypatch):
+        job = start_job(self.period, self.user, chunk_size=4)
+        write_chunk = RunPipeline.write_chunk
+
+        def write_then_die(pipeline, results):
+            write_chunk(pipeline, results)
+            raise SystemExit  # the worker is killed after committing one chunk
+        monkeypatch.setattr(RunPipeline, "write_chunk", write_then_die)
+        with pytest.raises(SystemExit):
+            run_next_job("dead-worker")
+        monkeypatch.setattr(RunPipeline, "write_chunk", write_chunk)
+
+        job.refresh_from_db()
+        assert job.status == PayrollJob.RUNNING and Payslip.objects.filter(run=job.run).count() == 4
+        assert run_next_job("other-worker") is None  # still within its lease
+
+        PayrollJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(seconds=601))
+        resumed = run_next_job("other-worker")
+        assert resumed.pk == job.pk and resumed.run_id == job.run_id and resumed.worker == "other-worker"
+        assert resumed.status == PayrollJob.SUCCEEDED and (resumed.done, resumed.total) == (9, 9)
+        assert Payslip.objects.filter(run=job.run).count() == 9 and PayrollRun.objects.count() == 1
+
+    def test_reclaimed_job_is_left_to_its_new_owner(self, monkeypatch):
+        job = start_job(self.period, self.user, chunk_size=4)
+        write_chunk = RunPipeline.write_chunk
+
+        def write_then_lose_lease(pipeline, results):
+            written = write_chunk(pipeline, results)
+            PayrollJob.objects.filter(pk=job.pk).update(worker="other-worker")  # reclaimed meanwhile
+            return written
+        monkeypatch.setattr(RunPipeline, "write_chunk", write_then_lose_lease)
+        stale = run_next_job("slow-worker")
+        assert (stale.status, stale.worker) == (PayrollJob.RUNNING, "other-worker")
+        assert stale.run_id is not None and Payslip.objects.filter(run=stale.run).count() == 4
+
+    def test_reclaimed_job_failing_keeps_its_run(self, monkeypatch):
+        job = start_job(self.period, self.user, chunk_size=4)
+
+        def lose_lease_then_fail(pipeline, results):
+            PayrollJob.objects.filter(pk=job.pk).update(worker="other-worker")
+            raise IntegrityError("payslip already written by the new owner")
+        monkeypatch.setattr(RunPipeline, "write_chunk", lose_lease_then_fail)
+        stale = run_next_job("slow-worker")
+        assert stale.status == PayrollJob.RUNNING and stale.error == ""
+        assert PayrollRun.objects.filter(pk=stale.run_id).exists()
+
+    def test_cancel_queued_job(self):
+        job = start_job(self.period, self.user)
+        request_cancel(job)
+        job.refresh_from_db()
+        assert job.status == PayrollJob.CANCELLED
+        assert claim_job() is None
+
+    def test_failed_job_records_error(self, monkeypatch):
+        def boom(self, emp):
+            raise RuntimeError("engine exploded")
+
+        monkeypatch.setattr(RunPipeline, "compute_one", boom)
+        start_job(self.period, self.user)
+        job = run_next_job()
+        assert job.status == PayrollJob.FAILED
+        assert job_progress(job)["error"] == "RuntimeError: engine exploded"
+        assert not PayrollRun.objects.exists()
+        start_job(self.period, self.user)  # the period is free again
+
+    def test_rates_edited_elsewhere_apply_to_the_next_job(self):
+        start_job(self.period, self.user)
+        first = run_next_job()
+        # update() sends no signals, like an edit saved by the web process
+        TaxBracket.objects.update(rate_percent=DEC("20"))
+        StatutoryConfig.objects.update(rate_percent=DEC("10"))
+        start_job(self.period, self.user)
+        second = run_next_job()
+
+        before = Payslip.objects.filter(run=first.run).first()
+        after = Payslip.objects.get(run=second.run, employee_id=before.employee_id)
+        assert (before.statutory_employee, after.statutory_employee) == (DEC("55"), DEC("100"))
+        assert after.tax > before.tax
+
+    def test_views(self, client):
+        client.force_login(self.user)
+        response = client.post(reverse("payroll:job_list"), {"period": "2025-08", "mode": "scalar"})
+        assert response.status_code == 302
+        job = PayrollJob.objects.get()
+        assert client.get(reverse("payroll:job_list")).status_code == 200
+
+        call_command("payroll_worker", "--once")
+        data = client.get(reverse("payroll:job_progress", kwargs={"pk": job.pk})).json()
+        assert data["status"] == "succeeded" and data["done"] == data["total"] == 9
+
+        client.post(reverse("payroll:job_list"), {"period": "2025-13"})
+        assert PayrollJob.objects.count() == 1
+        client.post(reverse("payroll:job_list"), {"period": "2025-09"})
+        queued = PayrollJob.objects.get(status=PayrollJob.QUEUED)
+        assert client.get(reverse("payroll:job_cancel", kwargs={"pk": queued.pk})).status_code == 405
+        client.post(reverse("payroll:job_cancel", kwargs={"pk": queued.pk}))
+        queued.refresh_from_db()
+        assert queued.status == PayrollJob.CANCELLED
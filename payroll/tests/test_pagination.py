@@ -0,0 +1,88 @@
+# tests/test_pagination.py
+import pytest
+from datetime import date
+from decimal import Decimal as DEC
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from payroll.models import Employee, PayrollPeriod, PayrollRecord, PayrollRun, Payslip
+from payroll.pagination import KeysetPaginator, approximate_count
+
+
+@pytest.mark.django_db
+class TestKeysetPaginator:
+    def setup_method(self):
+        self.user = get_user_model().objects.create_user(email="audit@example.com", password="x",
+                                                         username="audit", role="auditor")
+        run = PayrollRun.objects.create(period=PayrollPeriod.objects.create(year=2025, month=8), created_by=self.user)
+        for i in range(7):
+            emp = Employee.objects.create(first_name=f"E{i}", last_name="T", email=f"e{i}@example.com", phone=f"0{i}",
+                                          position="Staff", basic_salary=DEC("1000"))
+            slip = Payslip.objects.create(run=run, employee_id=emp, gross_pay=DEC("1000"), taxable_income=DEC("1000"),
+                                          tax=DEC("0"), total_deductions=DEC("0"), net_pay=DEC("1000"))
+            for component in ("PAYE", "BASIC", "NET", "BASIC"):  # duplicate keys need the pk tie-breaker
+                PayrollRecord.objects.create(payslip=slip, employee_id=emp, component_type=component,
+                                             gross_salary=DEC("1000"), tax=DEC("0"), net_salary=DEC("1000"),
+                                             period_start=date(2025, 8, 1), period_end=date(2025, 8, 31))
+
+    def test_walks_forward_and_back_in_model_order(self):
+        expected = list(PayrollRecord.objects.order_by("employee_id", "component_type", "pk"))
+        paginator = KeysetPaginator(PayrollRecord.objects.all(), per_page=5)
+
+        pages, page = [], paginator.get_page()
+        assert not page.has_previous
+        while True:
+            pages.append(list(page))
+            if not page.has_next:
+                break
+            page = paginator.get_page(page.next_cursor)
+        assert [obj for p in pages for obj in p] == expected
+        assert len(pages) == 6
+
+        back = paginator.get_page(page.previous_cursor)
+        assert list(back) == pages[-2]
+        assert back.has_next and back.has_previous
+
+    def test_descending_and_filtered(self):
+        qs = PayrollRecord.objects.filter(component_type="BASIC")
+        paginator = KeysetPaginator(qs, per_page=4, ordering=["-employee_id"])
+        seen, page = [], paginator.get_page()
+        seen += page
+        while page.has_next:
+            page = paginator.get_page(page.next_cursor)
+            seen += page
+        assert seen == list(qs.order_by("-employee_id", "pk"))
+
+    def test_bad_cursor_falls_back_to_first_page(self):
+        paginator = KeysetPaginator(Employee.objects.all(), per_page=3)
+        assert list(paginator.get_page("not-a-cursor")) == list(paginator.get_page())
+
+    def test_approximate_count_is_cached(self, django_assert_num_queries):
+        qs = PayrollRecord.objects.filter(component_type="BASIC")
+        assert approximate_count(qs) == 14
+        with django_assert_num_queries(0):
+            assert approximate_count(qs) == 14
+
+    def test_empty_querysets_count_zero(self, client):
+        assert approximate_count(PayrollRecord.objects.none()) == 0
+        client.force_login(self.user)
+        response = client.get(reverse("payroll:payroll_list"), {"period": "2025-13"})
+        assert response.status_code == 200 and len(response.context["records"]) == 0
+        client.force_login(get_user_model().objects.create_user(email="hr@example.com", password="x",
+                                                                username="hr", role="hr_manager"))
+        response = client.get(reverse("payroll:employee_list"), {"search": "zzzz"})
+        assert response.status_code == 200 and len(response.context["employees"]) == 0
+
+    def test_list_view_pages_without_count_or_offset(self, client, django_assert_max_num_queries):
+        client.force_login(self.user)
+        url = reverse("payroll:payroll_list")
+        first = client.get(url)
+        assert first.status_code == 200
+        assert len(first.context["records"]) == 20
+        with django_assert_max_num_queries(4) as captured:  # session, user, page, cached count
+            second = client.get(url, {"cursor": first.context["records"].next_cursor})
+        assert len(second.context["records"]) == 8
+        assert not second.context["records"].has_next
+        sql = " ".join(q["sql"] for q in captured.captured_queries).upper()
+        assert "OFFSET" not in sql
@@ -0,0 +1,68 @@
+# tests/test_parallel.py
+import pytest
+from decimal import Decimal as DEC
+
+from django.contrib.auth import get_user_model
+
+from payroll.models import (
+    Allowance, AllowanceType, Employee, PayrollPeriod, PayrollRun, Payslip, PayslipLine,
+    StatutoryConfig, TaxBracket,
+)
+from payroll.services.parallel import ParallelRunPipeline, ShardError, shard_ranges
+from payroll.services.payroll_engine import PayrollEngine
+from payroll.services.run_pipeline import RunPipeline
+
+
+@pytest.mark.django_db
+class TestParallelRunPipeline:
+    def setup_method(self):
+        self.user = get_user_model().objects.create_user(email="officer@example.com", password="x", username="officer")
+        self.period = PayrollPeriod.objects.create(year=2025, month=8)
+        TaxBracket.objects.create(year=2025, lower_bound=DEC("0"), upper_bound=DEC("500"), rate_percent=DEC("0"))
+        TaxBracket.objects.create(year=2025, lower_bound=DEC("500"), upper_bound=None, rate_percent=DEC("17.5"))
+        StatutoryConfig.objects.create(name="SSNIT", rate_percent=DEC("5.5"), effective_from="2020-01-01")
+        transport = AllowanceType.objects.create(name="Transport")
+        for i in range(23):
+            emp = Employee.objects.create(first_name=f"E{i}", last_name="T", email=f"e{i}@example.com", phone=f"0{i}",
+                                          position="Staff", basic_salary=DEC(1000 + 37 * i))
+            Allowance.objects.create(employee_id=emp, allowance_type=transport, amount=DEC(i))
+
+    def _payslips(self, run):
+        return list(Payslip.objects.filter(run=run).order_by("pk").values_list(
+            "employee_id", "gross_pay", "tax", "statutory_employee", "net_pay"))
+
+    def test_shard_ranges_cover_all_active(self):
+        ranges = shard_ranges(4)
+        pks = list(Employee.objects.order_by("pk").values_list("pk", flat=True))
+        assert len(ranges) == 4
+        assert ranges[0][0] == pks[0] and ranges[-1][1] == pks[-1]
+        assert sum(Employee.objects.filter(pk__range=r).count() for r in ranges) == len(pks)
+
+    def test_identical_to_serial_run(self):
+        serial = PayrollRun.objects.create(period=self.period, created_by=self.user)
+        RunPipeline(serial, chunk_size=5).execute()
+        parallel = PayrollRun.objects.create(period=self.period, created_by=self.user)
+        stats = ParallelRunPipeline(parallel, chunk_size=5, workers=3).execute()
+
+        assert stats.employees == 23
+        assert self._payslips(parallel) == self._payslips(serial)
+        assert PayslipLine.objects.filter(payslip__run=parallel).count() == PayslipLine.objects.filter(payslip__run=serial).count()
+
+    def test_shard_failure_writes_nothing(self, monkeypatch):
+        bad_pk = Employee.objects.order_by("pk").values_list("pk", flat=True)[20]
+        compute = PayrollEngine.compute_employee
+
+        def flaky(engine, emp):
+            if emp.pk == bad_pk:
+                raise ValueError("bad grade step")
+            return compute(engine, emp)
+
+        monkeypatch.setattr(PayrollEngine, "compute_employee", flaky)  # inherited by forked workers
+        run = PayrollRun.objects.create(period=self.period, created_by=self.user)
+        with pytest.raises(ShardError) as exc_info:
+            ParallelRunPipeline(run, workers=3).execute()
+
+        [failure] = exc_info.value.failures
+        assert failure.pk_range[0] <= bad_pk <= failure.pk_range[1]
+        assert "bad grade step" in failure.error
+        assert not Payslip.objects.filter(run=run).exists()
@@ -0,0 +1,88 @@
+# tests/test_payslip_pdf.py
+import multiprocessing
+import pytest
+from datetime import date
+from decimal import Decimal as DEC
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+
+from payroll.models import (
+    Allowance, AllowanceType, Employee, PayrollPeriod, PayrollRun, Payslip, StatutoryConfig, TaxBracket,
+)
+from payroll.services.payslip_pdf import (
+    cache_path, content_hash, get_payslip_pdf, payslip_document, payslip_queryset, render_run_pdfs,
+)
+from payroll.services.run_pipeline import RunPipeline
+
+
+@pytest.mark.django_db(transaction=True)
+class TestPayslipPDF:
+    def setup_method(self):
+        User = get_user_model()
+        self.officer = User.objects.create_user(email="officer@example.com", password="x",
+                                                username="officer", role="payroll_officer")
+        TaxBracket.objects.create(year=2025, lower_bound=DEC("0"), upper_bound=None, rate_percent=DEC("10"))
+        StatutoryConfig.objects.create(name="SSNIT Tier 1", rate_percent=DEC("5.5"), effective_from=date(2020, 1, 1))
+        housing = AllowanceType.objects.create(name="Housing")
+        for i in range(6):
+            user = User.objects.create_user(email=f"u{i}@example.com", password="x", username=f"u{i}")
+            emp = Employee.objects.create(user=user, first_name=f"Ama{i}", last_name="Owusu", email=f"e{i}@example.com",
+                                          phone=f"0{i}", position="Lecturer", basic_salary=DEC(2000 + i),
+                                          bank_account_number=f"00012345{i}")
+            Allowance.objects.create(employee_id=emp, allowance_type=housing, amount=DEC("300"))
+        self.run = PayrollRun.objects.create(period=PayrollPeriod.objects.create(year=2025, month=8),
+                                             created_by=self.officer)
+        RunPipeline(self.run).execute()
+
+    @pytest.fixture(autouse=True)
+    def pdf_dir(self, settings, tmp_path):
+        settings.PAYROLL_PAYSLIP_PDF_DIR = tmp_path
+
+    def test_renders_payslip(self):
+        slip = payslip_queryset().first()
+        data = get_payslip_pdf(slip).read_bytes()
+        assert data.startswith(b"%PDF-1.4") and data.rstrip().endswith(b"%%EOF")
+        assert b"Housing" in data and str(slip.net_pay).encode() in data
+        assert b"00012345" not in data  # account number is masked
+
+    def test_batch_render_is_cached_by_content(self):
+        ctx = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+        stats = render_run_pdfs(self.run, workers=2, mp_context=ctx)
+        assert (stats.payslips, stats.rendered, stats.cached) == (6, 6, 0)
+        for slip in payslip_queryset().filter(run=self.run):
+            assert cache_path(content_hash(payslip_document(slip))).exists()
+
+        again = render_run_pdfs(self.run, workers=2, mp_context=ctx)
+        assert (again.rendered, again.cached) == (0, 6)
+
+        Payslip.objects.filter(pk=Payslip.objects.order_by("pk").first().pk).update(net_pay=DEC("1.00"))
+        changed = render_run_pdfs(self.run)
+        assert (changed.rendered, changed.cached) == (1, 5)
+
+    def test_same_content_same_bytes(self):
+        slip = payslip_queryset().first()
+        path = get_payslip_pdf(slip)
+        first = path.read_bytes()
+        path.unlink()
+        assert get_payslip_pdf(slip).read_bytes() == first
+
+    def test_download_endpoint(self, client):
+        slip = Payslip.objects.select_related("employee_id__user").order_by("pk").first()
+        url = reverse("payroll:payslip_pdf", kwargs={"pk": slip.pk})
+
+        client.force_login(slip.employee_id.user)  # own payslip
+        response = client.get(url)
+        assert response.status_code == 200 and response["Content-Type"] == "application/pdf"
+        assert b"".join(response.streaming_content).startswith(b"%PDF")
+
+        other = Payslip.objects.exclude(pk=slip.pk).first()
+        assert client.get(reverse("payroll:payslip_pdf", kwargs={"pk": other.pk})).status_code == 403
+
+        client.force_login(self.officer)
+        assert client.get(reverse("payroll:payslip_pdf", kwargs={"pk": other.pk})).status_code == 200
+
+    def test_command(self, capsys):
+        call_command("render_payslips", str(self.run.pk))
+        assert "6 rendered" in capsys.readouterr().out
@@ -0,0 +1,163 @@
+# tests/test_query_budget.py
+"""
+Performance guard rails: a query budget for every view in payroll/urls.py
+and for the engine, plus EXPLAIN QUERY PLAN checks that the hot filters hit
+an index. Raise a budget only together with the change that needs it.
+"""
+import random
+import pytest
+from datetime import date
+from decimal import Decimal as DEC
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+
+from payroll import urls as payroll_urls
+from payroll.models import (
+    Allowance, AllowanceType, Deduction, DeductionType, Department, Employee, GradeStep,
+    PayrollJob, PayrollPeriod, PayrollRecord, PayrollRun, Payslip, StatutoryConfig, TaxBracket,
+)
+from payroll.services.payroll_engine import PayrollEngine
+from payroll.services.run_pipeline import RunPipeline
+
+# url name -> maximum queries for one GET, including session and user loads
+VIEW_BUDGETS = {
+    "dashboard": 8,         # cold metrics cache
+    "employee_list": 5,     # page + cold approximate count (statistics probe, COUNT)
+    "employee_create": 6,   # form choice lists
+    "employee_detail": 3,
+    "employee_edit": 6,
+    "payroll_list": 5,
+    "payroll_export": 3,
+    "payroll_detail": 3,
+    "payslip_pdf": 4,       # payslip with employee and period, its lines
+    "period_list": 3,
+    "run_email_progress": 4,
+    "run_variance": 5,      # run with period, previous approved run, one grouped variance query
+    "job_list": 4,          # + message storage
+    "job_progress": 3,
+    "job_cancel": 7,        # POST: job, conditional updates, read-your-writes session stamp
+    "api_employee_list": 3,
+    "api_employee_detail": 3,
+    "api_period_list": 3,
+    "api_period_detail": 3,
+    "api_run_list": 3,
+    "api_run_detail": 3,
+    "api_payslip_list": 4,  # page + its lines
+    "api_payslip_detail": 4,
+}
+POST_VIEWS = {"job_cancel"}
+ENGINE_QUERIES_PER_EMPLOYEE = 2  # active allowances + deductions (types joined) when nothing is prefetched
+
+
+def seed(employees=60):
+    rng = random.Random(42)
+    departments = [Department.objects.create(name=f"Dept {i}", code=f"D{i}") for i in range(5)]
+    steps = [GradeStep.objects.create(title="Step", grade_code="G", step=i, basic_salary=DEC(1500 + 250 * i))
+             for i in range(1, 8)]
+    allowance_types = [AllowanceType.objects.create(name=n) for n in ("Housing", "Transport", "Research")]
+    deduction_types = [DeductionType.objects.create(name=n, is_pre_tax=p) for n, p in (("Provident", True), ("Loan", False))]
+    TaxBracket.objects.create(year=2025, lower_bound=DEC("0"), upper_bound=DEC("490"), rate_percent=DEC("0"))
+    TaxBracket.objects.create(year=2025, lower_bound=DEC("490"), upper_bound=None, rate_percent=DEC("17.5"))
+    StatutoryConfig.objects.create(name="SSNIT Tier 1", rate_percent=DEC("5.5"), effective_from=date(2020, 1, 1))
+    StatutoryConfig.objects.create(name="SSNIT Employer", rate_percent=DEC("13"), effective_from=date(2020, 1, 1),
+                                   applies_to_employee=False)
+    for i in range(employees):
+        emp = Employee.objects.create(first_name=f"E{i}", last_name="T", email=f"e{i}@example.com", phone=f"0{i}",
+                                      position="Staff", basic_salary=DEC("1000"), department=rng.choice(departments),
+                                      grade_step=rng.choice(steps), is_active=i % 10 != 0)
+        for at in rng.sample(allowance_types, 2):
+            Allowance.objects.create(employee_id=emp, allowance_type=at, amount=DEC(rng.randint(50, 500)))
+        Deduction.objects.create(employee_id=emp, deduction_type=rng.choice(deduction_types), amount=DEC("75"))
+
+
+def plan_has_full_scan(queryset, table):
+    plan = queryset.explain()
+    return any(line.split(" ", 3)[-1].startswith(f"SCAN {table}") and "INDEX" not in line
+               for line in plan.splitlines())
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+    def setup_method(self):
+        seed()
+        self.user = get_user_model().objects.create_superuser(email="admin@example.com", password="x",
+                                                              username="admin", role="admin")
+        self.period = PayrollPeriod.objects.create(year=2025, month=8)
+        self.run = PayrollRun.objects.create(period=self.period, created_by=self.user)
+        RunPipeline(self.run, chunk_size=25).execute()
+        for slip in Payslip.objects.filter(run=self.run):
+            PayrollRecord.objects.create(payslip=slip, employee_id_id=slip.employee_id_id, component_type="NET",
+                                         gross_salary=slip.gross_pay, tax=slip.tax, net_salary=slip.net_pay,
+                                         period_start=self.period.start_date, period_end=self.period.end_date)
+
+    def test_every_view_has_a_budget(self):
+        names = {p.name for p in payroll_urls.urlpatterns}
+        assert names <= set(VIEW_BUDGETS), f"add a query budget for {names - set(VIEW_BUDGETS)}"
+
+    @pytest.mark.parametrize("name", sorted(VIEW_BUDGETS))
+    def test_view_query_budget(self, name, client, django_assert_max_num_queries, settings, tmp_path):
+        settings.PAYROLL_PAYSLIP_PDF_DIR = tmp_path
+        client.force_login(self.user)
+        kwargs = {}
+        if name in ("employee_detail", "employee_edit", "api_employee_detail"):
+            kwargs = {"pk": Employee.objects.order_by("pk").last().pk}
+        elif name == "payroll_detail":
+            kwargs = {"pk": PayrollRecord.objects.order_by("pk").last().pk}
+        elif name in ("run_email_progress", "run_variance"):
+            kwargs = {"pk": self.run.pk}
+        elif name in ("job_progress", "job_cancel"):
+            kwargs = {"pk": PayrollJob.objects.create(period=self.period, created_by=self.user).pk}
+        elif name == "api_period_detail":
+            kwargs = {"pk": self.period.pk}
+        elif name == "api_run_detail":
+            kwargs = {"pk": self.run.pk}
+        elif name in ("payslip_pdf", "api_payslip_detail"):
+            kwargs = {"pk": Payslip.objects.order_by("pk").last().pk}
+        with django_assert_max_num_queries(VIEW_BUDGETS[name]):
+            method = client.post if name in POST_VIEWS else client.get
+            response = method(reverse(f"payroll:{name}", kwargs=kwargs))
+            if getattr(response, "streaming", False):
+                b"".join(response.streaming_content)
+        assert response.status_code == (302 if name in POST_VIEWS else 200)
+
+    def test_engine_budget_per_employee(self, django_assert_num_queries, django_assert_max_num_queries):
+        engine = PayrollEngine(self.period)
+        emp = Employee.objects.select_related("grade_step").filter(is_active=True).first()
+        engine.compute_employee(emp)  # warm tax table and statutory resolver
+        with django_assert_max_num_queries(ENGINE_QUERIES_PER_EMPLOYEE):
+            engine.compute_employee(emp)
+
+        pipeline = RunPipeline(self.run, chunk_size=100)
+        [chunk] = list(pipeline.iter_chunks())
+        with django_assert_num_queries(0):
+            for emp in chunk:
+                engine.compute_employee(emp)
+
+    def test_run_queries_do_not_grow_with_headcount(self, django_assert_max_num_queries):
+        # 54 active employees, chunks of 25: 3 chunks x (employees + 2 prefetches + 2 inserts + savepoints)
+        run = PayrollRun.objects.create(period=self.period, created_by=self.user)
+        with django_assert_max_num_queries(30):
+            RunPipeline(run, chunk_size=25).execute()
+
+    @pytest.mark.skipif(connection.vendor != "sqlite", reason="EXPLAIN QUERY PLAN format is SQLite's")
+    @pytest.mark.parametrize("label", ["record_by_employee_period", "record_by_period", "payslip_by_run_employee",
+                                       "active_employees_in_department", "allowances_of_employee"])
+    def test_hot_filters_use_an_index(self, label):
+        emp = Employee.objects.filter(is_active=True).first()
+        querysets = {
+            "record_by_employee_period": (
+                PayrollRecord.objects.filter(employee_id=emp, period_start__gte=date(2025, 1, 1)), "payroll_payrollrecord"),
+            "record_by_period": (
+                PayrollRecord.objects.filter(period_start__range=(date(2025, 8, 1), date(2025, 8, 31))),
+                "payroll_payrollrecord"),
+            "payslip_by_run_employee": (
+                Payslip.objects.filter(run=self.run, employee_id=emp), "payroll_payslip"),
+            "active_employees_in_department": (
+                Employee.objects.filter(is_active=True, department=emp.department_id), "payroll_employee"),
+            "allowances_of_employee": (
+                Allowance.objects.filter(employee_id=emp, active=True), "payroll_allowance"),
+        }
+        queryset, table = querysets[label]
+        assert not plan_has_full_scan(queryset, table), queryset.explain()
@@ -0,0 +1,87 @@
+# tests/test_reporting_router.py
+import sqlite3
+import time
+import pytest
+from decimal import Decimal as DEC
+
+from django.contrib.auth import get_user_model
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from payroll.db_router import reporting_synced_at
+from payroll.models import Employee, PayrollPeriod, PayrollRecord, PayrollRun, Payslip
+from payroll.services.reporting_sync import snapshot_sqlite
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", "reporting"])
+class TestReportingRouter:
+    def setup_method(self):
+        self.user = get_user_model().objects.create_user(email="auditor@example.com", password="x",
+                                                         username="auditor", role="auditor")
+        self.officer = get_user_model().objects.create_user(email="officer@example.com", password="x",
+                                                            username="officer", role="payroll_officer")
+        period = PayrollPeriod.objects.create(year=2025, month=8)
+        run = PayrollRun.objects.create(period=period, created_by=self.user)
+        for i in range(3):
+            emp = Employee.objects.create(first_name=f"E{i}", last_name="T", email=f"e{i}@example.com", phone=f"0{i}",
+                                          position="Staff", basic_salary=DEC("1000"))
+            slip = Payslip.objects.create(run=run, employee_id=emp, gross_pay=DEC("1000"), taxable_income=DEC("945"),
+                                          tax=DEC("100"), total_deductions=DEC("155"), net_pay=DEC("845"))
+            PayrollRecord.objects.create(payslip=slip, employee_id=emp, component_type="NET", gross_salary=DEC("1000"),
+                                         tax=DEC("100"), net_salary=DEC("845"), period_start=period.start_date,
+                                         period_end=period.end_date)
+
+    def reads(self, client, url):
+        """PayrollRecord queries of one GET, as (on default, on reporting)."""
+        with CaptureQueriesContext(connections["default"]) as default, \
+                CaptureQueriesContext(connections["reporting"]) as reporting:
+            response = client.get(url)
+            if getattr(response, "streaming", False):
+                b"".join(response.streaming_content)
+        assert response.status_code == 200
+        return ([q["sql"] for q in default.captured_queries if "payroll_payrollrecord" in q["sql"]],
+                [q["sql"] for q in reporting.captured_queries if "payroll_payrollrecord" in q["sql"]])
+
+    def test_mirror_is_not_a_reporting_copy(self):
+        assert reporting_synced_at() is None
+
+    def test_reporting_views_read_from_replica(self, client, monkeypatch):
+        monkeypatch.setattr("payroll.db_router.reporting_synced_at", lambda alias=None: time.time())
+        client.force_login(self.user)
+        default, reporting = self.reads(client, reverse("payroll:payroll_list"))
+        assert reporting and not default
+
+        default, reporting = self.reads(client, reverse("payroll:payroll_export"))
+        assert reporting and not default  # the streamed body is read inside the routing context too
+
+        with CaptureQueriesContext(connections["reporting"]) as captured:
+            client.get(reverse("payroll:employee_list"))
+        assert not captured.captured_queries  # not a reporting view
+
+    def test_read_your_writes(self, client, monkeypatch):
+        synced = time.time()
+        monkeypatch.setattr("payroll.db_router.reporting_synced_at", lambda alias=None: synced)
+        client.force_login(self.officer)
+        client.post(reverse("payroll:job_list"), {"period": "2025-09"})  # a write after the last sync
+
+        default, reporting = self.reads(client, reverse("payroll:payroll_list"))
+        assert default and not reporting
+
+        synced = time.time() + 1  # the next snapshot has caught up
+        default, reporting = self.reads(client, reverse("payroll:payroll_list"))
+        assert reporting and not default
+
+    def test_no_reporting_copy_falls_back_to_default(self, client):
+        client.force_login(self.user)
+        default, reporting = self.reads(client, reverse("payroll:payroll_list"))
+        assert default and not reporting
+
+    def test_snapshot(self, tmp_path):
+        dest = snapshot_sqlite(tmp_path / "reporting.sqlite3")
+        snapshot = sqlite3.connect(dest)
+        try:
+            assert snapshot.execute("SELECT COUNT(*) FROM payroll_payrollrecord").fetchone() == (3,)
+        finally:
+            snapshot.close()
+        assert not (tmp_path / "reporting.sqlite3.tmp").exists()
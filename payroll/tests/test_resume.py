@@ -0,0 +1,100 @@
+# tests/test_resume.py
+import pytest
+from decimal import Decimal as DEC
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from payroll.models import Employee, PayrollPeriod, PayrollRun, Payslip, PayslipLine, StatutoryConfig, TaxBracket
+from payroll.services.run_pipeline import RunPipeline
+
+
+class Crash(Exception):
+    pass
+
+
+def crash_after(monkeypatch, chunks):
+    """Make RunPipeline.write_chunk fail on the call after `chunks` successful ones."""
+    write_chunk = RunPipeline.write_chunk
+    calls = []
+
+    def flaky(pipeline, results):
+        if len(calls) == chunks:
+            raise Crash("worker killed")
+        calls.append(1)
+        return write_chunk(pipeline, results)
+
+    monkeypatch.setattr(RunPipeline, "write_chunk", flaky)
+
+
+@pytest.mark.django_db
+class TestResumableRun:
+    def setup_method(self):
+        self.user = get_user_model().objects.create_superuser(email="admin@example.com", password="x", username="admin")
+        self.period = PayrollPeriod.objects.create(year=2025, month=8)
+        TaxBracket.objects.create(year=2025, lower_bound=DEC("0"), upper_bound=None, rate_percent=DEC("10"))
+        StatutoryConfig.objects.create(name="SSNIT", rate_percent=DEC("5.5"), effective_from="2020-01-01")
+        self.employees = [
+            Employee.objects.create(first_name=f"E{i}", last_name="T", email=f"e{i}@example.com", phone=f"0{i}",
+                                    position="Staff", basic_salary=DEC(1000 + i))
+            for i in range(10)
+        ]
+
+    def test_checkpoint_follows_committed_chunks(self, monkeypatch):
+        run = PayrollRun.objects.create(period=self.period, created_by=self.user)
+        crash_after(monkeypatch, 2)
+        with pytest.raises(Crash):
+            RunPipeline(run, chunk_size=3).execute()
+
+        run.refresh_from_db()
+        assert run.checkpoint == self.employees[5].pk
+        assert run.completed_at is None
+        assert Payslip.objects.filter(run=run).count() == 6
+
+    def test_resume_finishes_run(self, monkeypatch):
+        run = PayrollRun.objects.create(period=self.period, created_by=self.user)
+        crash_after(monkeypatch, 1)
+        with pytest.raises(Crash):
+            RunPipeline(run, chunk_size=4).execute()
+        monkeypatch.undo()
+
+        stats = RunPipeline(run, chunk_size=4, resume=True).execute()
+        assert stats.employees == 6
+
+        clean = PayrollRun.objects.create(period=self.period, created_by=self.user)
+        RunPipeline(clean, chunk_size=4).execute()
+        fields = ("employee_id", "gross_pay", "tax", "net_pay")
+        assert (list(Payslip.objects.filter(run=run).order_by("employee_id").values_list(*fields))
+                == list(Payslip.objects.filter(run=clean).order_by("employee_id").values_list(*fields)))
+        assert (PayslipLine.objects.filter(payslip__run=run).count()
+                == PayslipLine.objects.filter(payslip__run=clean).count())
+        run.refresh_from_db()
+        assert run.checkpoint == self.employees[-1].pk and run.completed_at is not None
+
+    def test_resume_skips_existing_payslips_without_checkpoint(self):
+        run = PayrollRun.objects.create(period=self.period, created_by=self.user)
+        RunPipeline(run).write_chunk(RunPipeline(run).compute_chunk(self.employees[3:5]))
+        PayrollRun.objects.filter(pk=run.pk).update(checkpoint=None)
+        run.refresh_from_db()
+
+        stats = RunPipeline(run, chunk_size=4, resume=True).execute()
+        assert stats.employees == 8
+        assert Payslip.objects.filter(run=run).count() == 10
+
+    def test_command(self, monkeypatch, capsys):
+        crash_after(monkeypatch, 1)
+        with pytest.raises(Crash):
+            call_command("process_payroll", "2025-08", "--chunk-size", "3")
+        run = PayrollRun.objects.get()
+        assert f"--resume {run.pk}" in capsys.readouterr().err
+        monkeypatch.undo()
+
+        call_command("process_payroll", "2025-08", "--resume", str(run.pk))
+        assert f"Resumed run {run.pk} after employee {self.employees[2].pk}: 7 more" in capsys.readouterr().out
+        assert Payslip.objects.filter(run=run).count() == 10
+
+        with pytest.raises(CommandError, match="already completed"):
+            call_command("process_payroll", "2025-08", "--resume", str(run.pk))
+        with pytest.raises(CommandError, match="belongs to period"):
+            call_command("process_payroll", "2025-09", "--resume", str(run.pk))
@@ -0,0 +1,69 @@
+# tests/test_run_pipeline.py
+import pytest
+from decimal import Decimal as DEC
+
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+
+from payroll.models import (
+    Allowance, AllowanceType, Deduction, DeductionType, Employee, GradeStep,
+    PayrollPeriod, PayrollRun, Payslip, PayslipLine, StatutoryConfig, TaxBracket,
+)
+from payroll.services.payroll_engine import PayrollEngine
+from payroll.services.run_pipeline import RunPipeline
+
+
+@pytest.mark.django_db
+class TestRunPipeline:
+    def setup_method(self):
+        self.user = get_user_model().objects.create_superuser(email="admin@example.com", password="x", username="admin")
+        self.period = PayrollPeriod.objects.create(year=2025, month=8)
+        TaxBracket.objects.create(year=2025, lower_bound=DEC("0"), upper_bound=DEC("1000"), rate_percent=DEC("0"))
+        TaxBracket.objects.create(year=2025, lower_bound=DEC("1000"), upper_bound=None, rate_percent=DEC("10"))
+        StatutoryConfig.objects.create(name="SSNIT", rate_percent=DEC("5.5"), effective_from="2020-01-01")
+        StatutoryConfig.objects.create(name="SSNIT", rate_percent=DEC("13"), effective_from="2020-01-01", applies_to_employee=False)
+        step = GradeStep.objects.create(title="Lecturer", grade_code="L", step=1, basic_salary=DEC("3000.00"))
+        housing = AllowanceType.objects.create(name="Housing", is_percent_of_basic=True, percent=DEC("10"))
+        loan = DeductionType.objects.create(name="Loan")
+        for i in range(7):
+            emp = Employee.objects.create(
+                first_name=f"E{i}", last_name="Test", email=f"e{i}@example.com", phone=f"0200{i}",
+                position="Lecturer", basic_salary=DEC("3000.00"), grade_step=step,
+            )
+            Allowance.objects.create(employee_id=emp, allowance_type=housing, amount=DEC("0"))
+            Deduction.objects.create(employee_id=emp, deduction_type=loan, amount=DEC("100.00"))
+        Employee.objects.create(
+            first_name="Gone", last_name="Test", email="gone@example.com", phone="0299",
+            position="Lecturer", basic_salary=DEC("3000.00"), grade_step=step, is_active=False,
+        )
+
+    def test_pipeline_matches_engine(self):
+        run = PayrollRun.objects.create(period=self.period, created_by=self.user)
+        stats = RunPipeline(run, chunk_size=3).execute()
+
+        assert stats.employees == 7
+        assert Payslip.objects.filter(run=run).count() == 7
+        assert PayslipLine.objects.filter(payslip__run=run).count() == stats.lines
+
+        engine = PayrollEngine(self.period)
+        for slip in Payslip.objects.filter(run=run).select_related("employee_id"):
+            expected = engine.compute_employee(slip.employee_id)
+            assert slip.gross_pay == expected.gross == DEC("3300.00")
+            assert slip.net_pay == expected.net
+            assert slip.total_deductions == expected.total_deductions
+
+    def test_chunk_queries_do_not_grow_with_chunk(self, django_assert_max_num_queries):
+        run = PayrollRun.objects.create(period=self.period, created_by=self.user)
+        pipeline = RunPipeline(run, chunk_size=100)
+        chunk = next(pipeline.iter_chunks())
+        with django_assert_max_num_queries(0):
+            for emp in chunk:
+                list(emp.allowances.all())
+                list(emp.deductions.all())
+                emp.grade_step.basic_salary
+
+    def test_command_reports_throughput(self, capsys):
+        call_command("process_payroll", "2025-08", "--chunk-size", "2")
+        out = capsys.readouterr().out
+        assert "Processed payroll for 7 employees" in out
+        assert "rows/s" in out
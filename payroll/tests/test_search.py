@@ -0,0 +1,81 @@
+# tests/test_search.py
+import pytest
+from decimal import Decimal as DEC
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from payroll.filters import EmployeeFilter
+from payroll.models import Department, Employee
+from payroll.pagination import KeysetPaginator
+from payroll.services import search
+
+
+@pytest.mark.django_db
+class TestEmployeeSearch:
+    def setup_method(self):
+        self.physics = Department.objects.create(name="Physics", code="PHY")
+        history = Department.objects.create(name="History", code="HIS")
+        rows = [
+            ("Kwame", "Mensah", "Lecturer", self.physics, "0011223344"),
+            ("Akosua", "Kwamena", "Registrar", history, "5566778899"),
+            ("Yaw", "Boateng", "Senior Lecturer", history, "1212121212"),
+        ]
+        for i, (first, last, position, dept, account) in enumerate(rows):
+            Employee.objects.create(first_name=first, last_name=last, email=f"{first.lower()}@ug.edu.gh",
+                                    phone=f"024{i}", position=position, department=dept, basic_salary=DEC("1000"),
+                                    bank_account_number=account)
+
+    def _names(self, qs):
+        return [e.first_name for e in qs]
+
+    def test_fts_index_is_used_and_ranked(self):
+        assert search.fts_available()
+        assert self._names(search.search_employees(Employee.objects.all(), "kwam")) == ["Kwame", "Akosua"]
+        assert self._names(search.search_employees(Employee.objects.all(), "lecturer history")) == ["Yaw"]
+        assert self._names(search.search_employees(Employee.objects.all(), "5566778899")) == ["Akosua"]
+
+    def test_triggers_track_updates_and_department_renames(self):
+        emp = Employee.objects.get(first_name="Yaw")
+        emp.position = "Bursar"
+        emp.save()
+        assert self._names(search.search_employees(Employee.objects.all(), "bursar")) == ["Yaw"]
+
+        self.physics.name = "Applied Physics"
+        self.physics.save()
+        assert self._names(search.search_employees(Employee.objects.all(), "applied")) == ["Kwame"]
+
+        emp.delete()
+        assert not search.search_employees(Employee.objects.all(), "bursar").exists()
+
+    def test_every_match_is_paginated(self):
+        Employee.objects.bulk_create([
+            Employee(first_name=f"E{i}", last_name="T", email=f"e{i}@ug.edu.gh", phone=f"05{i:04d}",
+                     position="Lecturer", basic_salary=DEC("1000"))
+            for i in range(600)
+        ])
+        qs = search.search_employees(Employee.objects.all(), "lecturer")
+        assert qs.count() == 602
+
+        paginator, seen, cursor = KeysetPaginator(qs, 100), [], None
+        while True:
+            page = paginator.get_page(cursor)
+            seen += [e.pk for e in page]
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        assert len(seen) == len(set(seen)) == 602
+        assert self._names(search.search_employees(Employee.objects.filter(department=self.physics), "lecturer")) == [
+            "Kwame"]
+
+    def test_falls_back_to_icontains_without_fts(self, monkeypatch):
+        monkeypatch.setattr(search, "fts_available", lambda using="default": False)
+        f = EmployeeFilter({"search": "wam"}, queryset=Employee.objects.all())
+        assert sorted(self._names(f.qs)) == ["Akosua", "Kwame"]
+
+    def test_employee_list_search_param(self, client):
+        user = get_user_model().objects.create_user(email="hr@example.com", password="x", username="hr",
+                                                    role="hr_manager")
+        client.force_login(user)
+        response = client.get(reverse("payroll:employee_list"), {"search": "physics"})
+        assert self._names(response.context["employees"]) == ["Kwame"]
@@ -0,0 +1,95 @@
+# tests/test_session_user.py
+import pytest
+from decimal import Decimal as DEC
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from accounts.backends import user_cache_key
+from payroll.models import Employee, PayrollPeriod, PayrollRun, Payslip
+
+
+def user_queries(client, url):
+    with CaptureQueriesContext(connection) as captured:
+        response = client.get(url)
+        if getattr(response, "streaming", False):
+            b"".join(response.streaming_content)
+    return response, [q["sql"] for q in captured.captured_queries if "accounts_user" in q["sql"]]
+
+
+@pytest.mark.django_db
+class TestCachedSessionUser:
+    def setup_method(self):
+        User = get_user_model()
+        self.officer = User.objects.create_user(email="officer@example.com", password="x", username="officer",
+                                                role="payroll_officer", first_name="Ama")
+        self.staff = User.objects.create_user(email="kofi@example.com", password="x", username="kofi")
+        emp = Employee.objects.create(user=self.staff, first_name="Kofi", last_name="T", email="kofi@example.com",
+                                      phone="01", position="Staff", basic_salary=DEC("1000"))
+        run = PayrollRun.objects.create(period=PayrollPeriod.objects.create(year=2025, month=8), created_by=self.officer)
+        self.slip = Payslip.objects.create(run=run, employee_id=emp, gross_pay=DEC("1000"), taxable_income=DEC("945"),
+                                           tax=DEC("100"), total_deductions=DEC("155"), net_pay=DEC("845"))
+
+    def test_protected_views_skip_user_table(self, client):
+        client.force_login(self.officer)
+        url = reverse("payroll:employee_list")
+        response, first = user_queries(client, url)
+        assert response.status_code == 200 and len(first) == 1  # cache miss loads the row once
+        for _ in range(3):
+            response, queries = user_queries(client, url)
+            assert response.status_code == 200 and queries == []
+        assert b"Ama" in response.content  # display name comes from the cache
+
+    def test_self_service_payslip_skips_user_table(self, client, settings, tmp_path):
+        settings.PAYROLL_PAYSLIP_PDF_DIR = tmp_path
+        client.force_login(self.staff)
+        url = reverse("payroll:payslip_pdf", kwargs={"pk": self.slip.pk})
+        user_queries(client, url)
+        response, queries = user_queries(client, url)
+        assert response.status_code == 200 and queries == []
+
+    def test_role_change_takes_effect_on_next_request(self, client):
+        client.force_login(self.staff)
+        url = reverse("payroll:employee_list")
+        assert client.get(url).status_code == 403
+        self.staff.role = "hr_manager"
+        self.staff.save()
+        assert client.get(url).status_code == 200
+
+    def test_role_change_in_another_worker_takes_effect(self, client):
+        client.force_login(self.staff)
+        url = reverse("payroll:employee_list")
+        assert client.get(url).status_code == 403
+        # Another worker process has its own cache handles but shares the store.
+        other_worker = caches.create_connection(settings.ACCOUNTS_USER_CACHE)
+        User = get_user_model()
+        User.objects.filter(pk=self.staff.pk).update(role="hr_manager")
+        other_worker.delete(user_cache_key(self.staff.pk))  # what its post_save receiver does
+        assert client.get(url).status_code == 200
+
+    def test_password_change_ends_other_sessions(self, client):
+        client.force_login(self.officer)
+        client.get(reverse("payroll:employee_list"))  # cached
+        self.officer.set_password("new-secret")
+        self.officer.save()
+        response = client.get(reverse("payroll:employee_list"))
+        assert response.status_code == 302 and "login" in response["Location"]
+
+    def test_deactivated_user_is_logged_out(self, client):
+        client.force_login(self.officer)
+        client.get(reverse("payroll:employee_list"))
+        self.officer.is_active = False
+        self.officer.save()
+        assert client.get(reverse("payroll:employee_list")).status_code == 302
+
+    def test_cached_user_can_be_used_as_foreign_key(self, client):
+        client.force_login(self.officer)
+        client.get(reverse("payroll:employee_list"))
+        client.post(reverse("payroll:job_list"), {"period": "2025-09"})
+        assert PayrollRun.objects.count() == 1
+        from payroll.models import PayrollJob
+        assert PayrollJob.objects.get().created_by_id == self.officer.pk
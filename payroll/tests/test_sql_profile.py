@@ -0,0 +1,68 @@
+# tests/test_sql_profile.py
+import json
+import logging
+import pytest
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.urls import reverse
+
+from payroll.middleware import SQLProfileMiddleware
+from payroll.models import Employee
+
+
+@pytest.mark.django_db
+class TestSQLProfileMiddleware:
+    def setup_method(self):
+        User = get_user_model()
+        self.user = User.objects.create_superuser(email="admin@example.com", password="x",
+                                                  username="admin", role="admin")
+        for i in range(4):
+            user = User.objects.create_user(email=f"u{i}@example.com", password="x", username=f"u{i}")
+            Employee.objects.create(user=user, first_name=f"E{i}", last_name="T", email=f"e{i}@example.com",
+                                    phone=f"0{i}", position="Staff", basic_salary="1000")
+
+    def profile(self, view):
+        request = RequestFactory().get("/employees/")
+        request.resolver_match = None
+        return SQLProfileMiddleware(view)(request)
+
+    @override_settings(PAYROLL_SQL_PROFILE_SAMPLE_RATE=1.0)
+    def test_reports_n_plus_one(self, caplog):
+        def view(request):
+            return HttpResponse(", ".join(str(emp) for emp in Employee.objects.all()))  # __str__ loads emp.user
+
+        with caplog.at_level(logging.INFO, logger="payroll.sql_profile"):
+            response = self.profile(view)
+
+        assert response["Server-Timing"].startswith("sql;dur=")
+        assert 'desc="5 queries"' in response["Server-Timing"]
+        [record] = [json.loads(r.getMessage()) for r in caplog.records]
+        assert record["queries"] == 5
+        [group] = record["duplicate_groups"]
+        assert group["count"] == 4 and "accounts_user" in group["sql"]
+
+    @override_settings(PAYROLL_SQL_PROFILE_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_untouched(self, caplog):
+        with caplog.at_level(logging.INFO, logger="payroll.sql_profile"):
+            response = self.profile(lambda request: HttpResponse("ok"))
+        assert "Server-Timing" not in response
+        assert not caplog.records
+
+    @override_settings(PAYROLL_SQL_PROFILE_SAMPLE_RATE=1.0)
+    def test_report_command(self, client, caplog, tmp_path, capsys):
+        client.force_login(self.user)
+        with caplog.at_level(logging.INFO, logger="payroll.sql_profile"):
+            for _ in range(3):
+                client.get(reverse("payroll:employee_list"))
+            client.get(reverse("payroll:dashboard"))
+        log = tmp_path / "profile.log"
+        log.write_text("".join(f"INFO payroll.sql_profile {r.getMessage()}\n" for r in caplog.records) + "noise\n")
+
+        call_command("sql_profile_report", str(log), "--json", "--sort", "queries")
+        report = json.loads(capsys.readouterr().out)
+        assert {row["view"] for row in report} == {"payroll:employee_list", "payroll:dashboard"}
+        [listing] = [row for row in report if row["view"] == "payroll:employee_list"]
+        assert listing["requests"] == 3 and listing["avg_queries"] > 0
@@ -0,0 +1,46 @@
+# tests/test_statutory.py
+import pytest
+from datetime import date
+from decimal import Decimal as DEC
+
+from payroll.models import Employee, PayrollPeriod, StatutoryConfig
+from payroll.services.payroll_engine import PayrollEngine
+from payroll.services.statutory import get_statutory_resolver
+
+
+@pytest.mark.django_db
+class TestStatutoryResolver:
+    def setup_method(self):
+        StatutoryConfig.objects.create(name="SSNIT Tier 1", rate_percent=DEC("5.5"), effective_from=date(2020, 1, 1))
+        StatutoryConfig.objects.create(name="SSNIT Tier 1", rate_percent=DEC("6"), effective_from=date(2025, 7, 1))
+        StatutoryConfig.objects.create(name="SSNIT Tier 2", rate_percent=DEC("5"), effective_from=date(2023, 1, 1))
+        StatutoryConfig.objects.create(name="SSNIT Employer", rate_percent=DEC("13"), effective_from=date(2020, 1, 1),
+                                       applies_to_employee=False)
+
+    def test_rate_in_effect_on_date(self):
+        resolver = get_statutory_resolver()
+        assert resolver.rate("SSNIT Tier 1", date(2019, 12, 31)) == 0
+        assert resolver.rate("SSNIT Tier 1", date(2025, 6, 30)) == DEC("0.055")
+        assert resolver.rate("SSNIT Tier 1", date(2025, 7, 1)) == DEC("0.06")
+        assert resolver.rates_on(date(2022, 5, 1)) == {"SSNIT Tier 1": DEC("0.055")}
+        assert resolver.rates_on(date(2025, 8, 31)) == {"SSNIT Tier 1": DEC("0.06"), "SSNIT Tier 2": DEC("0.05")}
+        assert resolver.rates_on(date(2025, 8, 31), applies_to_employee=False) == {"SSNIT Employer": DEC("0.13")}
+
+    def test_engine_uses_period_date_not_today(self, django_assert_max_num_queries):
+        emp = Employee.objects.create(first_name="A", last_name="B", email="a@example.com", phone="1",
+                                      position="Clerk", basic_salary=DEC("1000.00"))
+        past = PayrollEngine(PayrollPeriod.objects.create(year=2022, month=3)).compute_employee(emp)
+        assert past.statutory_employee == DEC("55.00")
+        assert past.statutory_employer == DEC("130.00")
+
+        engine = PayrollEngine(PayrollPeriod.objects.create(year=2025, month=8))
+        engine.compute_employee(emp)
+        with django_assert_max_num_queries(2):  # allowances + deductions only
+            current = engine.compute_employee(emp)
+        assert current.statutory_employee == DEC("110.00")
+        assert {label for _, label, _ in current.lines} >= {"SSNIT Tier 1", "SSNIT Tier 2"}
+
+    def test_rebuilt_when_config_changes(self):
+        assert get_statutory_resolver().rate("SSNIT Tier 2", date(2025, 1, 1)) == DEC("0.05")
+        StatutoryConfig.objects.create(name="SSNIT Tier 2", rate_percent=DEC("0"), effective_from=date(2024, 1, 1))
+        assert "SSNIT Tier 2" not in get_statutory_resolver().rates_on(date(2025, 1, 1))
@@ -0,0 +1,87 @@
+# tests/test_summary.py
+import pytest
+from decimal import Decimal as DEC
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from payroll.models import Department, Employee, PayrollPeriod, PayrollRun, PayrollSummary, Payslip, YearToDate
+from payroll.services.approval import approve_run, rollback_run
+from payroll.services.summary import period_totals
+
+
+@pytest.mark.django_db
+class TestPayrollSummary:
+    def setup_method(self):
+        self.user = get_user_model().objects.create_user(email="officer@example.com", password="x",
+                                                         username="officer", role="payroll_officer")
+        self.period = PayrollPeriod.objects.create(year=2025, month=8)
+        self.run = PayrollRun.objects.create(period=self.period, created_by=self.user, completed_at=timezone.now())
+        science = Department.objects.create(name="Science", code="SCI")
+        arts = Department.objects.create(name="Arts", code="ART")
+        layout = [(science, Employee.PERMANENT), (science, Employee.PERMANENT), (science, Employee.CONTRACT),
+                  (arts, Employee.PERMANENT), (None, Employee.ADJUNCT)]
+        for i, (dept, kind) in enumerate(layout):
+            emp = Employee.objects.create(first_name=f"E{i}", last_name="T", email=f"e{i}@example.com", phone=f"0{i}",
+                                          position="Staff", basic_salary=DEC("1000"), department=dept,
+                                          employment_type=kind)
+            Payslip.objects.create(run=self.run, employee_id=emp, gross_pay=DEC("1000"), taxable_income=DEC("945"),
+                                   tax=DEC("100"), statutory_employee=DEC("55"), statutory_employer=DEC("130"),
+                                   total_deductions=DEC("155"), net_pay=DEC("845"))
+        self.science = science
+
+    def test_filled_on_approval_only(self):
+        assert not PayrollSummary.objects.exists()
+        approve_run(self.run)
+
+        assert PayrollSummary.objects.filter(period=self.period).count() == 4
+        row = PayrollSummary.objects.get(department=self.science, employment_type=Employee.PERMANENT)
+        assert (row.headcount, row.gross_pay, row.net_pay) == (2, DEC("2000"), DEC("1690"))
+        totals = period_totals(self.period)
+        assert totals["headcount"] == 5
+        assert totals["statutory_employer"] == DEC("650")
+
+    def test_approving_twice_is_refused(self):
+        approve_run(self.run)
+        with pytest.raises(ValueError):
+            approve_run(self.run)
+
+    def test_unfinished_run_is_refused(self):
+        PayrollRun.objects.filter(pk=self.run.pk).update(completed_at=None)
+        with pytest.raises(ValueError, match="has not finished"):
+            approve_run(self.run)
+        self.run.refresh_from_db()
+        assert self.run.status == PayrollRun.DRAFT
+        assert not PayrollSummary.objects.exists() and not YearToDate.objects.exists()
+
+    def test_second_run_of_a_period_is_refused(self):
+        approve_run(self.run)
+        second = PayrollRun.objects.create(period=self.period, created_by=self.user, completed_at=timezone.now())
+        for slip in self.run.payslips.all():
+            slip.pk, slip.run = None, second
+            slip.save()
+        with pytest.raises(ValueError, match="already has approved run"):
+            approve_run(second)
+        assert period_totals(self.period)["gross_pay"] == DEC("5000")
+        assert YearToDate.objects.get(employee=self.run.payslips.first().employee_id).gross_pay == DEC("1000")
+
+        rollback_run(self.run)
+        approve_run(second)  # the replacement run
+        assert period_totals(self.period)["gross_pay"] == DEC("5000")
+
+    def test_rebuild_command(self, capsys):
+        PayrollRun.objects.filter(pk=self.run.pk).update(status=PayrollRun.APPROVED)
+        call_command("rebuild_payroll_summary", "2025-08")
+        assert PayrollSummary.objects.filter(period=self.period).count() == 4
+        assert "4 summary rows" in capsys.readouterr().out
+
+    def test_dashboard_shows_latest_summary(self, client):
+        approve_run(self.run)
+        client.force_login(self.user)
+        response = client.get(reverse("payroll:dashboard"))
+        assert response.status_code == 200
+        summary = response.context["metrics"]["summary"]
+        assert summary["period"] == "2025-08"
+        assert summary["totals"]["net_pay"] == DEC("4225")
@@ -0,0 +1,53 @@
+# tests/test_tax_table.py
+import pytest
+from decimal import Decimal as DEC
+
+from payroll.models import TaxBracket
+from payroll.services.tax_table import TaxTable, get_tax_table
+
+
+def walk(brackets, taxable):
+    """Reference: consume the taxable amount bracket by bracket."""
+    tax, remaining = DEC("0"), taxable
+    for lb, ub, rate in brackets:
+        span = remaining if ub is None else max(DEC("0"), min(remaining, ub - lb))
+        tax += span * rate / 100
+        remaining -= span
+    return tax
+
+
+@pytest.mark.django_db
+class TestTaxTable:
+    def setup_method(self):
+        self.brackets = [
+            (DEC("0"), DEC("490"), DEC("0")),
+            (DEC("490"), DEC("600"), DEC("5")),
+            (DEC("600"), DEC("730"), DEC("10")),
+            (DEC("730"), DEC("3896.67"), DEC("17.5")),
+            (DEC("3896.67"), None, DEC("25")),
+        ]
+        for lb, ub, rate in reversed(self.brackets):
+            TaxBracket.objects.create(year=2025, lower_bound=lb, upper_bound=ub, rate_percent=rate)
+
+    def test_matches_bracket_walk(self):
+        table = get_tax_table(2025)
+        for taxable in ["0", "1", "490", "490.01", "599.99", "600", "730", "2500.50", "3896.67", "10000", "123456.78"]:
+            assert table.tax(DEC(taxable)) == walk(self.brackets, DEC(taxable)), taxable
+
+    def test_cached_until_bracket_changes(self, django_assert_num_queries):
+        table = get_tax_table(2025)
+        with django_assert_num_queries(0):
+            assert get_tax_table(2025) is table
+
+        top = TaxBracket.objects.get(year=2025, upper_bound=None)
+        top.rate_percent = DEC("30")
+        top.save()
+        rebuilt = get_tax_table(2025)
+        assert rebuilt is not table and rebuilt.version != table.version
+        assert rebuilt.tax(DEC("4896.67")) == table.tax(DEC("3896.67")) + DEC("300")
+
+        top.delete()
+        assert get_tax_table(2025).uppers[-1] == DEC("3896.67")
+
+    def test_empty_year_taxes_nothing(self):
+        assert TaxTable.from_brackets(1999, []).tax(DEC("5000")) == 0
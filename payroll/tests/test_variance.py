@@ -0,0 +1,132 @@
+# tests/test_variance.py
+import csv
+import io
+import json
+import pytest
+from decimal import Decimal as DEC
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.urls import reverse
+
+from payroll.models import Employee, PayrollPeriod, PayrollRun, Payslip
+from payroll.services.variance import Thresholds, previous_run, variance_queryset, variance_rows
+
+
+@pytest.mark.django_db
+class TestVarianceReport:
+    def setup_method(self):
+        self.user = get_user_model().objects.create_user(email="officer@example.com", password="x",
+                                                         username="officer", role="payroll_officer")
+        self.emps = [
+            Employee.objects.create(first_name=f"E{i}", last_name="T", email=f"e{i}@example.com", phone=f"0{i}",
+                                    position="Staff", basic_salary=DEC("1000"))
+            for i in range(5)
+        ]
+        july = PayrollPeriod.objects.create(year=2025, month=7)
+        self.august = PayrollPeriod.objects.create(year=2025, month=8)
+        self.prev = self.make_run(july, PayrollRun.APPROVED, {0: ("1000", "800"), 1: ("1000", "800"),
+                                                               2: ("1000", "800"), 3: ("1000", "800")})
+        self.run = self.make_run(self.august, PayrollRun.DRAFT, {0: ("1000", "805"), 1: ("1300", "1000"),
+                                                                 2: ("1000", "700"), 4: ("1000", "800")})
+
+    def make_run(self, period, status, pay):
+        run = PayrollRun.objects.create(period=period, created_by=self.user, status=status)
+        for i, (gross, net) in pay.items():
+            Payslip.objects.create(run=run, employee_id=self.emps[i], gross_pay=DEC(gross), taxable_income=DEC(gross),
+                                   tax=DEC("0"), total_deductions=DEC(gross) - DEC(net), net_pay=DEC(net))
+        return run
+
+    def statuses(self, rows):
+        return {row["employee_id"]: row["status"] for row in rows}
+
+    def test_flags(self):
+        rows = list(variance_rows(self.run, self.prev, Thresholds(net_pct=10, gross_pct=10, amount=DEC("0"))))
+        assert self.statuses(rows) == {
+            self.emps[0].pk: "ok",       # +0.6% net
+            self.emps[1].pk: "flagged",  # +30% gross, +25% net
+            self.emps[2].pk: "flagged",  # -12.5% net
+            self.emps[3].pk: "missing",
+            self.emps[4].pk: "new",
+        }
+        row = rows[1]
+        assert (row["prev_net"], row["curr_net"], row["net_delta"], row["net_pct"]) == (
+            DEC("800.00"), DEC("1000.00"), DEC("200.00"), 25.0)
+        assert rows[2]["net_pct"] == -12.5
+
+        # An absolute floor and higher percentages narrow the flags
+        rows = variance_rows(self.run, self.prev, Thresholds(net_pct=10, gross_pct=10, amount=DEC("150")))
+        assert self.statuses(rows)[self.emps[2].pk] == "ok"
+        rows = variance_rows(self.run, self.prev, Thresholds(net_pct=20, gross_pct=50, amount=DEC("0")),
+                             statuses=["flagged"])
+        assert list(self.statuses(rows)) == [self.emps[1].pk]
+
+    def test_change_from_zero_is_flagged_on_amount(self):
+        Payslip.objects.filter(run=self.prev, employee_id=self.emps[0]).update(gross_pay=DEC("0"), net_pay=DEC("0"))
+        rows = list(variance_rows(self.run, self.prev, Thresholds(net_pct=10, gross_pct=10, amount=DEC("100"))))
+        assert rows[0]["net_pct"] is None and self.statuses(rows)[self.emps[0].pk] == "flagged"
+        rows = variance_rows(self.run, self.prev, Thresholds(net_pct=10, gross_pct=10, amount=DEC("2000")))
+        assert self.statuses(rows)[self.emps[0].pk] == "ok"
+
+        Payslip.objects.filter(run=self.run, employee_id=self.emps[0]).update(gross_pay=DEC("0"), net_pay=DEC("0"))
+        rows = variance_rows(self.run, self.prev, Thresholds(net_pct=10, gross_pct=10, amount=DEC("0")))
+        assert self.statuses(rows)[self.emps[0].pk] == "ok"  # zero both times
+
+    def test_previous_run(self):
+        assert previous_run(self.run) == self.prev
+        PayrollRun.objects.create(period=PayrollPeriod.objects.create(year=2025, month=6), created_by=self.user,
+                                  status=PayrollRun.APPROVED)
+        PayrollRun.objects.create(period=self.august, created_by=self.user, status=PayrollRun.APPROVED)
+        assert previous_run(self.run) == self.prev  # not older, not the same period
+        assert previous_run(self.prev).period.month == 6
+
+        first = PayrollRun.objects.create(period=PayrollPeriod.objects.create(year=2024, month=1),
+                                          created_by=self.user)
+        assert previous_run(first) is None
+        october = PayrollRun.objects.create(period=PayrollPeriod.objects.create(year=2025, month=10),
+                                            created_by=self.user)
+        assert previous_run(october) is None  # September has no run; August is not compared
+        PayrollRun.objects.create(period=PayrollPeriod.objects.create(year=2024, month=12), created_by=self.user,
+                                  status=PayrollRun.PAID)
+        assert previous_run(PayrollRun.objects.create(period=PayrollPeriod.objects.create(year=2025, month=1),
+                                                      created_by=self.user)).period.year == 2024
+        assert list(variance_rows(first, None)) == []
+        assert set(self.statuses(variance_rows(self.run, None)).values()) == {"new"}
+
+    def test_one_grouped_query(self, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            rows = list(variance_rows(self.run, self.prev))
+        assert len(rows) == 5
+        if connection.vendor == "sqlite":
+            plan = variance_queryset(self.run, self.prev, Thresholds.from_settings()).explain()
+            assert "SEARCH payroll_payslip USING INDEX" in plan
+
+    def test_command_exports(self, tmp_path, capsys):
+        out = io.StringIO()
+        call_command("variance_report", str(self.run.pk), stdout=out)
+        text = out.getvalue()
+        assert "flagged" in text and "missing" in text and " ok " not in text
+        assert "2 flagged, 1 missing, 1 new" in capsys.readouterr().err
+        path = tmp_path / "variance.csv"
+        call_command("variance_report", str(self.run.pk), "--format", "csv", "--output", str(path),
+                     "--net-pct", "5", "--gross-pct", "5")
+        rows = list(csv.DictReader(path.open()))
+        assert len(rows) == 5 and rows[1]["gross_pct"] == "30.0"
+
+        out = io.StringIO()
+        call_command("variance_report", str(self.run.pk), "--format", "json", "--only", "new", stdout=out)
+        data = json.loads(out.getvalue())
+        assert data["previous_period"] == "2025-07"
+        assert data["previous_run"] == self.prev.pk and [r["employee_id"] for r in data["rows"]] == [self.emps[4].pk]
+
+    def test_view(self, client):
+        client.force_login(self.user)
+        url = reverse("payroll:run_variance", kwargs={"pk": self.run.pk})
+        response = client.get(url, {"only": "flagged,missing"})
+        assert response["Content-Type"] == "text/csv"
+        assert f"_vs_run_{self.prev.pk}_2025-07.csv" in response["Content-Disposition"]
+        rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+        assert [row["status"] for row in rows] == ["flagged", "flagged", "missing"]
+        assert client.get(url, {"only": "weird"}).status_code == 400
+        assert client.get(url, {"net_pct": "x"}).status_code == 400
@@ -0,0 +1,124 @@
+# tests/test_ytd.py
+import pytest
+from decimal import Decimal as DEC
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from payroll.models import Employee, PayrollPeriod, PayrollRun, Payslip, YearToDate
+from payroll.services.approval import approve_run, rollback_run
+from payroll.services.ytd import verify_ytd
+
+
+@pytest.mark.django_db
+class TestYearToDate:
+    def setup_method(self):
+        self.user = get_user_model().objects.create_user(email="officer@example.com", password="x",
+                                                         username="officer", role="payroll_officer")
+        self.emps = [
+            Employee.objects.create(first_name=f"E{i}", last_name="T", email=f"e{i}@example.com", phone=f"0{i}",
+                                    position="Staff", basic_salary=DEC("1000"))
+            for i in range(3)
+        ]
+
+    def make_run(self, year, month, gross, emps=None):
+        period, _ = PayrollPeriod.objects.get_or_create(year=year, month=month)
+        run = PayrollRun.objects.create(period=period, created_by=self.user, completed_at=timezone.now())
+        for emp in emps or self.emps:
+            Payslip.objects.create(run=run, employee_id=emp, gross_pay=DEC(gross), taxable_income=DEC(gross),
+                                   tax=DEC("100"), statutory_employee=DEC("55"), statutory_employer=DEC("130"),
+                                   total_deductions=DEC("155"), net_pay=DEC(gross) - DEC("155"))
+        return run
+
+    def ytd(self, emp, year=2025):
+        return YearToDate.objects.get(employee=emp, year=year)
+
+    def test_approval_accumulates_per_year(self):
+        july = self.make_run(2025, 7, "1000")
+        assert not YearToDate.objects.exists()
+        approve_run(july)
+        approve_run(self.make_run(2025, 8, "1200", self.emps[:2]))
+        approve_run(self.make_run(2026, 1, "1500"))
+        self.make_run(2025, 9, "9999")  # draft, not counted
+
+        row = self.ytd(self.emps[0])
+        assert (row.payslips, row.gross_pay, row.tax, row.statutory_employee, row.net_pay) == (
+            2, DEC("2200"), DEC("200"), DEC("110"), DEC("1890"))
+        assert self.ytd(self.emps[2]).gross_pay == DEC("1000")
+        assert self.ytd(self.emps[2], 2026).gross_pay == DEC("1500")
+        assert verify_ytd() == []
+
+    def test_rollback_reverses(self):
+        approve_run(self.make_run(2025, 7, "1000"))
+        august = self.make_run(2025, 8, "1200", self.emps[:1])
+        approve_run(august)
+
+        rollback_run(august)
+        august.refresh_from_db()
+        assert august.status == PayrollRun.DRAFT
+        row = self.ytd(self.emps[0])
+        assert (row.payslips, row.gross_pay, row.net_pay) == (1, DEC("1000"), DEC("845"))
+        assert verify_ytd() == []
+
+        approve_run(august)
+        august.period.is_closed = True
+        august.period.save()
+        with pytest.raises(ValueError, match="closed"):
+            rollback_run(august)
+
+    def test_closed_period_is_refused(self):
+        run = self.make_run(2025, 7, "1000")
+        PayrollPeriod.objects.filter(pk=run.period_id).update(is_closed=True)
+        with pytest.raises(ValueError, match="closed"):
+            approve_run(run)
+        assert not YearToDate.objects.exists()
+
+    def test_rollback_of_only_run_removes_rows(self):
+        run = self.make_run(2025, 7, "1000")
+        approve_run(run)
+        rollback_run(run)
+        assert not YearToDate.objects.exists()
+        with pytest.raises(ValueError):
+            rollback_run(run)  # already a draft
+
+    def test_failed_approval_leaves_totals_untouched(self, monkeypatch):
+        run = self.make_run(2025, 7, "1000")
+
+        def broken(period):
+            raise RuntimeError("summary failed")
+        monkeypatch.setattr("payroll.services.approval.rebuild_period_summary", broken)
+        with pytest.raises(RuntimeError):
+            approve_run(run)
+        run.refresh_from_db()
+        assert run.status == PayrollRun.DRAFT and not YearToDate.objects.exists()
+
+    def test_verify_command_reports_and_repairs(self, capsys):
+        approve_run(self.make_run(2025, 7, "1000"))
+        YearToDate.objects.filter(employee=self.emps[0]).update(gross_pay=DEC("1"))
+        YearToDate.objects.filter(employee=self.emps[1]).delete()
+        YearToDate.objects.create(employee=self.emps[2], year=2024, payslips=1, net_pay=DEC("5"))
+
+        with pytest.raises(CommandError, match="3 year-to-date rows drifted"):
+            call_command("verify_ytd")
+        out = capsys.readouterr().out
+        assert f"employee {self.emps[0].pk} 2025 gross_pay: stored 1.00, expected 1000" in out
+
+        with pytest.raises(CommandError, match="2 year-to-date rows"):
+            call_command("verify_ytd", "--year", "2025")
+        call_command("verify_ytd", "--repair")
+        assert "Repaired 3 year-to-date rows" in capsys.readouterr().out
+        assert self.ytd(self.emps[0]).gross_pay == DEC("1000")
+        assert self.ytd(self.emps[1]).net_pay == DEC("845")
+        assert not YearToDate.objects.filter(year=2024).exists()
+
+        call_command("verify_ytd")
+        assert "match the payslips" in capsys.readouterr().out
+
+    def test_rollback_command(self, capsys):
+        run = self.make_run(2025, 7, "1000")
+        with pytest.raises(CommandError, match="only approved runs"):
+            call_command("rollback_payroll", str(run.pk))
+        approve_run(run)
+        call_command("rollback_payroll", str(run.pk))
+        assert "Rolled back run" in capsys.readouterr().out
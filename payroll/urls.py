@@ -1,5 +1,5 @@
 from django.urls import path
-from .import views
+from .import api, views
 
 
 app_name = "payroll"   # 👈 this line defines the namespace
@@ -12,7 +12,24 @@ urlpatterns = [
     path("employees/<int:pk>/edit/", views.employee_edit, name="employee_edit"),
 
     path("payroll/", views.payroll_list, name="payroll_list"),
+    path("payroll/export/", views.payroll_export, name="payroll_export"),
     path("payroll/<int:pk>/", views.payroll_detail, name="payroll_detail"),
+    path("payslips/<int:pk>/pdf/", views.payslip_pdf, name="payslip_pdf"),
+
+    path("runs/<int:pk>/emails/", views.run_email_progress, name="run_email_progress"),
+    path("runs/<int:pk>/variance/", views.run_variance, name="run_variance"),
+    path("jobs/", views.job_list, name="job_list"),
+    path("jobs/<int:pk>/progress/", views.job_progress, name="job_progress"),
+    path("jobs/<int:pk>/cancel/", views.job_cancel, name="job_cancel"),
 
     path("periods/", views.period_list, name="period_list"),
+
+    path("api/employees/", api.resource_list, {"resource": "employees"}, name="api_employee_list"),
+    path("api/employees/<int:pk>/", api.resource_detail, {"resource": "employees"}, name="api_employee_detail"),
+    path("api/periods/", api.resource_list, {"resource": "periods"}, name="api_period_list"),
+    path("api/periods/<int:pk>/", api.resource_detail, {"resource": "periods"}, name="api_period_detail"),
+    path("api/runs/", api.resource_list, {"resource": "runs"}, name="api_run_list"),
+    path("api/runs/<int:pk>/", api.resource_detail, {"resource": "runs"}, name="api_run_detail"),
+    path("api/payslips/", api.resource_list, {"resource": "payslips"}, name="api_payslip_list"),
+    path("api/payslips/<int:pk>/", api.resource_detail, {"resource": "payslips"}, name="api_payslip_detail"),
 ]
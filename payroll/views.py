@@ -1,22 +1,75 @@
-from django.shortcuts import render, get_object_or_404, redirect
+import tempfile
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.shortcuts import aget_object_or_404, render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required, permission_required
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
 from django.contrib import messages
 from django.urls import reverse
-from django.core.paginator import Paginator
+from django.utils.http import content_disposition_header
 from accounts.decorators import role_required
-from .models import Employee, PayrollRecord, PayrollPeriod, Department
+from django.views.decorators.http import require_POST
+from .models import Employee, PayrollJob, PayrollRecord, PayrollPeriod, PayrollRun, Department
 from .forms import EmployeeForm, PayrollRecordForm
 from .filters import EmployeeFilter, PayrollRecordFilter
+from .db_router import reporting_view
+from .pagination import KeysetPaginator
+from .services.exports import EXPORT_FORMATS, aiter_csv, iter_csv, write_xlsx
+from .services.dashboard import aget_dashboard_metrics
+from .services.email_queue import email_progress
+from .services.jobs import job_progress as job_progress_data, request_cancel, start_job
+from .services.run_pipeline import PIPELINES
+from .services.payslip_pdf import get_payslip_pdf, payslip_queryset
+from .services.variance import STATUSES as VARIANCE_STATUSES, Thresholds, iter_variance_csv, previous_run, variance_rows
 
 
 
+def _without_cursor(request):
+    """Current filter parameters, for building next/previous page links."""
+    params = request.GET.copy()
+    params.pop("cursor", None)
+    params.pop("page", None)
+    return params.urlencode()
+
+
+# Templates can still reach the database (lazy relations, the model-choice
+# widgets of filter forms), which Django only allows from sync code.
+_arender = sync_to_async(render)
+
+
+async def _afiltered(filterset):
+    """filterset.qs; validating model-choice filters queries the database."""
+    return await sync_to_async(lambda: filterset.qs)()
+
+
+async def _aiter_file(path, chunk_size=FileResponse.block_size):
+    with await sync_to_async(open)(path, "rb") as fh:
+        while chunk := await sync_to_async(fh.read)(chunk_size):
+            yield chunk
+
+
+def _file_response(request, path, filename, content_type):
+    """
+    A download of `path`. Under ASGI the file is read through an async
+    iterator; a sync FileResponse would make Django buffer the whole file
+    before sending it.
+    """
+    if not isinstance(request, ASGIRequest):
+        return FileResponse(open(path, "rb"), as_attachment=True, filename=filename, content_type=content_type)
+    response = StreamingHttpResponse(_aiter_file(path), content_type=content_type)
+    response["Content-Length"] = str(path.stat().st_size)
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    return response
+
+
 @role_required(["payroll_officer", "hr_manager", "admin"])
-def employee_list(request):
-    f = EmployeeFilter(request.GET, queryset=Employee.objects.all())
-    paginator = Paginator(f.qs, 20)
-    page = request.GET.get('page')
-    employees = paginator.get_page(page)
-    return render(request, "payroll/employee_list.html", {"filter": f, "employees": employees})
+async def employee_list(request):
+    f = EmployeeFilter(request.GET, queryset=Employee.objects.select_related("department", "grade_step"))
+    employees = await KeysetPaginator(await _afiltered(f), 20).aget_page(request.GET.get("cursor"), with_count=True)
+    return await _arender(request, "payroll/employee_list.html", {
+        "filter": f, "employees": employees, "querystring": _without_cursor(request),
+    })
 
 
 # @role_required(["payroll_officer", "hr_manager", "admin"])
@@ -107,41 +160,147 @@ def employee_edit(request, pk):
 
 
 @role_required(["payroll_officer", "hr_manager", "admin"])
-def employee_detail(request, pk):
-    employee = get_object_or_404(Employee, pk=pk)
-    return render(request, "payroll/employee_detail.html", {"employee": employee})
+async def employee_detail(request, pk):
+    employee = await aget_object_or_404(Employee.objects.select_related("department"), pk=pk)
+    return await _arender(request, "payroll/employee_detail.html", {"employee": employee})
+
 
 
+@role_required(["payroll_officer", "hr_manager", "admin", "auditor"])
+@reporting_view
+async def payroll_list(request):
+    f = PayrollRecordFilter(request.GET, queryset=PayrollRecord.objects.select_related("employee_id"))
+    records = await KeysetPaginator(await _afiltered(f), 20).aget_page(request.GET.get("cursor"), with_count=True)
+    return await _arender(request, "payroll/payroll_list.html", {
+        "filter": f, "records": records, "querystring": _without_cursor(request),
+    })
+
 
 @role_required(["payroll_officer", "hr_manager", "admin", "auditor"])
-def payroll_list(request):
+@reporting_view
+async def payroll_export(request):
+    """
+    Every PayrollRecord matching the payroll_list filters, streamed as CSV (or
+    XLSX). The CSV is an async iterator under ASGI and a sync one under WSGI,
+    so neither server has to buffer it.
+    """
     f = PayrollRecordFilter(request.GET, queryset=PayrollRecord.objects.all())
-    paginator = Paginator(f.qs, 20)
-    page = request.GET.get('page')
-    records = paginator.get_page(page)
-    return render(request, "payroll/payroll_list.html", {"filter": f, "records": records})
+    if not await sync_to_async(f.is_valid)():
+        return HttpResponseBadRequest(f.errors.as_text())
+    fmt = request.GET.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        return HttpResponseBadRequest(f"format must be one of {', '.join(EXPORT_FORMATS)}")
+
+    if fmt == "xlsx":
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            return HttpResponseBadRequest("XLSX export requires openpyxl")
+        tmp = tempfile.TemporaryFile()
+        await sync_to_async(write_xlsx)(await _afiltered(f), tmp)
+        tmp.seek(0)
+        return FileResponse(tmp, as_attachment=True, filename="payroll_records.xlsx")
+
+    qs = await _afiltered(f)
+    rows = aiter_csv(qs) if isinstance(request, ASGIRequest) else iter_csv(qs)
+    response = StreamingHttpResponse(rows, content_type="text/csv")
+    response["Content-Disposition"] = 'attachment; filename="payroll_records.csv"'
+    return response
+
+
+@role_required(["payroll_officer", "hr_manager", "admin", "auditor"])
+async def payroll_detail(request, pk):
+    record = await aget_object_or_404(PayrollRecord.objects.select_related("employee_id"), pk=pk)
+    return await _arender(request, "payroll/payroll_detail.html", {"record": record})
+
+@login_required
+async def payslip_pdf(request, pk):
+    """The payslip as a PDF, from the content-hash cache or rendered on demand."""
+    user = await request.auser()
+    slip = await aget_object_or_404(payslip_queryset(), pk=pk)
+    staff = user.is_superuser or user.role in ("payroll_officer", "hr_manager", "admin", "auditor")
+    if not staff and slip.employee_id.user_id != user.pk:
+        raise PermissionDenied
+    filename = f"payslip_{slip.run.period}_{slip.employee_id_id}.pdf"
+    path = await sync_to_async(get_payslip_pdf)(slip)
+    return _file_response(request, path, filename, "application/pdf")
+
+
+@role_required(["payroll_officer", "hr_manager", "admin"])
+def run_email_progress(request, pk):
+    """Payslip e-mail counts by status for one run, for polling from the UI."""
+    run = get_object_or_404(PayrollRun, pk=pk)
+    return JsonResponse({"run": run.pk, **email_progress(run)})
+
+
+@role_required(["payroll_officer", "hr_manager", "admin", "auditor"])
+def run_variance(request, pk):
+    """CSV of the run compared with the previous month's approved run; ?only=flagged,new,missing and threshold overrides."""
+    run = get_object_or_404(PayrollRun.objects.select_related("period"), pk=pk)
+    try:
+        thresholds = Thresholds.from_settings(
+            net_pct=request.GET.get("net_pct"), gross_pct=request.GET.get("gross_pct"),
+            amount=request.GET.get("min_amount"),
+        )
+    except (ValueError, ArithmeticError):
+        return HttpResponseBadRequest("net_pct, gross_pct and min_amount must be numbers")
+    statuses = [status for status in request.GET.get("only", "").split(",") if status]
+    if set(statuses) - set(VARIANCE_STATUSES):
+        return HttpResponseBadRequest(f"only must be a subset of {', '.join(VARIANCE_STATUSES)}")
+
+    previous = previous_run(run)
+    rows = variance_rows(run, previous, thresholds, statuses)
+    response = StreamingHttpResponse(iter_variance_csv(rows), content_type="text/csv")
+    against = f"run_{previous.pk}_{previous.period}" if previous else "none"
+    response["Content-Disposition"] = f'attachment; filename="variance_run_{run.pk}_{run.period}_vs_{against}.csv"'
+    return response
+
+
+@role_required(["payroll_officer", "admin"])
+def job_list(request):
+    """Start payroll runs in the background worker and follow their progress."""
+    if request.method == "POST":
+        try:
+            year, month = (int(part) for part in request.POST.get("period", "").split("-"))
+            if not 1 <= month <= 12:
+                raise ValueError
+        except ValueError:
+            messages.error(request, "Period must be in format YYYY-MM.")
+            return redirect("payroll:job_list")
+        period, _ = PayrollPeriod.objects.get_or_create(year=year, month=month)
+        try:
+            job = start_job(period, request.user, mode=request.POST.get("mode", "scalar"))
+        except ValueError as exc:
+            messages.error(request, str(exc))
+        else:
+            messages.success(request, f"Payroll job {job.pk} for {period} queued.")
+        return redirect("payroll:job_list")
+
+    jobs = PayrollJob.objects.select_related("period")[:20]
+    return render(request, "payroll/job_list.html", {"jobs": jobs, "modes": sorted(PIPELINES)})
 
 
 @role_required(["payroll_officer", "hr_manager", "admin", "auditor"])
-def payroll_detail(request, pk):
-    record = get_object_or_404(PayrollRecord, pk=pk)
-    return render(request, "payroll/payroll_detail.html", {"record": record})
+def job_progress(request, pk):
+    job = get_object_or_404(PayrollJob.objects.select_related("period"), pk=pk)
+    return JsonResponse(job_progress_data(job))
+
+
+@require_POST
+@role_required(["payroll_officer", "admin"])
+def job_cancel(request, pk):
+    job = get_object_or_404(PayrollJob, pk=pk)
+    request_cancel(job)
+    messages.info(request, f"Cancellation of job {job.pk} requested.")
+    return redirect("payroll:job_list")
+
 
 @role_required(["payroll_officer", "hr_manager", "admin", "auditor"])
-def dashboard(request):
-    if not request.user.is_authenticated:
-        return redirect("login")
-    
-    # Example data for dashboard
-    total_employees = Employee.objects.count()
-    total_payroll_records = PayrollRecord.objects.count()
-    
-    return render(request, "payroll/dashboard.html", {
-        "total_employees": total_employees,
-        "total_payroll_records": total_payroll_records,
-    })
+async def dashboard(request):
+    # Cached KPIs; invalidated by payroll.signals when the underlying rows change
+    return await _arender(request, "payroll/dashboard.html", {"metrics": await aget_dashboard_metrics()})
 
 
 def period_list(request):
-    periods = PayrollPeriod.objects.all().order_by("-start_date")
+    periods = PayrollPeriod.objects.all()
     return render(request, "payroll/period_list.html", {"periods": periods})
\ No newline at end of file